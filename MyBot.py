@@ -8,7 +8,7 @@ import hlt
 import logging
 
 # Let's start by importing the Halite Starter Kit so we can interface with the Halite engine
-from hlt import constants, entity, strategy, utilcalc, micro, macro
+from hlt import constants, entity, strategy, utilcalc, micro, macro, orca, validation
 import time
 from operator import attrgetter
 
@@ -21,10 +21,9 @@ initial_closest_enemy_id = None
 initial_closest_enemy_location = None
 
 # GAME START
-game = hlt.Game("version292")
-game_map = game.initial_map
+game = hlt.Game("version292", binary_io=True, record=True)
 
-current_strategy = constants.BotStrategy.NORMAL if len(game_map.all_players()) == 2 else constants.BotStrategy.FOUR_PLAYERS
+current_strategy = constants.BotStrategy.NORMAL if len(game.initial_map.player_ids) == 2 else constants.BotStrategy.FOUR_PLAYERS
 planet_multiplier = docked_ship_aggression_multiplier = 1
 mid_map_multiplier = constants.MID_MAP_MULTIPLIER[current_strategy.value]
 
@@ -52,7 +51,7 @@ while True:
 
     list_enemies = strategy.calculate_player_score(game_map, game_map.my_ship_dict)
     current_closest_enemy = min(list_enemies, key=attrgetter('distance_from_me'))
-    num_players_alive = len([player for player in game_map.all_players() if len(player.all_ships()) > 0])
+    num_players_alive = len([player for player in game_map.all_players() if player.num_ships > 0])
 
     if turn_number == 0:
         initial_closest_enemy_id = current_closest_enemy.id
@@ -65,7 +64,7 @@ while True:
     my_rank = 0
     for i in range(len(list_enemies)):
         enemy = list_enemies[i]
-        if len(my_player.all_ships()) < len(enemy.all_ships()):
+        if my_player.num_ships < enemy.num_ships:
             my_rank += 1
         #logging.info("Rank {} score: {}, num ships: {}, pos: {},{}".format(i + 1, enemy.score, len(enemy.all_ships()), enemy.avg_x, enemy.avg_y))
     #logging.info("My rank: {}, My score: {}, num undocked ships: {}, pos: {},{}".format(my_rank, my_player.score, len(my_player.all_ships()), my_player.avg_x, my_player.avg_y))
@@ -76,7 +75,7 @@ while True:
     current_strategy, rush_target = strategy.get_turn_strategy(game_map, current_strategy, current_closest_enemy,initial_closest_enemy_id, rush_target, initial_closest_enemy_location)
 
     if rush_target:
-        logging.debug('Rush target: {}'.format(rush_target))
+        logging.debug('Rush target: %s', rush_target)
 
     desertion_flag = strategy.desertion(my_rank, current_strategy, my_player, list_enemies, num_players_alive, turn_number)
 
@@ -93,12 +92,12 @@ while True:
             micro_flag = False
             logging.debug('HP ADVANTAGE IN 4 PLAYER GAME NOW - NOT MICROING')
 
-    combat_ratio = constants.COMBAT_RATIO[current_strategy.value] if len(my_player.all_ships()) > 5 else 1
+    combat_ratio = constants.COMBAT_RATIO[current_strategy.value] if my_player.num_ships > 5 else 1
     if not micro_flag:
         combat_ratio = 1.5
     time_end = time.time()
-    logging.info('Turn {}, {}'.format(turn_number, current_strategy))
-    logging.info("setup time: " + str(time_end - time_start))
+    logging.info('Turn %s, %s', turn_number, current_strategy)
+    logging.info("setup time: %s", time_end - time_start)
 
     #########################################################################
     # REASSIGNMENT FIRST
@@ -108,7 +107,7 @@ while True:
     if current_strategy == constants.BotStrategy.RUSH and rush_target:
         ships_to_clump = [s for s in game_map.my_ship_dict.values() if isinstance(s, entity.Ship) and not s.is_clumped]
         if ships_to_clump:
-            logging.debug('Clumping ships for rush {}'.format(ships_to_clump))
+            logging.debug('Clumping ships for rush %s', ships_to_clump)
             game_map.MASTER_CLUSTER_ID += 1
             ship_cluster = entity.ShipCluster(ships_to_clump, game_map.MASTER_CLUSTER_ID)
             game_map.my_clustered_ships_dict[game_map.MASTER_CLUSTER_ID] = ship_cluster
@@ -123,7 +122,7 @@ while True:
             for ship_cluster in game_map.my_clustered_ships_dict.values():
                 if ship_cluster.is_clumped:
                     navi_list = ship_cluster.navigate_new(rush_target, game_map, return_type='raw')
-                    logging.debug('Clump id: {}, navi_list:{}'.format(ship_cluster.id, navi_list))
+                    logging.debug('Clump id: %s, navi_list:%s', ship_cluster.id, navi_list)
                     if navi_list:
                         for clump_ship in ship_cluster.ship_list:
                             if clump_ship.clump_id == ship_cluster.id and not clump_ship.has_command:
@@ -159,13 +158,16 @@ while True:
     max_iterations, docking_discount, overall_top_target, dock_check_distance = utilcalc.get_utility_parameters(
         game_map, list_enemies, micro_flag, desertion_flag)
     # pre-calc stuff if we don't have that many ships..
-    if (game_map.turn_num <= 50) or (len(game_map.get_me().all_ships()) <= 130):
+    if (game_map.turn_num <= 50) or (game_map.get_me().num_ships <= 130):
         utilcalc.set_ship_neighbours(game_map, current_strategy, dock_check_distance)
         #utilcalc.assign_ships_to_clusters(game_map)
         utilcalc.calculate_turn_utilities(game_map, current_strategy, game_map.my_ship_dict, list_enemies, turn_timer, micro_flag, combat_ratio=combat_ratio,
                                           desertion_flag=desertion_flag, planet_multiplier=planet_multiplier, docked_ship_aggression_multiplier=docked_ship_aggression_multiplier, mid_map_multiplier=mid_map_multiplier)
         sorted_ship_dict = sorted(game_map.my_ship_dict.values(), key=attrgetter('highest_utility'), reverse=True)
     else:
+        # too many ships to work out everyone's utilities, the ones away from the fighting follow the flow fields
+        flow_target = overall_top_target if overall_top_target else list_enemies[0].centroid_ship
+        macro.steer_by_flow_fields(game_map, flow_target, combat_ratio)
         sorted_ship_dict = [ship for ship in game_map.my_ship_dict.values() if ship.mission_target]
         sorted_ship_dict += sorted([ship for ship in game_map.my_ship_dict.values() if not ship.mission_target], key=attrgetter('distance_to_enemy'))
 
@@ -197,23 +199,23 @@ while True:
         # MICRO STRATEGIES
         #########################################################################
 
-        logging.info('ASSIGNING SHIP: {}'.format(ship.id))
+        logging.info('ASSIGNING SHIP: %s', ship.id)
 
         if micro_flag:
 
             if micro.should_ship_micro(ship, current_strategy, game_map, combat_ratio):
 
-                nearest_enemy = micro.get_nearest_enemy(ship, current_strategy, combat_ratio)
+                nearest_enemy = micro.get_nearest_enemy(ship, current_strategy, combat_ratio, game_map)
                 #if overall_top_target in ship.nearby_enemies:
                 #    if nearest_enemy != ship.highest_utility_target:
                 #        nearest_enemy = overall_top_target
 
-                logging.debug('MICRO: ship: {}, weapon_cd: {}, nearest enemy: {}, distance: {}, nearby_enemies:{}'.format(ship.id, ship.weapon_cooldown, nearest_enemy.id, nearest_enemy.distance_from_my_ship, ship.nearby_enemies))
+                logging.debug('MICRO: ship: %s, weapon_cd: %s, nearest enemy: %s, distance: %s, nearby_enemies:%s', ship.id, ship.weapon_cooldown, nearest_enemy.id, nearest_enemy.distance_from_my_ship, ship.nearby_enemies)
 
                 # BESPOKE RUSH MICRO
                 if current_strategy == constants.BotStrategy.RUSH:
 
-                    if not [ship for ship in current_closest_enemy.all_ships() if ship.is_docked()]:
+                    if not current_closest_enemy.num_docked_ships:
 
                         if (nearest_enemy.distance_from_my_ship <= constants.NEARBY_RADIUS ** 2):
                             if micro.should_run(ship, current_strategy, nearest_enemy):
@@ -328,7 +330,7 @@ while True:
         target = ship.highest_utility_target
 
         # first check if we want to dock
-        dock_check_combat_ratio = 0.5 if len(game_map.get_me().all_ships()) > 5 else 1
+        dock_check_combat_ratio = 0.5 if game_map.get_me().num_ships > 5 else 1
         if isinstance(target, entity.Planet):
             if current_strategy != constants.BotStrategy.RUSH:
                 if ship.can_dock(target) and not target.is_full():
@@ -344,8 +346,8 @@ while True:
                                 target = enemy
                                 break
                     if ship.nearest_enemy:
-                        if len(my_player.all_ships()) <= 5:
-                            logging.info('MACRO: dock check nearest enemy: {}'.format(ship.nearest_enemy))
+                        if my_player.num_ships <= 5:
+                            logging.info('MACRO: dock check nearest enemy: %s', ship.nearest_enemy)
                             if not ship.nearest_enemy.is_fully_engaged(combat_ratio=dock_check_combat_ratio):
                                 if macro.can_friend_defend(ship, ship.nearest_enemy):
                                     continue
@@ -356,23 +358,22 @@ while True:
 
                     if not break_flag:
                         game_map.command_queue.append(ship.dock(target))
-                        ship.docking_status = ship.DockingStatus.DOCKING
-                        ship.planet = target
+                        game_map.mark_docking(ship, target)
                         ship.has_command = True
                         target.add_approaching_friendly(ship)
-                        logging.info('MACRO: docking! ship:{}'.format(ship))
+                        logging.info('MACRO: docking! ship:%s', ship)
                         if ship.dock_check_ships:
                             for enemy in ship.dock_check_ships:
-                                utilcalc.set_proximity_discount(enemy, ship, current_strategy)
+                                utilcalc.set_proximity_discount(enemy, ship, current_strategy, game_map)
                         if ship.nearest_enemy:
-                            utilcalc.set_proximity_discount(ship.nearest_enemy, ship, current_strategy)
+                            utilcalc.set_proximity_discount(ship.nearest_enemy, ship, current_strategy, game_map)
                         if ship.is_clumped:
                             game_map.my_clustered_ships_dict[ship.clump_id].remove_ship_from_cluster(ship)
 
                     else:
                         if target != ship.highest_utility_target:
-                            logging.debug(target)
-                            logging.info('MACRO: NOT docking! ship: {} going for new target: {}'.format(ship, target))
+                            logging.debug('%s', target)
+                            logging.info('MACRO: NOT docking! ship: %s going for new target: %s', ship, target)
                             macro.assign_ship_to_target(ship, target, game_map)
                             continue
 
@@ -392,7 +393,7 @@ while True:
                 macro.assign_ship_to_target(ship, target, game_map)
 
     time_macroing = time.time() - time_start
-    logging.info("Time for finding target to move to: " + str(time_macroing))
+    logging.info("Time for finding target to move to: %s", time_macroing)
 
     #########################################################################
     # ASSIGN UNASSIGNED SHIPS..
@@ -401,7 +402,7 @@ while True:
                         not (ship.has_command or ship.is_docked())]
 
     if unassigned_ships:
-        logging.info('unassigned ships: {}'.format(unassigned_ships))
+        logging.info('unassigned ships: %s', unassigned_ships)
 
         target = entity.Position(list_enemies[0].avg_x, list_enemies[0].avg_y)
         my_centroid = entity.Position(my_player.avg_x, my_player.avg_y)
@@ -409,7 +410,7 @@ while True:
             target = overall_top_target
         for ship in unassigned_ships:
             if (time.time() - turn_timer) >= 1.80:
-                logging.warning('Turn time now: {}, breaking..'.format((time.time() - turn_timer)))
+                logging.warning('Turn time now: %s, breaking..', time.time() - turn_timer)
                 break
             if ship.mission_target:
                 if not ship.mission_target.is_fully_engaged(combat_ratio=combat_ratio):
@@ -422,12 +423,15 @@ while True:
 
             macro.assign_ship_to_target(ship, target, game_map)
 
+    # ships were moved one at a time, settle all the thrusts together so no two of mine collide
+    orca.resolve_friendly_moves(game_map, deadline=turn_timer + 1.85)
+    # whatever path the commands came from, no two thrusts of mine may cross
+    validation.validate_command_queue(game_map)
+
     # Send our set of commands to the Halite engine for this turn
-    logging.info(game_map.command_queue)
+    logging.info('%s', game_map.command_queue)
     game.send_command_queue(game_map.command_queue)
-    for key in game_map.my_ship_dict:
-        game_map.my_ship_dict[key].updated_this_turn = False
 
-    logging.info("Total turn time: " + str(time.time() - turn_timer))
+    logging.info("Total turn time: %s", time.time() - turn_timer)
     # TURN END
 # GAME END
@@ -0,0 +1,158 @@
+"""
+Logging for the bot.
+
+Hot code logs through one of the category loggers with lazy %-style arguments, and guards
+anything expensive to build behind the cached flags, eg:
+
+    if botlog.NAVIGATION_DEBUG:
+        botlog.NAVIGATION.debug('obstacles: %s', [o.id for o in obstacles])
+
+Records are formatted in the calling thread (so they show the entity as it was when logged) and
+handed to a queue, a background thread does the file writes. Each turn gets a byte budget, once it's
+used up only every sample_every-th record gets through, warnings and errors always do.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+
+NAVIGATION = logging.getLogger('bot.navigation')
+MICRO = logging.getLogger('bot.micro')
+UTILITY = logging.getLogger('bot.utility')
+COLLISION = logging.getLogger('bot.collision')
+
+#: Category loggers by name, configure() derives <NAME>_DEBUG and <NAME>_INFO flags from these
+CATEGORIES = {'NAVIGATION': NAVIGATION, 'MICRO': MICRO, 'UTILITY': UTILITY, 'COLLISION': COLLISION}
+
+#: Bytes of log output allowed per turn before sampling kicks in
+DEFAULT_TURN_BUDGET = 256 * 1024
+#: Once over budget, keep one record in this many
+DEFAULT_SAMPLE_EVERY = 50
+
+# cached isEnabledFor results, refreshed by refresh_flags()
+NAVIGATION_DEBUG = NAVIGATION_INFO = False
+MICRO_DEBUG = MICRO_INFO = False
+UTILITY_DEBUG = UTILITY_INFO = False
+COLLISION_DEBUG = COLLISION_INFO = False
+
+_budget_filter = None
+_listener = None
+
+
+class TurnBudgetFilter(logging.Filter):
+    """
+    Lets records through until the turn's byte budget is used up, then samples them.
+    Formats the message of the records it keeps so the queue handler doesn't have to do it again.
+    """
+
+    def __init__(self, turn_budget, sample_every):
+        super().__init__()
+        self.turn_budget = turn_budget
+        self.sample_every = sample_every
+        self.used = 0
+        self.dropped = 0
+        self._over_budget_seen = 0
+
+    def new_turn(self):
+        """
+        Reset the budget
+
+        :return: The number of records dropped last turn
+        :rtype: int
+        """
+        dropped = self.dropped
+        self.used = 0
+        self.dropped = 0
+        self._over_budget_seen = 0
+        return dropped
+
+    def filter(self, record):
+        if self.used >= self.turn_budget and record.levelno < logging.WARNING:
+            self._over_budget_seen += 1
+            if self._over_budget_seen % self.sample_every:
+                self.dropped += 1
+                return False
+        try:
+            record.msg = record.getMessage()
+        except Exception:
+            # leave it to the handler to report the broken record
+            return True
+        record.args = None
+        self.used += len(record.msg)
+        return True
+
+
+def refresh_flags():
+    """
+    Recompute the cached <CATEGORY>_DEBUG and <CATEGORY>_INFO flags, call after changing any logger's level.
+
+    :return: nothing
+    """
+    for name, logger in CATEGORIES.items():
+        globals()[name + '_DEBUG'] = logger.isEnabledFor(logging.DEBUG)
+        globals()[name + '_INFO'] = logger.isEnabledFor(logging.INFO)
+
+
+def configure(log_file, level=logging.DEBUG, category_levels=None,
+              turn_budget=DEFAULT_TURN_BUDGET, sample_every=DEFAULT_SAMPLE_EVERY):
+    """
+    Send all logging through a queue to a background writer for log_file, truncating it.
+
+    :param str log_file: Path of the log file
+    :param int level: Root logging level
+    :param dict category_levels: Optional level per category name, eg {'COLLISION': logging.WARNING}
+    :param int turn_budget: Bytes of log output allowed per turn before sampling
+    :param int sample_every: Keep one in this many records once over budget
+    :return: nothing
+    """
+    global _budget_filter, _listener
+    stop()
+
+    file_handler = logging.FileHandler(log_file, mode='w')
+    file_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    record_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(record_queue)
+    _budget_filter = TurnBudgetFilter(turn_budget, sample_every)
+    queue_handler.addFilter(_budget_filter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    for name, logger in CATEGORIES.items():
+        logger.setLevel((category_levels or {}).get(name, logging.NOTSET))
+    refresh_flags()
+
+    _listener = logging.handlers.QueueListener(record_queue, file_handler)
+    _listener.start()
+
+
+def new_turn():
+    """
+    Start the next turn's budget, noting how much got dropped in the last one.
+
+    :return: nothing
+    """
+    if _budget_filter is None:
+        return
+    dropped = _budget_filter.new_turn()
+    if dropped:
+        logging.warning('LOG: dropped %d records over the turn budget', dropped)
+
+
+def stop():
+    """
+    Flush the queue and stop the writer thread.
+
+    :return: nothing
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop)
@@ -1,6 +1,7 @@
 from .entity import Position, Entity, Ship, Planet
-from . import constants
-import logging, math
+from . import botlog, constants, geometry
+
+import numpy as np
 
 def intersect_segment_circle_amount(start, end, circle, *, fudge=0.2, return_time=False):
     """
@@ -67,8 +68,8 @@ def are_ships_moving_toward_each_other(ship, target, moved_ship):
     angle1 = (ship_movement_angle - moved_ship_angle) % 360
     angle2 = (moved_ship_angle - ship_movement_angle) % 360
     if (180 - min(angle1,angle2)) <= 20:
-        logging.info('COLLISION: ships moving towards each other! {} and {}'.format(ship.id, moved_ship.id))
-        logging.info('COLLISION: ship angle {} moved_ship angle {}'.format(ship_movement_angle, moved_ship_angle))
+        botlog.COLLISION.info('COLLISION: ships moving towards each other! %s and %s', ship.id, moved_ship.id)
+        botlog.COLLISION.info('COLLISION: ship angle %s moved_ship angle %s', ship_movement_angle, moved_ship_angle)
         return True
     else:
         return False
@@ -82,20 +83,21 @@ def are_ships_moving_in_same_direction(ship, target, moved_ship):
     angle1 = (ship_movement_angle - moved_ship_angle) % 360
     angle2 = (moved_ship_angle - ship_movement_angle) % 360
     if (min(angle1,angle2)) <= 20:
-        logging.info('COLLISION: ships moving parallel to each other! {} and {}'.format(ship.id, moved_ship.id))
-        logging.info('COLLISION: ship angle {} moved_ship angle {}'.format(ship_movement_angle, moved_ship_angle))
+        botlog.COLLISION.info('COLLISION: ships moving parallel to each other! %s and %s', ship.id, moved_ship.id)
+        botlog.COLLISION.info('COLLISION: ship angle %s moved_ship angle %s', ship_movement_angle, moved_ship_angle)
         return True
     else:
         return False
 
 
-def does_moving_ship_intersect_obstacle(ship, target, obstacle, additional_fudge=0.2, ship_speed=None, ship_angle=None):
-
-    R = ship.radius + obstacle.radius + additional_fudge
+def move_velocity(ship, target, ship_speed=None, ship_angle=None):
+    """
+    The velocity does_moving_ship_intersect_obstacle gives a ship heading for the target, capped at MAX_SPEED
+    unless the speed and angle are given.
 
-    # ship stuff..
-    ax0 = ship.x
-    ay0 = ship.y
+    :return: (vx, vy)
+    :rtype: (float, float)
+    """
     if ship_speed:
         speed_a = ship_speed
     else:
@@ -107,29 +109,80 @@ def does_moving_ship_intersect_obstacle(ship, target, obstacle, additional_fudge
         angle_a = ship_angle
     else:
         angle_a = ship.calculate_angle_between(target)
-    avx = speed_a*math.cos(math.radians(angle_a))
-    avy = speed_a*math.sin(math.radians(angle_a))
+    cos_a, sin_a = geometry.unit(angle_a)
+    return speed_a*cos_a, speed_a*sin_a
 
-    # assume obstacle doesn't move
-    bx0 = obstacle.x
-    by0 = obstacle.y
-    bvx = 0
-    bvy = 0
+
+def obstacle_motion(ship, obstacle, additional_fudge=0.2):
+    """
+    How an obstacle moves this turn and how close the ship can get to it. Ships that already have a thrust move
+    along it and get half the fudge again, everything else stands still.
+
+    :return: (vx, vy, collision radius)
+    :rtype: (float, float, float)
+    """
+    R = ship.radius + obstacle.radius + additional_fudge
     if isinstance(obstacle, Ship):
         if obstacle.pos_eot:
             speed_b = obstacle.speed
             angle_b = obstacle.angle
-            bvx = speed_b*math.cos(math.radians(angle_b))
-            bvy = speed_b*math.sin(math.radians(angle_b))
             R += additional_fudge / 2
+            cos_b, sin_b = geometry.unit(angle_b)
+            return speed_b*cos_b, speed_b*sin_b, R
+    return 0, 0, R
+
+
+def moving_ship_collisions(x, y, vx, vy, obstacle_x, obstacle_y, obstacle_vx, obstacle_vy, reach):
+    """
+    Batch does_moving_ship_intersect_obstacle, the same relative motion quadratic solved for many pairs in one
+    numpy pass. The move and obstacle arguments broadcast against each other, so one move as scalars against
+    arrays of n obstacles gives n results, and m candidate moves as (m, 1) arrays give (m, n).
+
+    :param x: Ship x-coordinate
+    :param y: Ship y-coordinate
+    :param vx: Ship velocity along x for the turn
+    :param vy: Ship velocity along y for the turn
+    :param obstacle_x: Obstacle x-coordinates
+    :param obstacle_y: Obstacle y-coordinates
+    :param obstacle_vx: Obstacle velocities along x
+    :param obstacle_vy: Obstacle velocities along y
+    :param reach: Collision radius of each pair, see obstacle_motion
+    :return: Collision flags and the time of closest approach in [0, 1], nan where there's no collision. Squares
+        are products here and pow in the scalar version, so times can differ from it in the last bit
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    dvx = obstacle_vx - vx
+    dvy = obstacle_vy - vy
+    a = dvx * dvx + dvy * dvy
+    b = 2*(vx - obstacle_vx)*(x - obstacle_x) + 2*(vy - obstacle_vy)*(y - obstacle_y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        min_t = np.minimum(-b / (2*a), 1.0)
+    gap_x = (x + vx * min_t) - (obstacle_x + obstacle_vx * min_t)
+    gap_y = (y + vy * min_t) - (obstacle_y + obstacle_vy * min_t)
+    # the same direction at the same speed never closes in, a negative time means moving apart
+    has_collided = (a != 0) & (min_t >= 0) & (gap_x * gap_x + gap_y * gap_y <= reach * reach)
+    return has_collided, np.where(has_collided, min_t, np.nan)
+
+
+def does_moving_ship_intersect_obstacle(ship, target, obstacle, additional_fudge=0.2, ship_speed=None, ship_angle=None):
+
+    # ship stuff..
+    ax0 = ship.x
+    ay0 = ship.y
+    avx, avy = move_velocity(ship, target, ship_speed, ship_angle)
+
+    # assume obstacle doesn't move
+    bx0 = obstacle.x
+    by0 = obstacle.y
+    bvx, bvy, R = obstacle_motion(ship, obstacle, additional_fudge)
 
     a = ((bvx - avx) ** 2) + ((bvy - avy) ** 2)
     b = 2*(avx - bvx)*(ax0 - bx0) + 2*(avy - bvy)*(ay0 - by0)
     c = ((ax0 - bx0) ** 2) + ((ay0 - by0) ** 2) - (R ** 2)
 
 
-    if ship.id == 15 and isinstance(obstacle, Planet) and obstacle.id == 2:
-        logging.debug('INTERSECTION CALC HERE')
+    if botlog.COLLISION_DEBUG and ship.id == 15 and isinstance(obstacle, Planet) and obstacle.id == 2:
+        botlog.COLLISION.debug('INTERSECTION CALC HERE')
 
     # moving in the same direction same speed
     if (a == 0):
@@ -137,10 +190,10 @@ def does_moving_ship_intersect_obstacle(ship, target, obstacle, additional_fudge
 
     min_t = min(-b / (2*a), 1.0)
 
-    if ship.id == 15 and isinstance(obstacle, Planet) and obstacle.id == 2:
-        logging.debug('INTERSECTION CALC')
-        logging.debug('min_t: {}, a: {}, b: {}, c: {}'.format(min_t, a,b,c))
-        logging.debug('ax0: {}, ay0: {}, speed_a: {}, angle_a: {}'.format(ax0,ay0,speed_a,angle_a))
+    if botlog.COLLISION_DEBUG and ship.id == 15 and isinstance(obstacle, Planet) and obstacle.id == 2:
+        botlog.COLLISION.debug('INTERSECTION CALC')
+        botlog.COLLISION.debug('min_t: %s, a: %s, b: %s, c: %s', min_t, a, b, c)
+        botlog.COLLISION.debug('ax0: %s, ay0: %s, avx: %s, avy: %s', ax0, ay0, avx, avy)
 
     # moving away from each other
     if min_t < 0:
@@ -169,6 +222,68 @@ def does_moving_ship_intersect_obstacle(ship, target, obstacle, additional_fudge
     #    return False, 2
 
 
+def does_moving_ship_intersect_capsule(ship, target, capsule, additional_fudge=0.2):
+    """
+    Swept circle against a static capsule, a segment with a radius. Like does_moving_ship_intersect_obstacle the
+    ship collides when its closest approach over the turn is within reach, and not when it's moving away.
+
+    :param Entity ship: The moving ship
+    :param Entity target: Where it's going
+    :param capsule: (x0, y0, x1, y1, radius) of the capsule
+    :return: Whether they collide and the time of closest approach
+    :rtype: (bool, float)
+    """
+    x0, y0, x1, y1, radius = capsule
+    R = ship.radius + radius + additional_fudge
+
+    avx, avy = move_velocity(ship, target)
+
+    # closest points of the ship's path ship + t*v and the segment start + s*e, t and s in [0, 1]
+    ex = x1 - x0
+    ey = y1 - y0
+    rx = ship.x - x0
+    ry = ship.y - y0
+    a = avx * avx + avy * avy
+    e = ex * ex + ey * ey
+    f = ex * rx + ey * ry
+    if a == 0:
+        return False, None
+    b = avx * ex + avy * ey
+    c = avx * rx + avy * ry
+    if e == 0:
+        s = 0
+        t = min(max(-c / a, 0), 1)
+    else:
+        denominator = a * e - b * b
+        if denominator > 1e-9 * a * e:
+            t = min(max((b * f - c * e) / denominator, 0), 1)
+            s = (b * t + f) / e
+        else:
+            # parallel, the gap along the segment is what closes so go for the end it closes on
+            s = 1 if b > 0 else 0
+        if s <= 0:
+            s = 0
+            t = min(max(-c / a, 0), 1)
+        elif s >= 1:
+            s = 1
+            t = min(max((b - c) / a, 0), 1)
+
+    def distance2(t, s):
+        return (rx + avx * t - s * ex) ** 2 + (ry + avy * t - s * ey) ** 2
+
+    # closest at the start, the ship may still be closing in on one of the ends as it slides along
+    if t <= 0:
+        ends = [(-c / a, 0), ((b - c) / a, 1)]
+        closing = [(min(t, 1), s) for t, s in ends if t > 0]
+        if not closing:
+            return False, None
+        t, s = min(closing, key=lambda end: distance2(*end))
+
+    if distance2(t, s) > R ** 2:
+        return False, None
+    return True, t
+
+
 def intersection_two_moving_ships(ship, target, moved_ship):
 
     if moved_ship.pos_eot.x > moved_ship.x:
@@ -191,7 +306,7 @@ def intersection_two_moving_ships(ship, target, moved_ship):
             grad_a = ((a1.y - a0.y) / (a1.x - a0.x))
             y = a0.y + grad_a * (x - a0.x)
         else:
-            logging.info('INTERSECTING SHIPS: EDGE CASE returning own position!')
+            botlog.COLLISION.info('INTERSECTING SHIPS: EDGE CASE returning own position!')
             return Position(ship.x, ship.y)
 
     elif a1.x == a0.x:
@@ -200,7 +315,7 @@ def intersection_two_moving_ships(ship, target, moved_ship):
             grad_b = ((b1.y - b0.y) / (b1.x - b0.x))
             y = b0.y + grad_b * (x - b0.x)
         else:
-            logging.info('INTERSECTING SHIPS: EDGE CASE returning own position!')
+            botlog.COLLISION.info('INTERSECTING SHIPS: EDGE CASE returning own position!')
             return Position(ship.x, ship.y)
     else:
         grad_b = (b1.y - b0.y) / (b1.x - b0.x)
@@ -209,36 +324,37 @@ def intersection_two_moving_ships(ship, target, moved_ship):
             x = (b0.y - a0.y + (grad_a*a0.x) - (grad_b*b0.x)) / (grad_a - grad_b)
             y = a0.y + grad_a * (x - a0.x)
         else:
-            logging.info('INTERSECTING SHIPS: EDGE CASE returning own position!')
+            botlog.COLLISION.info('INTERSECTING SHIPS: EDGE CASE returning own position!')
             return Position(ship.x, ship.y)
     intersection = Position(x, y)
 
-    logging.info('ship: {}'.format(ship))
-    logging.info('target: {}'.format(target))
-    logging.info('moved_ship: {}'.format(moved_ship))
-    logging.info('moved_ship eot: {}'.format(moved_ship.pos_eot))
-    logging.info('a0:{}, a1:{}'.format(a0,a1))
-    logging.info('b0:{}, b1:{}'.format(b0,b1))
-    logging.info('intersection:{}'.format(intersection))
+    if botlog.COLLISION_INFO:
+        botlog.COLLISION.info('ship: %s', ship)
+        botlog.COLLISION.info('target: %s', target)
+        botlog.COLLISION.info('moved_ship: %s', moved_ship)
+        botlog.COLLISION.info('moved_ship eot: %s', moved_ship.pos_eot)
+        botlog.COLLISION.info('a0:%s, a1:%s', a0, a1)
+        botlog.COLLISION.info('b0:%s, b1:%s', b0, b1)
+        botlog.COLLISION.info('intersection:%s', intersection)
 
     if x <= b0.x:
         intersection = b0
         angle = intersection.calculate_angle_between(b1)
-        logging.info('adj intersection:{}'.format(intersection))
+        botlog.COLLISION.info('adj intersection:%s', intersection)
     elif x >= b1.x:
         intersection = b1
         angle = intersection.calculate_angle_between(b0)
-        logging.info('adj intersection:{}'.format(intersection))
+        botlog.COLLISION.info('adj intersection:%s', intersection)
     else:
         angle = intersection.calculate_angle_between(b0)
 
     target1 = intersection.get_position(1.3, (angle + 90) % 360)
     target2 = intersection.get_position(1.3, (angle - 90) % 360)
     if ship.is_target1_nearer(target1, target2):
-        logging.info('target:{}'.format(target1))
+        botlog.COLLISION.info('target:%s', target1)
         return target1
     else:
-        logging.info('target:{}'.format(target2))
+        botlog.COLLISION.info('target:%s', target2)
         return target2
 
 
@@ -254,7 +370,7 @@ def get_speed_and_angle_around_moving_ship(ship, target, moving_ship):
         has_collided, collision_time = does_moving_ship_intersect_obstacle(ship, target, moving_ship,
                                                                            ship_speed=adjusted_speed, ship_angle=angle)
         if not has_collided:
-            logging.info('AVOID MOVING SHIP: ship moving parallel with new angle {}'.format(angle))
+            botlog.COLLISION.info('AVOID MOVING SHIP: ship moving parallel with new angle %s', angle)
             return adjusted_speed, angle
 
     # try moving to intersection
@@ -263,7 +379,7 @@ def get_speed_and_angle_around_moving_ship(ship, target, moving_ship):
     adjusted_speed = int(min(constants.MAX_SPEED, ship.calculate_distance_between(new_target)))
     has_collided, collision_time = does_moving_ship_intersect_obstacle(ship, target, moving_ship, ship_speed=adjusted_speed, ship_angle=angle)
     if not has_collided:
-        logging.info('AVOID MOVING SHIP: ship moving to intersection {}'.format(new_target))
+        botlog.COLLISION.info('AVOID MOVING SHIP: ship moving to intersection %s', new_target)
         return adjusted_speed, angle
 
     # get collision time
@@ -273,7 +389,7 @@ def get_speed_and_angle_around_moving_ship(ship, target, moving_ship):
     slower_speed = int(collision_time * min(distance_to_target, constants.MAX_SPEED))
     has_collided, collision_time = does_moving_ship_intersect_obstacle(ship, target, moving_ship, ship_speed=slower_speed)
     if not has_collided:
-        logging.info('AVOID MOVING SHIP: ship slowing down to {}'.format(slower_speed))
+        botlog.COLLISION.info('AVOID MOVING SHIP: ship slowing down to %s', slower_speed)
         return slower_speed, angle_to_target
 
     if are_ships_moving_toward_each_other(ship, target, moving_ship):
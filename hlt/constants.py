@@ -30,6 +30,16 @@ MOVE_AND_FIRE_RADIUS = WEAPON_RADIUS + MAX_SPEED
 NEARBY_RADIUS = WEAPON_RADIUS + 2 * MAX_SPEED
 #: Docking check radius
 DOCK_CHECK_RADIUS = 3 * MAX_SPEED
+#: Targets further than this that are blocked by a planet get routed through the waypoint graph
+ROUTING_MIN_DISTANCE = 3 * MAX_SPEED
+#: Ships closer than this to their target navigate normally instead of following a flow field
+FLOW_FIELD_MIN_DISTANCE = 3 * MAX_SPEED
+#: Ships with an enemy this close navigate normally instead of following a flow field
+FLOW_FIELD_ENEMY_RADIUS = 2 * NEARBY_RADIUS
+#: Default navigation engine, 'tangent' steers around the first obstacle, 'sampling' scores every thrust
+NAVIGATION_ENGINE = 'tangent'
+#: How far past the radius of interest a ship's neighbour list reaches, it's rebuilt after travelling half of this
+NEIGHBOR_SKIN = 4 * MAX_SPEED
 
 # Defines how we want to play this turn
 class BotStrategy(Enum):
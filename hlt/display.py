@@ -95,10 +95,8 @@ class Display():
         self.screen.blit(label, self._scale_point((0, 0)))
 
         for player in self.game_map.all_players():
-            docked = len([ship for ship in player.all_ships() if ship.is_docked()])
-            undocked = len(player.all_ships()) - docked
-            hp = sum([ship.health for ship in player.all_ships() if not ship.is_docked()])
-            score_str = '{} num ships: {}, docked: {}, undocked:{}, hp: {}'.format(player.id, len(player.all_ships()), docked, undocked, hp)
+            score_str = '{} num ships: {}, docked: {}, undocked:{}, hp: {}'.format(
+                player.id, player.num_ships, player.num_docked_ships, player.num_undocked_ships, player.undocked_health)
             label = myfont.render(score_str, 1, (0, 0, 0))
             self.screen.blit(label, self._scale_point((0, (1 + player.id) * 10)))
             for p in player.all_ships():
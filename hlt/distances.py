@@ -0,0 +1,113 @@
+import numpy as np
+
+from . import entity
+
+
+class DistanceMatrix:
+    """
+    Centre to centre distances, squared distances and angles between every pair of ships and planets in one frame.
+    Rows are the frame's ship rows followed by its planet rows. Each matrix is filled with one numpy broadcast the
+    first time it's needed in a turn, after which a lookup is a couple of dict and array reads.
+
+    Ships and planets don't move mid turn, only pos_eot does, so the matrices hold all turn. Anything that isn't a
+    frame ship or planet (clusters, positions, end of turn positions) falls back to the entity's own methods.
+    """
+
+    def __init__(self, frame):
+        """
+        :param frame.FrameArrays frame: The parsed frame
+        """
+        self._xs = np.concatenate((frame.ship_x, frame.planet_x))
+        self._ys = np.concatenate((frame.ship_y, frame.planet_y))
+        self._ship_row = frame.ship_row
+        num_ships = frame.num_ships()
+        self._planet_row = {planet_id: num_ships + row for planet_id, row in frame.planet_row.items()}
+        self._distance2 = None
+        self._distance = None
+        self._angle = None
+        # distances from every row to a point keyed by (x, y), see to_point
+        self._point_distances = {}
+
+    def _row(self, target):
+        if type(target) is entity.Ship:
+            return self._ship_row.get(target.id)
+        if type(target) is entity.Planet:
+            return self._planet_row.get(target.id)
+        return None
+
+    def distance2_matrix(self):
+        """
+        :return: (rows, rows) squared distances
+        :rtype: numpy.ndarray
+        """
+        if self._distance2 is None:
+            dx = self._xs[np.newaxis, :] - self._xs[:, np.newaxis]
+            dy = self._ys[np.newaxis, :] - self._ys[:, np.newaxis]
+            self._distance2 = dx * dx + dy * dy
+        return self._distance2
+
+    def distance_matrix(self):
+        """
+        :return: (rows, rows) distances
+        :rtype: numpy.ndarray
+        """
+        if self._distance is None:
+            self._distance = np.sqrt(self.distance2_matrix())
+        return self._distance
+
+    def angle_matrix(self):
+        """
+        :return: (rows, rows) angle in degrees from the row entity to the column entity, in [0, 360)
+        :rtype: numpy.ndarray
+        """
+        if self._angle is None:
+            dx = self._xs[np.newaxis, :] - self._xs[:, np.newaxis]
+            dy = self._ys[np.newaxis, :] - self._ys[:, np.newaxis]
+            self._angle = np.degrees(np.arctan2(dy, dx)) % 360
+        return self._angle
+
+    def distance2(self, source, target):
+        """
+        Same as source.calculate_distance_sq_between(target)
+        """
+        row, column = self._row(source), self._row(target)
+        if row is None or column is None:
+            return source.calculate_distance_sq_between(target)
+        return float(self.distance2_matrix()[row, column])
+
+    def distance(self, source, target):
+        """
+        Same as source.calculate_distance_between(target)
+        """
+        row, column = self._row(source), self._row(target)
+        if row is None or column is None:
+            return source.calculate_distance_between(target)
+        return float(self.distance_matrix()[row, column])
+
+    def angle(self, source, target):
+        """
+        Same as source.calculate_angle_between(target)
+        """
+        row, column = self._row(source), self._row(target)
+        if row is None or column is None:
+            return source.calculate_angle_between(target)
+        return float(self.angle_matrix()[row, column])
+
+    def to_point(self, source, point):
+        """
+        Distance from an entity to a fixed point such as a centroid or the middle of the map. The distances from
+        every row to the point are worked out together the first time the point is asked for.
+
+        :param entity.Entity source: The entity
+        :param entity.Entity point: The point, only its coordinates are used
+        :return: Same as source.calculate_distance_between(point)
+        :rtype: float
+        """
+        row = self._row(source)
+        if row is None:
+            return source.calculate_distance_between(point)
+        key = (point.x, point.y)
+        distances = self._point_distances.get(key)
+        if distances is None:
+            distances = self._point_distances[key] = np.sqrt((self._xs - point.x) ** 2 + (self._ys - point.y) ** 2)
+        return float(distances[row])
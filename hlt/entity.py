@@ -1,9 +1,8 @@
-import logging
 import abc
 import math
 from enum import Enum
 from operator import attrgetter
-from . import constants, collision
+from . import botlog, constants, collision, geometry, thrustsearch
 
 
 class Entity:
@@ -91,8 +90,11 @@ class Entity:
         if isinstance(target, Ship):
             if target.pos_eot:
                 if self.is_target1_nearer(target.pos_eot, target):
-                    return self.calculate_distance_sq_between(self.closest_point_to(target.pos_eot, min_distance=1))
-        return self.calculate_distance_sq_between(self.closest_point_to(target, min_distance=0.5, shortest_dist=True))
+                    x, y = geometry.point_towards(target.pos_eot.x, target.pos_eot.y, self.x, self.y,
+                                                  target.pos_eot.radius + 1)
+                    return geometry.distance2(self.x, self.y, x, y)
+        x, y = geometry.point_towards(target.x, target.y, self.x, self.y, target.radius + 0.5)
+        return geometry.distance2(self.x, self.y, x, y)
 
 
     def calculate_angle_between(self, target):
@@ -115,16 +117,20 @@ class Entity:
         :return: The closest point's coordinates
         :rtype: Position
         """
-        angle = target.calculate_angle_between(self)
+        return Position(*self.closest_xy_to(target, min_distance, shortest_dist))
+
+    def closest_xy_to(self, target, min_distance=0.5, shortest_dist=False):
+        """
+        closest_point_to as an (x, y) tuple
+        """
         if not shortest_dist:
             if isinstance(target, Ship):
                 if target.is_docked():
                     angle = (target.calculate_angle_between(target.planet) + 180) % 360
-        radius = target.radius + min_distance
-        x = target.x + radius * math.cos(math.radians(angle))
-        y = target.y + radius * math.sin(math.radians(angle))
-
-        return Position(x, y)
+                    cos, sin = geometry.unit(angle)
+                    radius = target.radius + min_distance
+                    return target.x + radius * cos, target.y + radius * sin
+        return geometry.point_towards(target.x, target.y, self.x, self.y, target.radius + min_distance)
 
     def get_anticipated_position(self, ship, speed):
         """
@@ -145,11 +151,10 @@ class Entity:
 
         :rtype: Position
         """
-        dx = math.cos(math.radians(angle)) * speed
-        dy = math.sin(math.radians(angle)) * speed
+        x, y = geometry.offset(self.x, self.y, speed, angle)
         if rounded:
-            return Position(round(self.x + dx), round(self.y + dy))
-        return Position((self.x + dx), (self.y + dy))
+            return Position(round(x), round(y))
+        return Position(x, y)
 
     def add_approaching_friendly(self, ship, set_full=False):
         """
@@ -229,10 +234,19 @@ class Planet(Entity):
         self.y = y
         self.radius = radius
         self.num_docking_spots = docking_spots
+        self._update(hp, current, remaining, owned, owner, docked_ships)
+
+    def _update(self, hp, current, remaining, owned, owner, docked_ships):
+        """
+        Refresh the planet in place with this turn's values from the engine.
+        Position, radius and docking spots never change so they're only set once.
+        """
         self.current_production = current
         self.remaining_resources = remaining
         self.health = hp
         self.owner = owner if bool(int(owned)) else None
+        # the owner gets overwritten mid turn, keep the engine's for the turn delta
+        self._frame_owner = self.owner
         self._docked_ship_ids = docked_ships
         self._docked_ships = {}
         self.num_approaching_friendlies = 0
@@ -321,50 +335,65 @@ class Planet(Entity):
                 self._docked_ships[ship] = self.owner.get_ship(ship)
 
     @staticmethod
-    def _parse_single(tokens):
+    def _parse_single(tokens, cursor, known_planets, delta):
         """
         Parse a single planet given tokenized input from the game environment.
+        Planets we've already seen are updated in place rather than rebuilt.
 
-        :return: The planet ID, planet object, and unused tokens.
-        :rtype: (int, Planet, list[str])
+        :param list[str] tokens: The tokenized input
+        :param int cursor: Index of the first token of this planet
+        :param dict[int, Planet] known_planets: Planets from the previous turn keyed by id
+        :param game_map.TurnDelta delta: Collects what changed since the previous turn
+        :return: The planet ID, planet object, and index of the next unused token.
+        :rtype: (int, Planet, int)
         """
         (plid, x, y, hp, r, docking, current, remaining,
-         owned, owner, num_docked_ships, *remainder) = tokens
+         owned, owner, num_docked_ships) = tokens[cursor:cursor + 11]
+        cursor += 11
 
         plid = int(plid)
-        docked_ships = []
-
-        for _ in range(int(num_docked_ships)):
-            ship_id, *remainder = remainder
-            docked_ships.append(int(ship_id))
-
-        planet = Planet(int(plid),
-                        float(x), float(y),
-                        int(hp), float(r), int(docking),
-                        int(current), int(remaining),
-                        bool(int(owned)), int(owner),
-                        docked_ships)
+        num_docked_ships = int(num_docked_ships)
+        docked_ships = [int(ship_id) for ship_id in tokens[cursor:cursor + num_docked_ships]]
+        cursor += num_docked_ships
+
+        planet = known_planets.get(plid)
+        if planet is None:
+            planet = Planet(plid,
+                            float(x), float(y),
+                            int(hp), float(r), int(docking),
+                            int(current), int(remaining),
+                            bool(int(owned)), int(owner),
+                            docked_ships)
+        else:
+            owned = bool(int(owned))
+            owner = int(owner)
+            delta.record_planet(planet, owner if owned else None)
+            planet._update(int(hp), int(current), int(remaining),
+                           owned, owner,
+                           docked_ships)
 
-        return plid, planet, remainder
+        return plid, planet, cursor
 
     @staticmethod
-    def _parse(tokens):
+    def _parse(tokens, cursor, known_planets, delta):
         """
         Parse planet data given a tokenized input.
 
         :param list[str] tokens: The tokenized input
-        :return: the populated planet dict and the unused tokens.
-        :rtype: (dict, list[str])
-        """
-        num_planets, *remainder = tokens
-        num_planets = int(num_planets)
+        :param int cursor: Index of the planet count token
+        :param dict[int, Planet] known_planets: Planets from the previous turn keyed by id
+        :param game_map.TurnDelta delta: Collects what changed since the previous turn
+        :return: the populated planet dict and the index of the next unused token.
+        :rtype: (dict, int)
+        """
+        num_planets = int(tokens[cursor])
+        cursor += 1
         planets = {}
 
         for _ in range(num_planets):
-            plid, planet, remainder = Planet._parse_single(remainder)
-            planets[plid] = planet
+            plid, planets[plid], cursor = Planet._parse_single(tokens, cursor, known_planets, delta)
 
-        return planets, remainder
+        return planets, cursor
 
 
 class Ship(Entity):
@@ -390,21 +419,46 @@ class Ship(Entity):
     def __init__(self, player_id, ship_id, x, y, hp, vel_x, vel_y,
                  docking_status, planet, progress, cooldown):
         self.id = ship_id
+        self.radius = constants.SHIP_RADIUS
+        # FOR ENEMIES
+        self.is_enemy = False
+        # FOR FRIENDLIES
+        self.is_mine = False
+        self.is_clumped = False
+        self.clump_id = None
+        self.mission_target = None
+        self.last_engaged_target = None
+        self.last_engaged_target_hp = None
+        self.last_ship_target = None
+        self.last_ship_target_sq_dist = None
+        # PATHING CACHING
+        self.obs_avoid_direction = None
+        self.target = None
+        self._update(player_id, x, y, hp, vel_x, vel_y, docking_status, planet, progress, cooldown)
+
+    def _update(self, player_id, x, y, hp, vel_x, vel_y, docking_status, planet, progress, cooldown):
+        """
+        Refresh the ship in place with this turn's values from the engine. Anything we
+        track across turns (clusters, mission targets) is kept, per turn calculations are reset.
+        """
         self.x = x
         self.y = y
         self.vel_x = vel_x
         self.vel_y = vel_y
         self.owner = player_id
-        self.radius = constants.SHIP_RADIUS
         self.health = hp
         self.docking_status = docking_status
+        # health and docking status get overwritten mid turn, keep the engine's for the turn delta
+        self._frame_health = hp
+        self._frame_docking_status = docking_status
         self.planet = planet if (docking_status is not Ship.DockingStatus.UNDOCKED) else None
         self._docking_progress = progress
+        self.turn_assigned_target = None
+        self.reset_turn_calculations()
+
+    def reset_turn_calculations(self):
         self.weapon_cooldown = False
-        # for BOTH
-        self.ship_neighbors_flag = False
         # FOR ENEMIES
-        self.is_enemy = False
         self.num_approaching_friendlies = 0
         self.approaching_ship_health = 0
         self.proximity_discount = 0
@@ -416,49 +470,6 @@ class Ship(Entity):
         self.friends_engaged_this_turn = []
         self.distance_to_my_centroid = 10000
         self.is_top_target = False
-        # FOR FRIENDLIES
-        self.updated_this_turn = True
-        self.is_mine = False
-        self.is_clumped = False
-        self.clump_id = None
-        self.mission_target = None
-        self.distance_to_enemy = None
-        self.aggress_flag = False
-        self.turn_assigned_target = None
-        self.speed = None
-        self.angle = None
-        self.last_engaged_target = None
-        self.last_engaged_target_hp = None
-        self.last_ship_target = None
-        self.last_ship_target_sq_dist = None
-        self.reset_turn_calculations()
-        # PATHING CACHING
-        self.obs_avoid_direction = None
-        self.target = None
-
-    def update_ship(self, ship):
-        """
-        Update our cached ship with new ship stuff from game_map
-        :param ship: ship from game_map
-        :return: nothing
-        """
-        self.reset_turn_calculations()
-        self.id = ship.id
-        self.x = ship.x
-        self.y = ship.y
-        self.vel_x = ship.vel_x
-        self.vel_y = ship.vel_y
-        self.owner = ship.owner
-        self.health = ship.health
-        self.docking_status = ship.docking_status
-        self.planet = ship.planet if (ship.docking_status is not Ship.DockingStatus.UNDOCKED) else None
-        self._docking_progress = ship._docking_progress
-        self.weapon_cooldown = False
-        self.updated_this_turn = True
-        self.distance_to_enemy = ship.distance_to_enemy
-        self.turn_assigned_target = None
-
-    def reset_turn_calculations(self):
         # FOR FRIENDLIES
         self.distance_to_enemy = None
         self.has_target = False
@@ -555,11 +566,13 @@ class Ship(Entity):
 
 
     def navigate_new(self, target, game_map, ignore_ships=False, ignore_planets=False, return_type='default',
-                ignore_entities=[], additional_fudge=0.2, ignore_enemies=False, min_speed=None, force_zero=False, is_engage=False):
+                ignore_entities=[], additional_fudge=0.2, ignore_enemies=False, min_speed=None, force_zero=False, is_engage=False,
+                engine=constants.NAVIGATION_ENGINE):
         """
         Navigate to a certain target (Entity). Decide what to do based on what entity it is.
-        If we hit obstacles we navigate around on either tangents - if we still hit an obstacle
-        after that we give up.
+        With the 'tangent' engine, if we hit obstacles we navigate around on either tangents - if we still
+        hit an obstacle after that we give up. The 'sampling' engine scores every thrust at once instead,
+        see thrustsearch.search_thrust.
         """
         if isinstance(target, Planet):
             min_dist = 1 if not ignore_planets else 0
@@ -587,15 +600,16 @@ class Ship(Entity):
                 if (distance_from_my_docked > constants.WEAPON_RADIUS ** 2) and (distance_from_my_docked <= 8 * constants.MAX_SPEED):
                     angle_from_my_docked = target.my_docked_target.calculate_angle_between(target)
                     if (len(game_map.get_me().all_ships()) <= 5):
-                        logging.info('NAVIGATION: intercepting enemy ship {}, my docked {}'.format(target, target.my_docked_target))
+                        botlog.NAVIGATION.info('NAVIGATION: intercepting enemy ship %s, my docked %s', target, target.my_docked_target)
                         target = target.my_docked_target.get_position(1.2, angle_from_my_docked)
                         #target = self.closest_point_to(target.my_docked_target)
                     else:
                         if not self.is_target_nearer_than(target, constants.MOVE_AND_FIRE_RADIUS):
                             target = target.my_docked_target.get_position(0.85 * math.sqrt(distance_from_my_docked), angle_from_my_docked)
 
-        distance = self.calculate_distance_between(self.closest_point_to(target, min_dist))
-        angle = self.calculate_angle_between(self.closest_point_to(target, min_dist))
+        closest_x, closest_y = self.closest_xy_to(target, min_dist)
+        distance = math.sqrt(geometry.distance2(self.x, self.y, closest_x, closest_y))
+        angle = geometry.angle_between(self.x, self.y, closest_x, closest_y)
         if distance <= 1.005:
             force_zero = True
 
@@ -604,50 +618,90 @@ class Ship(Entity):
             else Planet if (ignore_planets and not ignore_ships) \
             else Entity
 
-        logging.info('NAVIGATION: self: {}, target: {}, angle: {}, distance: {}'.format(self,target,angle,distance))
+        botlog.NAVIGATION.info('NAVIGATION: self: %s, target: %s, angle: %s, distance: %s', self, target, angle, distance)
 
         speed = min(distance, constants.MAX_SPEED)
         look_ahead = min(distance, 2.5 * speed)
 
         position_to_move_to = self.get_position(look_ahead, angle)
 
+        if engine == 'sampling':
+            destination = Position(closest_x, closest_y)
+            if distance > constants.ROUTING_MIN_DISTANCE and game_map.routes and not issubclass(Planet, ignore):
+                # sampling only looks one turn ahead, far away targets behind a planet go through the waypoints.
+                # Only planets decide that, the search itself covers the ships and tethers
+                planets_by_time = game_map.obstacles_between(self, target, position_to_move_to, Ship,
+                                                             additional_fudge=additional_fudge)
+                if any(planet not in ignore_entities for planets in planets_by_time.values() for planet in planets):
+                    waypoint = game_map.routes.get_waypoint(self.x, self.y, destination.x, destination.y)
+                    if waypoint:
+                        destination = Position(*waypoint)
+            margin = (0.5 + self.radius) if isinstance(self, ShipCluster) else 0
+            move = thrustsearch.search_thrust(self, destination, game_map, ignore, ignore_entities=ignore_entities,
+                                              additional_fudge=additional_fudge, min_speed=min_speed, margin=margin)
+            botlog.NAVIGATION.info('NAVIGATION END: ship_id:%s, x:%s, y:%s, sampled move:%s', self.id, self.x, self.y, move)
+            if move is None:
+                return None
+            speed, angle = move
+            if (return_type == 'default'):
+                return self.thrust(speed, angle, force_zero=force_zero)
+            else:
+                return [speed, angle]
+
         obstacle = game_map.get_closest_obstacle(self, target, position_to_move_to, ignore,
                                                  ignore_entities = ignore_entities, additional_fudge=additional_fudge)
+        if isinstance(obstacle, Planet) and distance > constants.ROUTING_MIN_DISTANCE and game_map.routes:
+            # far away and a planet in the way, head for the next waypoint around the planets instead
+            waypoint = game_map.routes.get_waypoint(self.x, self.y, closest_x, closest_y)
+            if waypoint:
+                waypoint = Position(*waypoint)
+                waypoint_distance = self.calculate_distance_between(waypoint)
+                waypoint_angle = self.calculate_angle_between(waypoint)
+                waypoint_position = self.get_position(min(look_ahead, waypoint_distance), waypoint_angle)
+                if waypoint_distance >= 1 and not game_map.get_closest_obstacle(
+                        self, waypoint, waypoint_position, ignore, ignore_entities=ignore_entities,
+                        additional_fudge=additional_fudge):
+                    botlog.NAVIGATION.info('NAVIGATION: routing around %s through waypoint %s', obstacle, waypoint)
+                    obstacle = None
+                    angle = waypoint_angle
+                    # don't cut the corner past the waypoint
+                    speed = min(speed, waypoint_distance)
         if obstacle:
-            logging.info('NAVIGATION: obstacle: {}'.format(obstacle))
+            botlog.NAVIGATION.info('NAVIGATION: obstacle: %s', obstacle)
             speed, angle, force_zero = self.get_adjusted_angle_thrust(position_to_move_to, obstacle, game_map, initial_target=target, additional_fudge=additional_fudge)
-            logging.info('NAVIGATION: got adjusted speed {} and angle {} around obstacle'.format(speed, angle))
+            botlog.NAVIGATION.info('NAVIGATION: got adjusted speed %s and angle %s around obstacle', speed, angle)
             if angle == None:
                 return None
 
         # corner correction
-        final_target = self.get_position(speed, angle)
+        final_x, final_y = geometry.offset(self.x, self.y, speed, angle)
         radius = (0.5 + self.radius) if isinstance(self, ShipCluster) else 0
-        if((final_target.x < radius) or (final_target.x > (game_map.width - radius)) or
-                (final_target.y < radius) or (final_target.y > (game_map.height - radius))):
+        if((final_x < radius) or (final_x > (game_map.width - radius)) or
+                (final_y < radius) or (final_y > (game_map.height - radius))):
             #logging.debug('Going out of map.. {}'.format(final_target))
-            corners_list = [Position(radius, radius),
-                            Position(game_map.width - radius, radius),
-                            Position(radius, game_map.height - radius),
-                            Position(game_map.width - radius, game_map.height - radius)]
+            corners_list = [(radius, radius),
+                            (game_map.width - radius, radius),
+                            (radius, game_map.height - radius),
+                            (game_map.width - radius, game_map.height - radius)]
+            final_angle = geometry.angle_between(self.x, self.y, final_x, final_y)
             corners_by_dist = {}
-            for position in corners_list:
-                if not position.is_target_nearer_than(target, 1.3 * constants.MAX_SPEED):
-                    angle1 = (self.calculate_angle_between(final_target) - self.calculate_angle_between(position)) % 360
-                    angle2 = (self.calculate_angle_between(position) - self.calculate_angle_between(final_target)) % 360
+            for corner_x, corner_y in corners_list:
+                if geometry.distance2(corner_x, corner_y, target.x, target.y) > (1.3 * constants.MAX_SPEED) ** 2:
+                    corner_angle = geometry.angle_between(self.x, self.y, corner_x, corner_y)
+                    angle1 = (final_angle - corner_angle) % 360
+                    angle2 = (corner_angle - final_angle) % 360
                     angular_diff = min(angle1, angle2)
-                    corners_by_dist.setdefault(angular_diff, []).append(position)
+                    corners_by_dist.setdefault(angular_diff, []).append((corner_x, corner_y, corner_angle))
             for angular_diff in sorted(corners_by_dist):
-                final_target = corners_by_dist[angular_diff][0]
+                corner_x, corner_y, angle = corners_by_dist[angular_diff][0]
                 #if self.is_target_nearer_than(final_target, constants.MAX_SPEED):
                 #    continue
-                angle = self.calculate_angle_between(final_target)
-                logging.debug('adjusted_angle {}, corner: {}'.format(angle, final_target))
+                botlog.NAVIGATION.debug('adjusted_angle %s, corner: (%s, %s)', angle, corner_x, corner_y)
                 break
 
         if min_speed:
             speed = max(min_speed, speed)
-        logging.info('NAVIGATION END: ship_id:{}, x:{}, y:{}, speed:{}, angle:{}'.format(self.id, self.x, self.y, speed, angle))
+        botlog.NAVIGATION.info('NAVIGATION END: ship_id:%s, x:%s, y:%s, speed:%s, angle:%s', self.id, self.x, self.y, speed, angle)
         if (return_type == 'default'):
             if obstacle:
                 return self.thrust(speed, angle, force_zero=force_zero)
@@ -688,7 +742,7 @@ class Ship(Entity):
         #logging.info('tangent_angle: {}, clockwise_angle: {}, anticlockwise_angle: {}, close_angle: {}'.format(tangent_angle, clockwise_angle, anticlockwise_angle, close_angle))
 
         if isinstance(obstacle, Planet):
-            logging.info('ADJ_ANGLE: ship: {} avoiding planet: {}'.format(self.id, obstacle.id))
+            botlog.NAVIGATION.info('ADJ_ANGLE: ship: %s avoiding planet: %s', self.id, obstacle.id)
             angle = close_angle
             angular_diff = abs(angle_to_target - angle)
             angular_diff = min(abs(angular_diff - 360), angular_diff)
@@ -700,7 +754,7 @@ class Ship(Entity):
         else:
             if obstacle.is_docked() and \
                     not(obstacle.planet == initial_target):
-                logging.info('ADJ_ANGLE: ship: {} avoiding docked ship: {} docked to :{}'.format(self.id, obstacle.id, obstacle.planet))
+                botlog.NAVIGATION.info('ADJ_ANGLE: ship: %s avoiding docked ship: %s docked to :%s', self.id, obstacle.id, obstacle.planet)
                 obstacle_angle_to_planet = obstacle.calculate_angle_between(obstacle.planet)
                 ship_angle_to_planet = self.calculate_angle_between(obstacle.planet)
                 angle = anticlockwise_angle if ((ship_angle_to_planet - obstacle_angle_to_planet) % 360) <= 180 else clockwise_angle
@@ -713,13 +767,13 @@ class Ship(Entity):
                 if obstacle.owner == game_map.get_me():
                     obstacle = game_map.my_ship_dict[obstacle.id]
                     if obstacle.pos_eot:
-                        logging.info('ADJ_ANGLE: ship: {} avoiding moving friendly: {}'.format(self.id, obstacle.id))
+                        botlog.NAVIGATION.info('ADJ_ANGLE: ship: %s avoiding moving friendly: %s', self.id, obstacle.id)
                         adjusted_speed, angle = collision.get_speed_and_angle_around_moving_ship(self, target, obstacle)
                         if angle == None:
                             return 0,0,True
 
                     else:
-                        logging.info('ADJ_ANGLE: ship: {} avoiding friendly'.format(self.id))
+                        botlog.NAVIGATION.info('ADJ_ANGLE: ship: %s avoiding friendly', self.id)
                         angle = close_angle
                         angular_diff = abs(angle_to_target - angle)
                         angular_diff = min(abs(angular_diff - 360), angular_diff)
@@ -740,7 +794,7 @@ class Ship(Entity):
             if not recursive_call:
                 return self.get_adjusted_angle_thrust(new_target, additional_obstacle, game_map, initial_target=target, recursive_call=True, additional_fudge=additional_fudge)
 
-            logging.info('ADJ_ANGLE: new obstacle: {}'.format(additional_obstacle))
+            botlog.NAVIGATION.info('ADJ_ANGLE: new obstacle: %s', additional_obstacle)
             if isinstance(self, ShipCluster):
                 has_collision, collision_time = collision.does_moving_ship_intersect_obstacle(self, new_target, additional_obstacle)
                 if has_collision:
@@ -791,46 +845,66 @@ class Ship(Entity):
         self.planet = planets.get(self.planet)  # If not will just reset to none
 
     @staticmethod
-    def _parse_single(player_id, tokens):
+    def _parse_single(player_id, tokens, cursor, known_ships, delta):
         """
         Parse a single ship given tokenized input from the game environment.
+        Ships we've already seen are updated in place rather than rebuilt.
 
         :param int player_id: The id of the player who controls the ships
-        :param list[tokens]: The remaining tokens
-        :return: The ship ID, ship object, and unused tokens.
-        :rtype: int, Ship, list[str]
+        :param list[str] tokens: The tokenized input
+        :param int cursor: Index of the first token of this ship
+        :param dict[int, Ship] known_ships: Ships of all players from the previous turn keyed by id
+        :param game_map.TurnDelta delta: Collects what changed since the previous turn
+        :return: The ship ID, ship object, and index of the next unused token.
+        :rtype: int, Ship, int
         """
         (sid, x, y, hp, vel_x, vel_y,
-         docked, docked_planet, progress, cooldown, *remainder) = tokens
+         docked, docked_planet, progress, cooldown) = tokens[cursor:cursor + 10]
 
         sid = int(sid)
         docked = Ship.DockingStatus(int(docked))
 
-        ship = Ship(player_id,
-                    sid,
-                    float(x), float(y),
-                    int(hp),
-                    float(vel_x), float(vel_y),
-                    docked, int(docked_planet),
-                    int(progress), int(cooldown))
+        ship = known_ships.get(sid)
+        if ship is None:
+            ship = Ship(player_id,
+                        sid,
+                        float(x), float(y),
+                        int(hp),
+                        float(vel_x), float(vel_y),
+                        docked, int(docked_planet),
+                        int(progress), int(cooldown))
+            delta.born.append(ship)
+        else:
+            x, y, hp = float(x), float(y), int(hp)
+            delta.record_ship(ship, x, y, hp, docked)
+            ship._update(player_id,
+                         x, y,
+                         hp,
+                         float(vel_x), float(vel_y),
+                         docked, int(docked_planet),
+                         int(progress), int(cooldown))
 
-        return sid, ship, remainder
+        return sid, ship, cursor + 10
 
     @staticmethod
-    def _parse(player_id, tokens):
+    def _parse(player_id, tokens, cursor, known_ships, delta):
         """
         Parse ship data given a tokenized input.
 
         :param int player_id: The id of the player who owns the ships
         :param list[str] tokens: The tokenized input
-        :return: The dict of Players and unused tokens.
-        :rtype: (dict, list[str])
+        :param int cursor: Index of the ship count token
+        :param dict[int, Ship] known_ships: Ships of all players from the previous turn keyed by id
+        :param game_map.TurnDelta delta: Collects what changed since the previous turn
+        :return: The dict of Ships and the index of the next unused token.
+        :rtype: (dict, int)
         """
         ships = {}
-        num_ships, *remainder = tokens
-        for _ in range(int(num_ships)):
-            ship_id, ships[ship_id], remainder = Ship._parse_single(player_id, remainder)
-        return ships, remainder
+        num_ships = int(tokens[cursor])
+        cursor += 1
+        for _ in range(num_ships):
+            ship_id, ships[ship_id], cursor = Ship._parse_single(player_id, tokens, cursor, known_ships, delta)
+        return ships, cursor
 
 class ShipCluster(Ship):
 
@@ -859,7 +933,7 @@ class ShipCluster(Ship):
             position.dist_from_target = position.calculate_distance_between(target)
 
         position_list = sorted(position_list, key=attrgetter('dist_from_target'))
-        logging.debug(position_list)
+        botlog.NAVIGATION.debug('%s', position_list)
         for ship in self.ship_list:
             ship.distance_from_clump_positions = [ship.calculate_distance_between(position) for position in position_list]
 
@@ -903,8 +977,8 @@ class ShipCluster(Ship):
                              Position(self.x - x_move, self.y + spacing),
                              Position(self.x - x_move, self.y - spacing)]
 
-        logging.info('RUSH: self:{}'.format(self))
-        logging.info('RUSH: position_list:{}'.format(position_list))
+        botlog.NAVIGATION.info('RUSH: self:%s', self)
+        botlog.NAVIGATION.info('RUSH: position_list:%s', position_list)
         #assign by furthest ship..
         thrust_list = []
         for ship in self.ship_list:
@@ -943,8 +1017,8 @@ class ShipCluster(Ship):
                              Position(self.x + 0.5 - spacing, self.y - y_move)]
             self.ship_list = sorted(self.ship_list, key=attrgetter('y'), reverse=True)
 
-        logging.info('RUSH: self:{}'.format(self))
-        logging.info('RUSH: position_list:{}'.format(position_list))
+        botlog.NAVIGATION.info('RUSH: self:%s', self)
+        botlog.NAVIGATION.info('RUSH: position_list:%s', position_list)
         #assign by furthest ship..
         thrust_list = []
         if game_map.turn_num == 1:
@@ -992,7 +1066,7 @@ class ShipCluster(Ship):
             position.dist_from_target = position.calculate_distance_between(target)
 
         position_list = sorted(position_list, key=attrgetter('dist_from_target'))
-        logging.debug(position_list)
+        botlog.NAVIGATION.debug('%s', position_list)
         for ship in self.ship_list:
             ship.distance_from_clump_positions = [ship.calculate_distance_between(position) for position in position_list]
 
@@ -1007,8 +1081,7 @@ class ShipCluster(Ship):
 
         self.is_clumped = True
         self.update_state()
-        logging.debug(
-            'clumping for rush, ships {}'.format(self.ship_list))
+        botlog.NAVIGATION.debug('clumping for rush, ships %s', self.ship_list)
         return thrust_list
 
 
@@ -1018,7 +1091,7 @@ class ShipCluster(Ship):
         position_list = [Position(self.x, self.y).get_position(spacing, angle_between_ships),
                          Position(self.x, self.y).get_position(spacing, (angle_between_ships + 180) % 360)]
 
-        logging.debug(position_list)
+        botlog.NAVIGATION.debug('%s', position_list)
         for ship in self.ship_list:
             ship.distance_from_clump_positions = [ship.calculate_distance_between(position) for position in position_list]
 
@@ -1058,7 +1131,7 @@ class ShipCluster(Ship):
         ship.clump_id = None
         if ship in self.ship_list:
             self.ship_list.remove(ship)
-            logging.debug('Ship id: {} removed from clump {}'.format(ship.id, self.id))
+            botlog.NAVIGATION.debug('Ship id: %s removed from clump %s', ship.id, self.id)
             self.update_state()
 
 class Position(Entity):
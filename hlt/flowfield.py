@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+
+#: Side of a flow field cell
+CELL_SIZE = 4.0
+#: Cells whose centre is closer than this to a planet surface are impassable
+PLANET_MARGIN = 3.0
+#: Free cells within this many cells of the target's surface are seeded with their straight line distance
+SEED_CELLS = 1.5
+#: How many cells down the path a ship aims
+LOOK_AHEAD_CELLS = 3
+
+# neighbour offsets (row, column) and the cost of stepping to them
+_STEPS = [(dy, dx, math.hypot(dx, dy)) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+
+
+class FlowFields:
+    """
+    Per turn cache of flow fields over a coarse grid, one per target cell. A field holds the travel distance from
+    every cell to the target going around the planets, found with a vectorized wavefront, and each cell points
+    at its downhill neighbour. Any number of ships going to the same place then share one field and read their
+    heading in constant time, ships are left to the usual obstacle checks.
+    """
+
+    def __init__(self, planet_clearance, width, height, cell_size=CELL_SIZE):
+        """
+        :param clearance.PlanetClearance planet_clearance: The map's planet clearance
+        :param width: Map width
+        :param height: Map height
+        :param cell_size: Side of a cell
+        """
+        self.planet_clearance = planet_clearance
+        self.cell_size = cell_size
+        self.num_x = int(math.ceil(width / cell_size))
+        self.num_y = int(math.ceil(height / cell_size))
+        self.centre_x = (np.arange(self.num_x) + 0.5) * cell_size
+        self.centre_y = (np.arange(self.num_y) + 0.5) * cell_size
+        self.blocked = None
+        self._fields = {}
+        self.new_turn()
+
+    def new_turn(self):
+        """
+        Drop last turn's fields and pick up destroyed planets.
+
+        :return: nothing
+        """
+        self._fields = {}
+        xs, ys = np.meshgrid(self.centre_x, self.centre_y)
+        self.blocked = self.planet_clearance.clearances(xs, ys) < PLANET_MARGIN
+
+    def _cell(self, x, y):
+        column = min(max(int(x // self.cell_size), 0), self.num_x - 1)
+        row = min(max(int(y // self.cell_size), 0), self.num_y - 1)
+        return row, column
+
+    def _build(self, target):
+        """
+        :param entity.Entity target: Where the field leads
+        :return: Flat index of the next cell on the way to the target for every cell (itself once there or when
+        there's no way), or None if no free cell is near the target
+        :rtype: numpy.ndarray
+        """
+        xs, ys = np.meshgrid(self.centre_x, self.centre_y)
+        straight = np.hypot(xs - target.x, ys - target.y)
+        seeds = (straight <= target.radius + SEED_CELLS * self.cell_size) & ~self.blocked
+        if not seeds.any():
+            return None
+        distance = np.where(seeds, straight / self.cell_size, np.inf)
+
+        # relax all cells against their 8 neighbours until nothing improves
+        padded = np.full((self.num_y + 2, self.num_x + 2), np.inf)
+        while True:
+            padded[1:-1, 1:-1] = distance
+            relaxed = distance
+            for dy, dx, cost in _STEPS:
+                relaxed = np.minimum(relaxed, padded[1 + dy:self.num_y + 1 + dy, 1 + dx:self.num_x + 1 + dx] + cost)
+            relaxed[self.blocked] = np.inf
+            if np.array_equal(relaxed, distance):
+                break
+            distance = relaxed
+
+        padded[1:-1, 1:-1] = distance
+        via = np.stack([padded[1 + dy:self.num_y + 1 + dy, 1 + dx:self.num_x + 1 + dx] + cost
+                        for dy, dx, cost in _STEPS])
+        best = np.argmin(via, axis=0)
+        rows, columns = np.indices(distance.shape)
+        step_y = np.array([dy for dy, _, _ in _STEPS])[best]
+        step_x = np.array([dx for _, dx, _ in _STEPS])[best]
+        # the best neighbour of a free cell is where its distance came from, unless it's a seed. Impassable cells
+        # next to free ones point out of the planet margin so ships that are inside it still get a heading
+        best_via = np.take_along_axis(via, best[np.newaxis], axis=0)[0]
+        downhill = np.isfinite(best_via) & ((best_via <= distance) | self.blocked)
+        return np.where(downhill, (rows + step_y) * self.num_x + columns + step_x, rows * self.num_x + columns).ravel()
+
+    def heading(self, ship, target):
+        """
+        :param entity.Ship ship: The ship to steer
+        :param entity.Entity target: Where it's going
+        :return: Angle in degrees to head in, None if the field can't tell
+        :rtype: int
+        """
+        key = self._cell(target.x, target.y)
+        if key not in self._fields:
+            self._fields[key] = self._build(target)
+        next_cell = self._fields[key]
+        if next_cell is None:
+            return None
+        row, column = self._cell(ship.x, ship.y)
+        cell = start = row * self.num_x + column
+        # aim a few cells down the path rather than at the next one, it smooths out the 45 degree steps
+        for _ in range(LOOK_AHEAD_CELLS):
+            cell = next_cell[cell]
+        if cell == start:
+            return None
+        aim_y, aim_x = divmod(int(cell), self.num_x)
+        return round(math.degrees(math.atan2(self.centre_y[aim_y] - ship.y, self.centre_x[aim_x] - ship.x))) % 360
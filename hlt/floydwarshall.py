@@ -0,0 +1,164 @@
+import logging
+
+import numpy as np
+
+from . import constants
+
+#: Waypoints placed evenly around every planet
+WAYPOINTS_PER_PLANET = 12
+#: Distance of the waypoints from the planet surface
+WAYPOINT_MARGIN = 2.0
+#: Room a leg of a route has to leave between itself and any planet surface
+ROUTE_CLEARANCE = constants.SHIP_RADIUS + 0.3
+
+
+class FloydWarshall:
+    """
+    Calculates floyd warshall shortest pairs over a visibility graph around the planets.
+
+    The nodes are waypoints on a ring just outside every planet, two of them are linked when the straight
+    line between them stays ROUTE_CLEARANCE away from every planet. All pairs shortest paths and next hops
+    are worked out once, after that a route between any two points only has to find which waypoints
+    the two ends can see. Ships are left to the usual obstacle avoidance.
+
+    Planets destroyed later in the game stay in the graph, which keeps routes collision free if not always shortest.
+    """
+
+    def __init__(self, game_map):
+        """
+        :param game_map: The map as of the first frame
+        """
+        self.map_width = game_map.width
+        self.map_height = game_map.height
+        self.planets = game_map.all_planets()
+        self.planet_x = np.array([planet.x for planet in self.planets], dtype=np.float64)
+        self.planet_y = np.array([planet.y for planet in self.planets], dtype=np.float64)
+        self.planet_radius = np.array([planet.radius for planet in self.planets], dtype=np.float64)
+        self.calculate_shortest_paths()
+
+    def get_index(self, x, y):
+        """
+        Helper function to find the waypoint nearest to a point
+        :param x: x coord
+        :param y: y coord
+        :return: index
+        """
+        return int(np.argmin((self.node_x - x) ** 2 + (self.node_y - y) ** 2))
+
+    def get_coords(self, i):
+        """
+        Helper function to convert a waypoint index to its coordinates
+        :param i: waypoint index
+        :return: x, y coords
+        """
+        return float(self.node_x[i]), float(self.node_y[i])
+
+    def _clearance(self, x, y):
+        """
+        :return: Distance from every point to the nearest planet surface
+        :rtype: numpy.ndarray
+        """
+        x = np.asarray(x, dtype=np.float64)[..., np.newaxis]
+        y = np.asarray(y, dtype=np.float64)[..., np.newaxis]
+        return (np.hypot(x - self.planet_x, y - self.planet_y) - self.planet_radius).min(axis=-1, initial=np.inf)
+
+    def _segments_clear(self, x0, y0, x1, y1, clearance=ROUTE_CLEARANCE):
+        """
+        Vectorized over segments, True where a segment keeps clearance away from every planet surface.
+        """
+        x0, y0, x1, y1 = [np.asarray(v, dtype=np.float64)[..., np.newaxis] for v in (x0, y0, x1, y1)]
+        dx = x1 - x0
+        dy = y1 - y0
+        length2 = dx ** 2 + dy ** 2
+        px = self.planet_x - x0
+        py = self.planet_y - y0
+        t = np.clip((px * dx + py * dy) / np.where(length2 > 0, length2, 1), 0, 1)
+        distance = np.hypot(px - t * dx, py - t * dy) - self.planet_radius
+        return (distance >= clearance).all(axis=-1)
+
+    def calculate_shortest_paths(self):
+        """
+        Place the waypoints, link the ones that can see each other and run floyd warshall over them,
+        filling in distance[i, j] and next_hop[i, j] (-1 when j can't be reached from i).
+
+        :return: nothing
+        """
+        logging.debug('starting calculation')
+        logging.debug('map height: %s, map width: %s', self.map_height, self.map_width)
+        angles = np.arange(WAYPOINTS_PER_PLANET) * (2 * np.pi / WAYPOINTS_PER_PLANET)
+        ring = (self.planet_radius + WAYPOINT_MARGIN)[:, np.newaxis]
+        node_x = (self.planet_x[:, np.newaxis] + ring * np.cos(angles)).ravel()
+        node_y = (self.planet_y[:, np.newaxis] + ring * np.sin(angles)).ravel()
+        margin = constants.SHIP_RADIUS + 0.5
+        inside = (node_x >= margin) & (node_x <= self.map_width - margin) & \
+                 (node_y >= margin) & (node_y <= self.map_height - margin)
+        usable = inside & (self._clearance(node_x, node_y) >= ROUTE_CLEARANCE)
+        self.node_x = node_x[usable]
+        self.node_y = node_y[usable]
+        num_nodes = len(self.node_x)
+
+        # one row at a time, all pairs against all planets at once gets big on crowded maps
+        visible = np.array([self._segments_clear(x, y, self.node_x, self.node_y)
+                            for x, y in zip(self.node_x.tolist(), self.node_y.tolist())]).reshape(num_nodes, num_nodes)
+        lengths = np.hypot(self.node_x[np.newaxis, :] - self.node_x[:, np.newaxis],
+                           self.node_y[np.newaxis, :] - self.node_y[:, np.newaxis])
+        distance = np.where(visible, lengths, np.inf)
+        np.fill_diagonal(distance, 0)
+        next_hop = np.where(np.isfinite(distance), np.arange(num_nodes)[np.newaxis, :], -1)
+        logging.debug('finished marking planets, %s waypoints', num_nodes)
+
+        for k in range(num_nodes):
+            via = distance[:, k, np.newaxis] + distance[np.newaxis, k, :]
+            shorter = via < distance
+            distance = np.where(shorter, via, distance)
+            next_hop = np.where(shorter, next_hop[:, k, np.newaxis], next_hop)
+        self.distance = distance
+        self.next_hop = next_hop
+        logging.debug('finished shortest paths')
+
+    def _visible_nodes(self, x, y):
+        """
+        :return: Indices of the waypoints a point can see and how far away they are
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        # a point closer to a planet than ROUTE_CLEARANCE (say a ship that just undocked) may still leave it
+        clearance = min(ROUTE_CLEARANCE, float(self._clearance(x, y)) - 1e-6)
+        visible = np.flatnonzero(self._segments_clear(x, y, self.node_x, self.node_y, clearance))
+        return visible, np.hypot(self.node_x[visible] - x, self.node_y[visible] - y)
+
+    def get_shortest_path(self, from_x, from_y, to_x, to_y):
+        """
+        :return: The waypoints to go through in order, [] if the straight line is clear, None if there's no route
+        :rtype: list[(float, float)]
+        """
+        clearance = min(ROUTE_CLEARANCE, float(self._clearance([from_x, to_x], [from_y, to_y]).min()) - 1e-6)
+        if self._segments_clear(from_x, from_y, to_x, to_y, clearance):
+            return []
+        starts, start_distance = self._visible_nodes(from_x, from_y)
+        ends, end_distance = self._visible_nodes(to_x, to_y)
+        if not len(starts) or not len(ends):
+            return None
+        total = start_distance[:, np.newaxis] + self.distance[np.ix_(starts, ends)] + end_distance[np.newaxis, :]
+        best = np.unravel_index(np.argmin(total), total.shape)
+        if not np.isfinite(total[best]):
+            return None
+        node, end = int(starts[best[0]]), int(ends[best[1]])
+        path = [self.get_coords(node)]
+        while node != end:
+            node = int(self.next_hop[node, end])
+            path.append(self.get_coords(node))
+        return path
+
+    def get_waypoint(self, from_x, from_y, to_x, to_y):
+        """
+        Where to head for now: the furthest waypoint of the shortest path that's in sight.
+
+        :return: x, y coords of the waypoint, None if the straight line is clear or there's no route
+        """
+        path = self.get_shortest_path(from_x, from_y, to_x, to_y)
+        if not path:
+            return None
+        xs, ys = zip(*path)
+        clearance = min(ROUTE_CLEARANCE, float(self._clearance(from_x, from_y)) - 1e-6)
+        in_sight = np.flatnonzero(self._segments_clear(from_x, from_y, xs, ys, clearance))
+        return path[in_sight[-1]] if len(in_sight) else path[0]
@@ -0,0 +1,195 @@
+from collections import namedtuple
+
+import numpy as np
+
+from . import constants
+
+#: Number of tokens the engine sends per ship
+SHIP_TOKENS = 10
+
+#: Layout of one ship in a MapSnapshot
+SHIP_RECORD = np.dtype([('id', np.int64), ('owner', np.int64), ('x', np.float64), ('y', np.float64),
+                        ('vel_x', np.float64), ('vel_y', np.float64), ('health', np.int64),
+                        ('docking_status', np.int64), ('planet', np.int64), ('progress', np.int64),
+                        ('cooldown', np.int64)])
+
+#: Layout of one planet in a MapSnapshot, its docked ships are planet_docked_ids[docked_start:docked_start + num_docked]
+PLANET_RECORD = np.dtype([('id', np.int64), ('x', np.float64), ('y', np.float64), ('radius', np.float64),
+                          ('health', np.int64), ('docking_spots', np.int64), ('production', np.int64),
+                          ('remaining', np.int64), ('owner', np.int64), ('num_docked', np.int64),
+                          ('docked_start', np.int64)])
+
+MapSnapshot = namedtuple('MapSnapshot', ['turn_num', 'my_id', 'width', 'height', 'player_ids',
+                                         'ships', 'planets', 'planet_docked_ids'])
+MapSnapshot.__doc__ = """
+Immutable record of one frame made of plain numbers, with no links back to the live entities.
+ships and planets are read only record arrays (see SHIP_RECORD and PLANET_RECORD) in row order,
+so snapshot.ships['x'] is a column and snapshot.ships[row] is a single ship.
+"""
+
+
+class FrameArrays:
+    """
+    Columnar copy of one frame, one row per ship and one row per planet, so batch geometry
+    can run on numpy arrays next to the object based code.
+    Ship rows are in the same order as Map._all_ships(), planet rows in the same order as Map.all_planets().
+
+    :ivar ship_id: Ship ids
+    :ivar ship_owner: Id of the player owning each ship
+    :ivar ship_x: Ship x-coordinates
+    :ivar ship_y: Ship y-coordinates
+    :ivar ship_vel_x: Ship x velocities
+    :ivar ship_vel_y: Ship y velocities
+    :ivar ship_radius: Ship radii
+    :ivar ship_health: Ship health
+    :ivar ship_docking_status: Docking status values (see Ship.DockingStatus)
+    :ivar ship_planet: Id of the planet the ship is docked to, -1 if undocked
+    :ivar ship_progress: Docking progress
+    :ivar ship_cooldown: Weapon cooldown
+    :ivar planet_id: Planet ids
+    :ivar planet_x: Planet x-coordinates
+    :ivar planet_y: Planet y-coordinates
+    :ivar planet_radius: Planet radii
+    :ivar planet_health: Planet health
+    :ivar planet_docking_spots: Number of docking spots
+    :ivar planet_production: Current production
+    :ivar planet_remaining: Remaining resources
+    :ivar planet_owner: Id of the owning player, -1 if unowned
+    :ivar planet_num_docked: Number of ships docked to each planet
+    :ivar planet_docked_start: Offset of each planet's docked ships in planet_docked_ids
+    :ivar planet_docked_ids: Ids of all docked ships, grouped by planet
+    :ivar player_id: Player ids
+    :ivar player_num_ships: Number of ships of each player, their rows are contiguous
+    :ivar ship_row: Ship id to row
+    :ivar planet_row: Planet id to row
+    """
+
+    def __init__(self, ship_columns, ship_owner, planets, player_ids, player_num_ships):
+        """
+        :param ship_columns: (num ships, SHIP_TOKENS) float array of the engine's ship fields
+        :param ship_owner: Owner id of every ship row
+        :param list[entity.Planet] planets: Planets in row order, before linking
+        :param player_ids: Player ids in order
+        :param player_num_ships: Number of ships of each player
+        """
+        self.ship_id = ship_columns[:, 0].astype(np.int64)
+        self.ship_owner = np.asarray(ship_owner, dtype=np.int64)
+        self.ship_x = ship_columns[:, 1].copy()
+        self.ship_y = ship_columns[:, 2].copy()
+        self.ship_health = ship_columns[:, 3].astype(np.int64)
+        self.ship_vel_x = ship_columns[:, 4].copy()
+        self.ship_vel_y = ship_columns[:, 5].copy()
+        self.ship_docking_status = ship_columns[:, 6].astype(np.int64)
+        # the engine sends 0 as the planet of undocked ships, which is a valid planet id
+        self.ship_planet = np.where(self.ship_docking_status == 0, -1, ship_columns[:, 7].astype(np.int64))
+        self.ship_progress = ship_columns[:, 8].astype(np.int64)
+        self.ship_cooldown = ship_columns[:, 9].astype(np.int64)
+        self.ship_radius = np.full(len(self.ship_id), constants.SHIP_RADIUS)
+
+        num_planets = len(planets)
+        self.planet_id = np.fromiter((planet.id for planet in planets), np.int64, num_planets)
+        self.planet_x = np.fromiter((planet.x for planet in planets), np.float64, num_planets)
+        self.planet_y = np.fromiter((planet.y for planet in planets), np.float64, num_planets)
+        self.planet_radius = np.fromiter((planet.radius for planet in planets), np.float64, num_planets)
+        self.planet_health = np.fromiter((planet.health for planet in planets), np.int64, num_planets)
+        self.planet_docking_spots = np.fromiter((planet.num_docking_spots for planet in planets), np.int64, num_planets)
+        self.planet_production = np.fromiter((planet.current_production for planet in planets), np.int64, num_planets)
+        self.planet_remaining = np.fromiter((planet.remaining_resources for planet in planets), np.int64, num_planets)
+        self.planet_owner = np.fromiter((-1 if planet.owner is None else planet.owner for planet in planets),
+                                        np.int64, num_planets)
+        self.planet_num_docked = np.fromiter((len(planet._docked_ship_ids) for planet in planets), np.int64, num_planets)
+        self.planet_docked_start = np.cumsum(self.planet_num_docked) - self.planet_num_docked
+        self.planet_docked_ids = np.fromiter((ship_id for planet in planets for ship_id in planet._docked_ship_ids),
+                                             np.int64, int(self.planet_num_docked.sum()))
+
+        self.player_id = np.asarray(player_ids, dtype=np.int64)
+        self.player_num_ships = np.asarray(player_num_ships, dtype=np.int64)
+
+        self.ship_row = dict(zip(self.ship_id.tolist(), range(len(self.ship_id))))
+        self.planet_row = dict(zip(self.planet_id.tolist(), range(num_planets)))
+        self._ship_row_lookup = np.full(int(self.ship_id.max(initial=-1)) + 1, -1, dtype=np.int64)
+        self._ship_row_lookup[self.ship_id] = np.arange(len(self.ship_id))
+
+    def snapshot(self, turn_num, my_id, width, height):
+        """
+        Copy the columns into a frozen MapSnapshot.
+
+        :return: The snapshot
+        :rtype: MapSnapshot
+        """
+        ships = np.empty(len(self.ship_id), dtype=SHIP_RECORD)
+        for field in SHIP_RECORD.names:
+            ships[field] = getattr(self, 'ship_' + field)
+        planets = np.empty(len(self.planet_id), dtype=PLANET_RECORD)
+        for field in PLANET_RECORD.names:
+            planets[field] = getattr(self, 'planet_' + field)
+        planet_docked_ids = self.planet_docked_ids.copy()
+        for array in (ships, planets, planet_docked_ids):
+            array.flags.writeable = False
+        return MapSnapshot(turn_num, my_id, width, height, tuple(self.player_id.tolist()),
+                           ships, planets, planet_docked_ids)
+
+    def num_ships(self):
+        return len(self.ship_id)
+
+    def num_planets(self):
+        return len(self.planet_id)
+
+    def ship_rows(self, ship_ids):
+        """
+        Vectorized id to row lookup.
+
+        :param ship_ids: Ship ids, all of which must be in this frame
+        :return: Row of each ship
+        :rtype: numpy.ndarray
+        """
+        return self._ship_row_lookup[np.asarray(ship_ids, dtype=np.int64)]
+
+    def player_rows(self, player_id):
+        """
+        :param int player_id: The player id
+        :return: The slice of ship rows belonging to that player
+        :rtype: slice
+        """
+        start = 0
+        for pid, num_ships in zip(self.player_id.tolist(), self.player_num_ships.tolist()):
+            if pid == player_id:
+                return slice(start, start + num_ships)
+            start += num_ships
+        return slice(0, 0)
+
+    def docked_ids(self, planet_row):
+        """
+        :param int planet_row: Row of the planet
+        :return: Ids of the ships docked to that planet
+        :rtype: numpy.ndarray
+        """
+        start = self.planet_docked_start[planet_row]
+        return self.planet_docked_ids[start:start + self.planet_num_docked[planet_row]]
+
+    @staticmethod
+    def _parse(tokens, planets):
+        """
+        Build the columns straight from the tokenized frame, converting every ship field in one numpy call.
+
+        :param list[str] tokens: The tokenized input
+        :param list[entity.Planet] planets: The planets parsed from the same tokens, before linking
+        :return: The columnar frame
+        :rtype: FrameArrays
+        """
+        ship_tokens = []
+        player_ids = []
+        player_num_ships = []
+        num_players = int(tokens[0])
+        cursor = 1
+        for _ in range(num_players):
+            num_ships = int(tokens[cursor + 1])
+            player_ids.append(int(tokens[cursor]))
+            player_num_ships.append(num_ships)
+            cursor += 2
+            ship_tokens.extend(tokens[cursor:cursor + num_ships * SHIP_TOKENS])
+            cursor += num_ships * SHIP_TOKENS
+
+        ship_columns = np.array(ship_tokens, dtype=np.float64).reshape(-1, SHIP_TOKENS)
+        ship_owner = np.repeat(np.asarray(player_ids, dtype=np.int64), player_num_ships)
+        return FrameArrays(ship_columns, ship_owner, planets, player_ids, player_num_ships)
@@ -1,5 +1,15 @@
-from . import collision, entity, constants, strategy
-import logging
+import heapq
+
+import numpy as np
+
+from . import botlog, collision, entity, constants, strategy
+from .clearance import PlanetClearance
+from .distances import DistanceMatrix
+from .floydwarshall import FloydWarshall
+from .flowfield import FlowFields
+from .frame import FrameArrays
+from .neighbors import NeighborLists
+from .spatial import SHIP_PAD, SpatialGrid
 
 
 class Map:
@@ -22,6 +32,29 @@ class Map:
         self.height = height
         self._players = {}
         self._planets = {}
+        # every ship of every player keyed by id, kept across turns so entities are updated in place
+        self._ships = {}
+        # what changed between the last two frames, see TurnDelta
+        self.delta = TurnDelta()
+        # columnar copy of the current frame, see FrameArrays
+        self.frame = None
+        # pairwise distances and angles over the current frame, see DistanceMatrix
+        self.distances = None
+        # per frame grids over the ships and planets in frame row order, see entities_within
+        self._ship_grid = None
+        self._planet_grid = None
+        self._frame_ships = []
+        self._frame_planets = []
+        # per turn capsules between my docked ships and their planets keyed by (ship id, planet id), see tether
+        self._tethers = {}
+        # ship neighbour lists carried across turns, see nearest_ships
+        self.neighbor_lists = NeighborLists()
+        # distance to the nearest planet surface anywhere on the map, built from the first frame
+        self.planet_clearance = None
+        # shortest routes around the planets, built from the first frame
+        self.routes = None
+        # per turn flow fields for mass movement, see FlowFields
+        self.flow_fields = None
         # my parameters that I use to track the game
         # updated every turn..
         self.turn_num = 0
@@ -48,6 +81,15 @@ class Map:
         strategy.update_my_ship_status(self, highest_ranked_enemy, self.my_ship_dict, self.my_clustered_ships_dict)
 
 
+    def snapshot(self):
+        """
+        Freeze the current frame into plain numbers, cheap enough to keep one for every turn.
+
+        :return: Immutable copy of the current frame with no links back to live entities
+        :rtype: frame.MapSnapshot
+        """
+        return self.frame.snapshot(self.turn_num, self.my_id, self.width, self.height)
+
     def get_me(self):
         """
         :return: The user's player
@@ -85,22 +127,159 @@ class Map:
         """
         return list(self._planets.values())
 
-    def nearby_entities_by_distance(self, source_entity, exclude_ships=False, exclude_planets=False):
+    def entities_within(self, source_entity, radius=None, exclude_ships=False, exclude_planets=False,
+                        owner=None, docked=None):
         """
+        Radius query on the per frame grids. Distances are calculate_min_distance2_between, so a moving ship
+        counts from its end of turn position when that's nearer.
+
+        :param source_entity: The source entity to find distances from
+        :param float radius: Only return entities at most this far away, None for all of them
         :param exclude_ships:
         :param exclude_planets:
+        :param Player owner: Only return entities owned by this player
+        :param bool docked: Only return ships that are (True) or aren't (False) docked, planets are left out
+        :return: (squared distance, entity) pairs, ships before planets, each in frame order
+        :rtype: list[(float, entity.Entity)]
+        """
+        result = []
+        radius2 = None if radius is None else radius * radius
+        candidates = []
+        if not exclude_ships:
+            rows = self._ship_grid.rows_within(source_entity.x, source_entity.y, radius)
+            candidates.extend(self._frame_ships[row] for row in rows.tolist())
+        if not exclude_planets and docked is None:
+            rows = self._planet_grid.rows_within(source_entity.x, source_entity.y, radius)
+            candidates.extend(self._frame_planets[row] for row in rows.tolist())
+        for foreign_entity in candidates:
+            if foreign_entity is source_entity:
+                continue
+            if owner is not None and foreign_entity.owner is not owner:
+                continue
+            if docked is not None and foreign_entity.is_docked() != docked:
+                continue
+            distance2 = source_entity.calculate_min_distance2_between(foreign_entity)
+            if radius2 is None or distance2 <= radius2:
+                result.append((distance2, foreign_entity))
+        return result
+
+    def nearest_entities(self, source_entity, radius=None, exclude_ships=False, exclude_planets=False,
+                         owner=None, docked=None):
+        """
+        Lazy version of entities_within yielding the nearest entity first. Candidates come off the grids
+        ordered by how near they could be, and an exact distance is only worked out once nothing nearer
+        can be left, so stopping early skips the rest. Equal distances come out ships before planets,
+        each in frame order, same as iterating sorted(nearby_entities_by_distance(...)).
+
+        :param source_entity: The source entity to find distances from
+        :param float radius: Stop at this distance, None to go through all entities
+        :param exclude_ships:
+        :param exclude_planets:
+        :param Player owner: Only yield entities owned by this player
+        :param bool docked: Only yield ships that are (True) or aren't (False) docked, planets are left out
+        :return: Generator of (squared distance, entity) pairs
+        """
+        grids = []
+        if not exclude_ships:
+            grids.append((self._ship_grid, self._frame_ships))
+        if not exclude_planets and docked is None:
+            grids.append((self._planet_grid, self._frame_planets))
+        found = [grid.rows_by_lower_bound(source_entity.x, source_entity.y, radius) for grid, _ in grids]
+        return self._nearest_in(source_entity, [entities for _, entities in grids], found, radius, owner, docked)
+
+    def nearest_ships(self, source_entity, radius):
+        """
+        nearest_entities(source_entity, radius, exclude_planets=True) for a ship in the frame, with the candidates
+        read off its neighbour list instead of the ship grid. See NeighborLists
+
+        :param entity.Ship source_entity: A ship in the frame
+        :param float radius: Stop at this distance
+        :return: Generator of (squared distance, ship) pairs
+        """
+        ids = self.neighbor_lists.candidates(source_entity, radius, self._ship_grid, self.frame)
+        rows = np.sort(self.frame.ship_rows(np.fromiter(ids, np.int64, len(ids))))
+        centre_distance = np.hypot(self.frame.ship_x[rows] - source_entity.x, self.frame.ship_y[rows] - source_entity.y)
+        # same bounds as SpatialGrid.rows_by_lower_bound
+        keep = centre_distance <= radius + SHIP_PAD
+        lower_bounds = np.maximum(centre_distance[keep] - SHIP_PAD - 1e-6, 0) ** 2
+        return self._nearest_in(source_entity, [self._frame_ships], [(rows[keep], lower_bounds)], radius)
+
+    def ship_pairs(self, radius):
+        """
+        Every unique pair of ships in the frame that could be within radius of each other by
+        calculate_min_distance2_between, read off the neighbour lists.
+
+        :param float radius: The largest distance of interest
+        :return: (ship, other ship, distance between their centres), lower frame row first, in frame row order
+        :rtype: list[(entity.Ship, entity.Ship, float)]
+        """
+        pairs = []
+        for row, ship in enumerate(self._frame_ships):
+            ids = self.neighbor_lists.candidates(ship, radius, self._ship_grid, self.frame)
+            rows = np.sort(self.frame.ship_rows(np.fromiter(ids, np.int64, len(ids))))
+            rows = rows[rows > row]
+            centre_distance = np.hypot(self.frame.ship_x[rows] - ship.x, self.frame.ship_y[rows] - ship.y)
+            keep = centre_distance <= radius + SHIP_PAD
+            pairs.extend((ship, self._frame_ships[other_row], distance)
+                         for other_row, distance in zip(rows[keep].tolist(), centre_distance[keep].tolist()))
+        return pairs
+
+    def ship_row(self, ship):
+        """
+        :param entity.Ship ship: A ship in the frame
+        :return: Its frame row, which orders ships the same way nearest_entities breaks ties
+        :rtype: int
+        """
+        return self.frame.ship_row[ship.id]
+
+    def _nearest_in(self, source_entity, entities, found, radius, owner=None, docked=None):
+        """
+        Yield the nearest of the candidate rows first, working out exact distances only once nothing nearer can be
+        left.
+
+        :param entities: Row to entity list of each kind, ships before planets
+        :param found: (rows, lower bounds) of each kind
+        """
+        radius2 = None if radius is None else radius * radius
+        if not found:
+            return
+        kinds = np.concatenate([np.full(len(rows), kind) for kind, (rows, _) in enumerate(found)])
+        rows = np.concatenate([rows for rows, _ in found])
+        lower_bounds = np.concatenate([lower_bounds for _, lower_bounds in found])
+        order = np.lexsort((rows, kinds, lower_bounds))
+
+        heap = []
+        for lower_bound, kind, row in zip(lower_bounds[order].tolist(), kinds[order].tolist(), rows[order].tolist()):
+            while heap and heap[0][0] < lower_bound:
+                distance2, _, _, foreign_entity = heapq.heappop(heap)
+                yield distance2, foreign_entity
+            foreign_entity = entities[kind][row]
+            if foreign_entity is source_entity:
+                continue
+            if owner is not None and foreign_entity.owner is not owner:
+                continue
+            if docked is not None and foreign_entity.is_docked() != docked:
+                continue
+            distance2 = source_entity.calculate_min_distance2_between(foreign_entity)
+            if radius2 is None or distance2 <= radius2:
+                heapq.heappush(heap, (distance2, kind, row, foreign_entity))
+        while heap:
+            distance2, _, _, foreign_entity = heapq.heappop(heap)
+            yield distance2, foreign_entity
+
+    def nearby_entities_by_distance(self, source_entity, exclude_ships=False, exclude_planets=False, radius=None):
+        """
+        :param exclude_ships:
+        :param exclude_planets:
+        :param radius: Leave out entities further away than this, None for all of them
         :return:
         :param source_entity: The source entity to find distances from
         :return: Dict containing all entities with their designated distances
         :rtype: dict
         """
         result = {}
-        ships = self._all_ships() if not exclude_ships else []
-        planets = self.all_planets() if not exclude_planets else []
-        for foreign_entity in ships + planets:
-            if source_entity == foreign_entity:
-                continue
-            result.setdefault(source_entity.calculate_min_distance2_between(foreign_entity), []).append(foreign_entity)
+        for distance2, foreign_entity in self.entities_within(source_entity, radius, exclude_ships, exclude_planets):
+            result.setdefault(distance2, []).append(foreign_entity)
         return result
 
     def get_corners(self):
@@ -117,6 +296,24 @@ class Map:
         """
         for celestial_object in self.all_planets() + self._all_ships():
             celestial_object._link(self._players, self._planets)
+        for planet in self._planets.values():
+            if planet.owner is not None:
+                planet.owner._planets.append(planet)
+                planet.owner.planet_docking_spots += planet.num_docking_spots
+
+    def mark_docking(self, ship, planet):
+        """
+        Flag one of the ships as docking mid turn, keeping its owner's docked and undocked stats in step.
+        Score and centroid stay as they were in the frame.
+
+        :param entity.Ship ship: The ship we just sent a dock command for
+        :param entity.Planet planet: The planet it's docking to
+        :return: nothing
+        """
+        if not ship.is_docked():
+            ship.owner._move_to_docked(ship)
+        ship.docking_status = entity.Ship.DockingStatus.DOCKING
+        ship.planet = planet
 
     def _parse(self, map_string):
         """
@@ -126,11 +323,46 @@ class Map:
         :return: nothing
         """
         tokens = map_string.split()
-
-        self._players, tokens = Player._parse(tokens)
-        self._planets, tokens = entity.Planet._parse(tokens)
-
-        assert(len(tokens) == 0)  # There should be no remaining tokens at this point
+        delta = TurnDelta()
+        previous_ships = self._ships
+        previous_planets = self._planets
+
+        # walk the tokens once with a cursor rather than re-slicing the remainder per entity
+        self._players, cursor = Player._parse(tokens, 0, self._players, previous_ships, delta)
+        self._planets, cursor = entity.Planet._parse(tokens, cursor, previous_planets, delta)
+
+        assert(cursor == len(tokens))  # There should be no remaining tokens at this point
+
+        # ids missing from this frame are retired by simply not carrying them over
+        self._ships = {}
+        for player in self._players.values():
+            self._ships.update(player._ships)
+
+        # entities are never revived, so if the counts add up nothing was destroyed and we can skip the scan
+        if len(previous_ships) != len(self._ships) - len(delta.born):
+            delta.died = [ship for ship_id, ship in previous_ships.items() if ship_id not in self._ships]
+        if len(previous_planets) != len(self._planets):
+            delta.destroyed_planets = [planet for planet_id, planet in previous_planets.items()
+                                       if planet_id not in self._planets]
+        # ownership never changes so this only has to be done once per ship
+        for ship in delta.born:
+            ship.set_mine() if ship.owner == self.my_id else ship.set_enemy()
+        self.delta = delta
+        if self.planet_clearance is None:
+            self.planet_clearance = PlanetClearance(list(self._planets.values()), self.width, self.height)
+            self.routes = FloydWarshall(self)
+            self.flow_fields = FlowFields(self.planet_clearance, self.width, self.height)
+        else:
+            if delta.destroyed_planets:
+                self.planet_clearance.remove([planet.id for planet in delta.destroyed_planets])
+            self.flow_fields.new_turn()
+        self._frame_planets = list(self._planets.values())
+        self.frame = FrameArrays._parse(tokens, self._frame_planets)
+        self._frame_ships = self._all_ships()
+        self.distances = DistanceMatrix(self.frame)
+        self._ship_grid, self._planet_grid = SpatialGrid.for_frame(self.frame, self.width, self.height)
+        self.neighbor_lists.new_turn(delta, self._ship_grid, self.frame)
+        self._tethers = {}
         self._link()
 
     def _all_ships(self):
@@ -153,7 +385,9 @@ class Map:
         :return: The colliding entity if so, else None.
         :rtype: entity.Entity
         """
-        for celestial_object in self._all_ships() + self.all_planets():
+        # planets can only be in range if the clearance says so
+        planets = self.all_planets() if not self.planet_clearance.is_free(target.x, target.y, target.radius + 0.1) else []
+        for celestial_object in self._all_ships() + planets:
             if celestial_object is target:
                 continue
             d = celestial_object.calculate_distance_between(target)
@@ -161,23 +395,49 @@ class Map:
                 return celestial_object
         return None
 
-    def obstacles_between(self, ship, target, position_to_move_to=None, ignore=(), additional_fudge=0.3):
+    def _obstacle_candidates(self, ship, position_to_move_to, ignore, additional_fudge):
         """
-        Check whether there is a straight-line path to the given point, without planetary obstacles in between.
+        Broad phase for obstacles_between: the planets and then the ships, each in frame order, that could be
+        within collision range of the ship's move this turn. The capsule is the move capped at MAX_SPEED
+        widened by the ship's radius and fudge, the grid pads cover the obstacle's radius, a full thrust of a
+        ship that already moved and the tether of a docked ship.
 
-        :param entity.Ship ship: Source entity
-        :param entity.Entity target: Target entity
-        :param entity.Entity ignore: Which entity type to ignore
-        :return: The list of obstacles between the ship and target
+        :return: Candidate obstacles
         :rtype: list[entity.Entity]
         """
-        if not position_to_move_to:
-            position_to_move_to = ship.closest_point_to(target)
-
-        obstacles = {}
-        entities = ([] if issubclass(entity.Planet, ignore) else self.all_planets()) \
-            + ([] if issubclass(entity.Ship, ignore) else self._all_ships())
-        for foreign_entity in entities:
+        distance = ship.calculate_distance_between(position_to_move_to)
+        if distance > constants.MAX_SPEED:
+            scale = constants.MAX_SPEED / distance
+            end_x = ship.x + (position_to_move_to.x - ship.x) * scale
+            end_y = ship.y + (position_to_move_to.y - ship.y) * scale
+        else:
+            end_x, end_y = position_to_move_to.x, position_to_move_to.y
+        # moving obstacles get half the fudge again, the small extra covers rounding in the exact test
+        radius = ship.radius + 1.5 * max(additional_fudge, 0) + 1e-6
+
+        candidates = []
+        # no planet is within reach if the move can't close the gap to the nearest planet surface
+        if not issubclass(entity.Planet, ignore) and \
+                not self.planet_clearance.is_free(ship.x, ship.y, min(distance, constants.MAX_SPEED) + radius):
+            rows = self._planet_grid.rows_near_segment(ship.x, ship.y, end_x, end_y, radius)
+            candidates.extend(self._frame_planets[row] for row in rows.tolist())
+        if not issubclass(entity.Ship, ignore):
+            rows = self._ship_grid.rows_near_segment(ship.x, ship.y, end_x, end_y, radius)
+            candidates.extend(self._frame_ships[row] for row in rows.tolist())
+        return candidates
+
+    def _filter_obstacles(self, ship, target, candidates):
+        """
+        Narrow phase setup shared by obstacles_between and obstacles_around: drops the target, the ship itself
+        (or the cluster's own ships) and enemy ships that can still move, and swaps my ships for their
+        my_ship_dict entries, which carry this turn's thrusts.
+
+        :return: The obstacles, in candidate order
+        :rtype: list[entity.Entity]
+        """
+        cluster_ids = {my_ship.id for my_ship in ship.ship_list} if isinstance(ship, entity.ShipCluster) else set()
+        obstacles = []
+        for foreign_entity in candidates:
 
             if foreign_entity == target:
                 continue
@@ -195,12 +455,87 @@ class Map:
                     foreign_entity = self.my_ship_dict[foreign_entity.id]
 
             if isinstance(ship, entity.ShipCluster) and isinstance(foreign_entity, entity.Ship):
-                if foreign_entity.id in [my_ship.id for my_ship in ship.ship_list]:
+                if foreign_entity.id in cluster_ids:
                     continue
 
-            has_collided, collision_time = collision.does_moving_ship_intersect_obstacle(ship, position_to_move_to, foreign_entity, additional_fudge=additional_fudge)
-            if ship.id == 15 and isinstance(foreign_entity, entity.Planet) and foreign_entity.id == 2:
-                logging.debug('has_collided: {}, collision_time:{}'.format(has_collided, collision_time))
+            obstacles.append(foreign_entity)
+        return obstacles
+
+    def obstacles_around(self, ship, target, ignore=(), additional_fudge=0.2):
+        """
+        Every obstacle any thrust of the ship could run into this turn, filtered like obstacles_between but
+        without any collision test, for checking many moves of the ship together.
+
+        :param entity.Ship ship: Source entity
+        :param entity.Entity target: Target entity, never an obstacle
+        :param ignore: Which entity type to ignore
+        :return: The obstacles, planets then ships in frame order
+        :rtype: list[entity.Entity]
+        """
+        # same pads as _obstacle_candidates with the capsule shrunk to a disk of full thrust
+        radius = constants.MAX_SPEED + ship.radius + 1.5 * max(additional_fudge, 0) + 1e-6
+        candidates = []
+        if not issubclass(entity.Planet, ignore) and not self.planet_clearance.is_free(ship.x, ship.y, radius):
+            rows = self._planet_grid.rows_within(ship.x, ship.y, radius)
+            candidates.extend(self._frame_planets[row] for row in rows.tolist())
+        if not issubclass(entity.Ship, ignore):
+            rows = self._ship_grid.rows_within(ship.x, ship.y, radius)
+            candidates.extend(self._frame_ships[row] for row in rows.tolist())
+        return self._filter_obstacles(ship, target, candidates)
+
+    def tether(self, ship):
+        """
+        The capsule from a docked ship to its planet, so nothing is routed between the two. It runs up to the
+        planet surface and stays within the ship's pad on the ship grid, so the candidates for a move already
+        cover it. Worked out once per turn, keyed on the planet as ships may dock mid turn.
+
+        :param entity.Ship ship: A docked ship
+        :return: (x0, y0, x1, y1, radius), None if the ship is touching its planet
+        :rtype: tuple
+        """
+        key = (ship.id, ship.planet.id)
+        if key not in self._tethers:
+            length = round(ship.calculate_min_distance_between(ship.planet) + 1) - 1
+            if length < 0:
+                self._tethers[key] = None
+            else:
+                end = ship.get_position(length, ship.calculate_angle_between(ship.planet))
+                self._tethers[key] = (ship.x, ship.y, end.x, end.y, constants.SHIP_RADIUS)
+        return self._tethers[key]
+
+    def obstacles_between(self, ship, target, position_to_move_to=None, ignore=(), additional_fudge=0.3):
+        """
+        Check whether there is a straight-line path to the given point, without planetary obstacles in between.
+
+        :param entity.Ship ship: Source entity
+        :param entity.Entity target: Target entity
+        :param entity.Entity ignore: Which entity type to ignore
+        :return: The list of obstacles between the ship and target
+        :rtype: list[entity.Entity]
+        """
+        if not position_to_move_to:
+            position_to_move_to = ship.closest_point_to(target)
+
+        candidates = self._filter_obstacles(
+            ship, target, self._obstacle_candidates(ship, position_to_move_to, ignore, additional_fudge))
+
+        obstacles = {}
+        if not candidates:
+            return obstacles
+
+        # every candidate against the one move in a single pass
+        vx, vy = collision.move_velocity(ship, position_to_move_to)
+        motions = [collision.obstacle_motion(ship, foreign_entity, additional_fudge) for foreign_entity in candidates]
+        obstacle_vx, obstacle_vy, reach = (np.array(column, dtype=float) for column in zip(*motions))
+        collided, collision_times = collision.moving_ship_collisions(
+            ship.x, ship.y, vx, vy,
+            np.array([foreign_entity.x for foreign_entity in candidates], dtype=float),
+            np.array([foreign_entity.y for foreign_entity in candidates], dtype=float),
+            obstacle_vx, obstacle_vy, reach)
+
+        for foreign_entity, has_collided, collision_time in zip(candidates, collided.tolist(), collision_times.tolist()):
+            if botlog.COLLISION_DEBUG and ship.id == 15 and isinstance(foreign_entity, entity.Planet) and foreign_entity.id == 2:
+                botlog.COLLISION.debug('has_collided: %s, collision_time:%s', has_collided, collision_time)
 
             #if collision.intersect_segment_circle(ship, position_to_move_to, foreign_entity, fudge=additional_fudge):
             if has_collided:
@@ -210,16 +545,11 @@ class Map:
             if isinstance(foreign_entity, entity.Ship):
 
                 if (foreign_entity.owner == self.get_me()) and foreign_entity.is_docked():
-                    dist = foreign_entity.calculate_min_distance_between(foreign_entity.planet)
-                    n_phony_entities = round(dist + 1)
-                    for i in range(n_phony_entities):
-                        position = foreign_entity.get_position(i, foreign_entity.calculate_angle_between(foreign_entity.planet))
-                        phony_entity = entity.Entity(position.x, position.y, constants.SHIP_RADIUS, constants.BASE_SHIP_HEALTH, 0, -1)
-                        has_collided, collision_time = collision.does_moving_ship_intersect_obstacle(ship, position_to_move_to, phony_entity, additional_fudge=additional_fudge)
-
+                    tether = self.tether(foreign_entity)
+                    if tether:
+                        has_collided, collision_time = collision.does_moving_ship_intersect_capsule(ship, position_to_move_to, tether, additional_fudge=additional_fudge)
                         if has_collided:
                             obstacles.setdefault(collision_time, []).append(foreign_entity)
-                            break
 
         return obstacles
 
@@ -235,7 +565,7 @@ class Map:
         for collision_time in sorted(obstacles_by_time):
             for obstacle in obstacles_by_time[collision_time]:
 
-                logging.debug('collision time:{}, quickest time:{}'.format(collision_time, quickest_collision_time))
+                botlog.COLLISION.debug('collision time:%s, quickest time:%s', collision_time, quickest_collision_time)
                 if obstacle in ignore_entities:
                     continue
 
@@ -252,7 +582,19 @@ class Map:
 
 class Player:
     """
+    Per turn stats are computed once when the frame is parsed.
+
     :ivar id: The player's unique id
+    :ivar num_ships: Number of ships
+    :ivar num_docked_ships: Number of docked or docking ships
+    :ivar num_undocked_ships: Number of undocked ships
+    :ivar total_health: Summed health of all ships
+    :ivar undocked_health: Summed health of the undocked ships
+    :ivar score: 2.2 per docked ship plus 1 per undocked ship
+    :ivar avg_x: Ship centroid x-coordinate, 0 without ships
+    :ivar avg_y: Ship centroid y-coordinate, 0 without ships
+    :ivar centroid_ship: Ship centroid as a Position
+    :ivar planet_docking_spots: Docking spots over all owned planets
     """
     def __init__(self, player_id, ships={}):
         """
@@ -260,20 +602,61 @@ class Player:
         :param ships: Ships user controls (optional)
         """
         self.id = player_id
+        self._update(ships)
+
+    def _update(self, ships):
+        """
+        Refresh the player in place with this turn's ships and recompute the per turn stats in one pass.
+        Owned planets are filled in when the map is linked.
+
+        :param ships: Ships user controls this turn, already parsed
+        :return: nothing
+        """
         self._ships = ships
-        self.score = 0
         self._planets = []
+        self._docked_ships = []
+        self._undocked_ships = []
         self.rank = 0
-        self.avg_x = 0
-        self.avg_y = 0        
-        self.num_undocked_ships = 0
+        self.score = 0
+        self.total_health = 0
+        self.undocked_health = 0
+        running_x = running_y = 0
+        for ship in ships.values():
+            if ship.is_docked():
+                self._docked_ships.append(ship)
+                self.score += 2.2
+            else:
+                self._undocked_ships.append(ship)
+                self.score += 1.0
+                self.undocked_health += ship.health
+            self.total_health += ship.health
+            running_x += ship.x
+            running_y += ship.y
+        self.num_ships = len(ships)
+        self.num_docked_ships = len(self._docked_ships)
+        self.num_undocked_ships = len(self._undocked_ships)
+        self.avg_x = running_x / self.num_ships if self.num_ships else 0
+        self.avg_y = running_y / self.num_ships if self.num_ships else 0
+        self.centroid_ship = entity.Position(self.avg_x, self.avg_y)
         self.planet_avg_x = 0
         self.planet_avg_y = 0
         self.planet_docking_spots = 0
         self.planet_radius = 0
-        self.centroid_ship = None
         self.centroid_planet = None
 
+    def _move_to_docked(self, ship):
+        """
+        Move an undocked ship over to the docked stats, see Map.mark_docking
+
+        :param entity.Ship ship: One of this player's undocked ships
+        :return: nothing
+        """
+        self._undocked_ships.remove(ship)
+        self._docked_ships.append(ship)
+        self.num_docked_ships += 1
+        self.num_undocked_ships -= 1
+        self.undocked_health -= ship._frame_health
+
     def all_ships(self):
         """
         :return: A list of all ships which belong to the user
@@ -281,6 +664,27 @@ class Player:
         """
         return list(self._ships.values())
 
+    def docked_ships(self):
+        """
+        :return: The ships which are docked or docking. Don't modify it, it's the player's own list
+        :rtype: list[entity.Ship]
+        """
+        return self._docked_ships
+
+    def undocked_ships(self):
+        """
+        :return: The ships which are undocked. Don't modify it, it's the player's own list
+        :rtype: list[entity.Ship]
+        """
+        return self._undocked_ships
+
+    def all_planets(self):
+        """
+        :return: The planets this player owned in the frame
+        :rtype: list[entity.Planet]
+        """
+        return self._planets
+
     def get_ship(self, ship_id):
         """
         :param int ship_id: The ship id of the desired ship.
@@ -312,40 +716,110 @@ class Player:
         return result
 
     @staticmethod
-    def _parse_single(tokens):
+    def _parse_single(tokens, cursor, known_players, known_ships, delta):
         """
         Parse one user given an input string from the Halite engine.
 
         :param list[str] tokens: The input string as a list of str from the Halite engine.
-        :return: The parsed player id, player object, and remaining tokens
-        :rtype: (int, Player, list[str])
-        """
-        player_id, *remainder = tokens
-        player_id = int(player_id)
-        ships, remainder = entity.Ship._parse(player_id, remainder)
-        player = Player(player_id, ships)
-        return player_id, player, remainder
+        :param int cursor: Index of the player id token
+        :param dict[int, Player] known_players: Players from the previous turn keyed by id
+        :param dict[int, entity.Ship] known_ships: Ships of all players from the previous turn keyed by id
+        :param TurnDelta delta: Collects what changed since the previous turn
+        :return: The parsed player id, player object, and index of the next unused token
+        :rtype: (int, Player, int)
+        """
+        player_id = int(tokens[cursor])
+        ships, cursor = entity.Ship._parse(player_id, tokens, cursor + 1, known_ships, delta)
+        player = known_players.get(player_id)
+        if player is None:
+            player = Player(player_id, ships)
+        else:
+            player._update(ships)
+        return player_id, player, cursor
 
     @staticmethod
-    def _parse(tokens):
+    def _parse(tokens, cursor, known_players, known_ships, delta):
         """
         Parse an entire user input string from the Halite engine for all users.
 
         :param list[str] tokens: The input string as a list of str from the Halite engine.
-        :return: The parsed players in the form of player dict, and remaining tokens
-        :rtype: (dict, list[str])
-        """
-        num_players, *remainder = tokens
-        num_players = int(num_players)
+        :param int cursor: Index of the player count token
+        :param dict[int, Player] known_players: Players from the previous turn keyed by id
+        :param dict[int, entity.Ship] known_ships: Ships of all players from the previous turn keyed by id
+        :param TurnDelta delta: Collects what changed since the previous turn
+        :return: The parsed players in the form of player dict, and index of the next unused token
+        :rtype: (dict, int)
+        """
+        num_players = int(tokens[cursor])
+        cursor += 1
         players = {}
 
         for _ in range(num_players):
-            player, players[player], remainder = Player._parse_single(remainder)
+            player, players[player], cursor = Player._parse_single(tokens, cursor, known_players, known_ships, delta)
 
-        return players, remainder
+        return players, cursor
 
     def __str__(self):
         return "Player {} with ships {}".format(self.id, self.score, self.all_ships())
 
     def __repr__(self):
         return self.__str__()
+
+
+class TurnDelta:
+    """
+    What changed between the previous frame and the current one. Filled in while parsing
+    so per turn bookkeeping only has to look at the entities that actually changed.
+    Previous values are the ones the engine sent last turn, not whatever we overwrote mid turn.
+
+    :ivar born: Ships that showed up this turn
+    :ivar died: Ships that were in the previous frame but not this one
+    :ivar docking_changes: (ship, previous docking status) for ships whose docking status changed
+    :ivar owner_changes: (planet, previous owner id) for planets that changed hands. None means unowned
+    :ivar destroyed_planets: Planets that were in the previous frame but not this one
+    :ivar displacement: (dx, dy) keyed by ship id for ships that moved
+    :ivar health_changes: Change in health keyed by ship id for ships that took damage
+    """
+    def __init__(self):
+        self.born = []
+        self.died = []
+        self.docking_changes = []
+        self.owner_changes = []
+        self.destroyed_planets = []
+        self.displacement = {}
+        self.health_changes = {}
+
+    def record_ship(self, ship, x, y, hp, docking_status):
+        """
+        Compare a known ship against its new values. Must be called before the ship is updated.
+
+        :param entity.Ship ship: The ship as of the previous frame
+        :return: nothing
+        """
+        if x != ship.x or y != ship.y:
+            self.displacement[ship.id] = (x - ship.x, y - ship.y)
+        if hp != ship._frame_health:
+            self.health_changes[ship.id] = hp - ship._frame_health
+        if docking_status is not ship._frame_docking_status:
+            self.docking_changes.append((ship, ship._frame_docking_status))
+
+    def record_planet(self, planet, owner):
+        """
+        Compare a known planet against its new owner. Must be called before the planet is updated.
+
+        :param entity.Planet planet: The planet as of the previous frame
+        :param owner: The new owner id, None if unowned
+        :return: nothing
+        """
+        if owner != planet._frame_owner:
+            self.owner_changes.append((planet, planet._frame_owner))
+
+    def __str__(self):
+        return "TurnDelta born {} died {} docking {} owners {} moved {} damaged {}".format(
+            [ship.id for ship in self.born], [ship.id for ship in self.died],
+            [(ship.id, status.name) for ship, status in self.docking_changes],
+            [(planet.id, owner) for planet, owner in self.owner_changes],
+            len(self.displacement), len(self.health_changes))
+
+    def __repr__(self):
+        return self.__str__()
@@ -19,7 +19,10 @@ def get_best_survival_planet(game_map, current_closest_enemy, current_strategy):
     planets_by_utility = {}
     guide_ship = game_map.get_me().all_ships()[0]
     min_utility = 0.7 * constants.UTILITY_NOT_ENEMY_PLANET[current_strategy.value]
-    for planet in game_map.all_planets():
+    # a planet past the horizon gets no distance utility, so it can't reach min_utility
+    horizon_radius = constants.REVAL_TURN_HORIZON[current_strategy.value] * constants.MAX_SPEED
+    for _, planet in game_map.nearest_entities(game_map.get_me().centroid_ship, radius=horizon_radius,
+                                               exclude_ships=True):
         if planet.num_docking_spots < 3:
             continue
         utility = utilcalc.get_utility(guide_ship, planet, game_map, current_strategy,
@@ -27,7 +30,7 @@ def get_best_survival_planet(game_map, current_closest_enemy, current_strategy):
         enemy_turns_away = current_closest_enemy.centroid_ship.calculate_distance_between(planet) / constants.MAX_SPEED
         enemy_discount = min(1, (enemy_turns_away) / constants.REVAL_TURN_HORIZON[current_strategy.value])
         utility = enemy_discount * utility
-        logging.info('AVOID RUSH: utility: {} planet: {} enemy_turns_away: {}'.format(utility, planet.id,enemy_discount ))
+        logging.info('AVOID RUSH: utility: %s planet: %s enemy_turns_away: %s', utility, planet.id, enemy_discount)
         if utility >= min_utility:
             planets_by_utility.setdefault(utility, []).append(planet)
 
@@ -46,13 +49,51 @@ def can_friend_defend(ship, enemy):
         return True
     return False
 
+def steer_by_flow_fields(game_map, default_target, combat_ratio=1):
+    """
+    Move the free ships that are far from both the enemy and their target by reading their heading off the
+    flow fields, instead of running a full navigation per ship. Ships that can't be steered that way
+    (no heading, or something in the way) are left without a command for the usual logic.
+    :param game_map:
+    :param default_target: Where ships without a live mission target go
+    :param combat_ratio:
+    :return: nothing
+    """
+    my_player = game_map.get_me()
+    for ship in game_map.my_ship_dict.values():
+        if ship.has_command or ship.is_docked() or ship.is_clumped:
+            continue
+        target = default_target
+        if ship.mission_target and not ship.mission_target.is_fully_engaged(combat_ratio=combat_ratio):
+            target = ship.mission_target
+        if ship.is_target_nearer_than(target, constants.FLOW_FIELD_MIN_DISTANCE):
+            continue
+        if any(nearby_ship.owner != my_player for _, nearby_ship in
+               game_map.nearest_entities(ship, radius=constants.FLOW_FIELD_ENEMY_RADIUS, exclude_planets=True)):
+            continue
+
+        angle = game_map.flow_fields.heading(ship, target)
+        if angle is None:
+            continue
+        position_to_move_to = ship.get_position(constants.MAX_SPEED, angle)
+        if game_map.get_closest_obstacle(ship, target, position_to_move_to):
+            continue
+        navigate_command = ship.thrust(constants.MAX_SPEED, angle)
+        logging.info('MACRO: ship: %s following flow field to target: %s', ship, target)
+        ship.mission_target = target
+        ship.has_command = True
+        game_map.command_queue.append(navigate_command)
+        ship.last_ship_target = target
+        ship.last_ship_target_sq_dist = ship.calculate_distance_sq_between(target)
+        target.add_approaching_friendly(ship)
+
 def assign_ship_to_target(ship, target, game_map):
 
     if isinstance(target, entity.Planet):
         if ship.is_clumped:
             clump_id = ship.clump_id
-            logging.debug('clump_id: {}, ship: {}'.format(clump_id, ship))
-            logging.debug(game_map.my_clustered_ships_dict)
+            logging.debug('clump_id: %s, ship: %s', clump_id, ship)
+            logging.debug('%s', game_map.my_clustered_ships_dict)
 
             game_map.my_clustered_ships_dict[clump_id].remove_ship_from_cluster(ship)
 
@@ -60,7 +101,7 @@ def assign_ship_to_target(ship, target, game_map):
         clump_id = ship.clump_id
         navi_list = game_map.my_clustered_ships_dict[clump_id].navigate_new(target, game_map,
                                                                             return_type='raw')
-        logging.debug('Clump id: {}, navi_list:{}'.format(clump_id, navi_list))
+        logging.debug('Clump id: %s, navi_list:%s', clump_id, navi_list)
         if navi_list:
             for clump_ship in game_map.my_clustered_ships_dict[clump_id].ship_list:
                 if clump_ship.clump_id == clump_id and not clump_ship.has_command:
@@ -78,7 +119,7 @@ def assign_ship_to_target(ship, target, game_map):
 
     navigate_command = ship.navigate_new(target, game_map)
     if navigate_command:
-        logging.info('MACRO: ship: {} going for target: {}'.format(ship, target))
+        logging.info('MACRO: ship: %s going for target: %s', ship, target)
         ship.mission_target = target
         ship.has_command = True
         game_map.command_queue.append(navigate_command)
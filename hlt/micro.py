@@ -1,6 +1,6 @@
-from . import constants, entity
+from . import botlog, constants, entity
 from operator import attrgetter
-import logging, math
+import math
 
 def should_ship_micro(ship, current_strategy, game_map, combat_ratio):
 
@@ -20,16 +20,16 @@ def should_ship_micro(ship, current_strategy, game_map, combat_ratio):
         return False
 
     if ship.nearby_enemies:
-        if not get_nearest_enemy(ship, current_strategy, combat_ratio):
+        if not get_nearest_enemy(ship, current_strategy, combat_ratio, game_map):
             return False
     else:
         return False
 
     return True
 
-def get_nearest_enemy(ship, current_strategy, combat_ratio):
+def get_nearest_enemy(ship, current_strategy, combat_ratio, game_map):
     for enemy in ship.nearby_enemies:
-        enemy.distance_from_my_ship = ship.calculate_distance_sq_between(enemy)
+        enemy.distance_from_my_ship = game_map.distances.distance2(ship, enemy)
     nearby_enemies = [enemy for enemy in ship.nearby_enemies if
                       not (enemy.is_fully_engaged(combat_ratio=combat_ratio) or enemy.health <= 0)]
     #nearby_docked_enemies = [enemy for enemy in ship.nearby_enemies if enemy.is_docked() and not (enemy.health <= 0)]
@@ -55,12 +55,12 @@ def can_friends_engage(ship, enemy, game_map, main_enemy):
                 if my_ship.last_engaged_target:
                     if my_ship.last_engaged_target.id == enemy.id:
                         if my_ship.last_engaged_target_hp >= enemy.health:
-                            logging.info('ENGAGE: enemy {} jebaiting.. Not attacking.'.format(enemy.id))
+                            botlog.MICRO.info('ENGAGE: enemy %s jebaiting.. Not attacking.', enemy.id)
                             return False
                 #navi = my_ship.navigate_new(enemy, game_map, return_type='raw')
                 #if navi:
                 #    if my_ship.get_position(navi[0], navi[1]).is_target_nearer_than(enemy, constants.WEAPON_RADIUS):
-                logging.debug('enemy:{}, ship ready to attack:{}'.format(enemy.id, my_ship.id))
+                botlog.MICRO.debug('enemy:%s, ship ready to attack:%s', enemy.id, my_ship.id)
                 num_friends_ready_to_attack += 1
                 cum_hp_friends += my_ship.health
 
@@ -88,16 +88,16 @@ def engage(enemy, my_clustered_ships_dict, game_map, highest_utility_target):
     max_engaged_num = 1 + int(enemy_clumped_hp / (constants.WEAPON_DAMAGE))
 
     counter = 0
-    logging.debug('need {} to engage enemy: {}'.format(max_engaged_num, enemy))
-    logging.debug('friends attacking:{}'.format(friendly_ships))
+    botlog.MICRO.debug('need %s to engage enemy: %s', max_engaged_num, enemy)
+    botlog.MICRO.debug('friends attacking:%s', friendly_ships)
     for my_ship in friendly_ships:
-        my_ship.distance_from_target = my_ship.calculate_distance_between(enemy)
+        my_ship.distance_from_target = game_map.distances.distance(my_ship, enemy)
 
-    logging.debug('engaging enemy:{}'.format(enemy))
+    botlog.MICRO.debug('engaging enemy:%s', enemy)
 
     for my_ship in sorted(friendly_ships, key=attrgetter('distance_from_target')):
 
-        logging.debug('counter:{}, max_engaged_num:{}, has_command:{}'.format(counter, max_engaged_num, my_ship.has_command))
+        botlog.MICRO.debug('counter:%s, max_engaged_num:%s, has_command:%s', counter, max_engaged_num, my_ship.has_command)
 
         if counter >= max_engaged_num:
             break
@@ -111,13 +111,13 @@ def engage(enemy, my_clustered_ships_dict, game_map, highest_utility_target):
         # ship is definitely attacking.. friends around cannot run
         if my_ship.nearby_undocked_friends:
             for friendly in my_ship.nearby_undocked_friends:
-                logging.debug('friendly {} aggress flag true'.format(friendly))
+                botlog.MICRO.debug('friendly %s aggress flag true', friendly)
                 friendly.aggress_flag = True
 
 
         if len(my_ship.nearby_undocked_friends) > 4:
-            logging.debug('ENGAGE: adjusting angle to get closer to top enemy')
-            target = enemy.get_position(4.5, enemy.calculate_angle_between(highest_utility_target))
+            botlog.MICRO.debug('ENGAGE: adjusting angle to get closer to top enemy')
+            target = enemy.get_position(4.5, game_map.distances.angle(enemy, highest_utility_target))
         elif my_ship.nearby_docked_friends:
             docked_x = sum([friendly.x for friendly in my_ship.nearby_docked_friends]) / len(my_ship.nearby_docked_friends)
             docked_y = sum([friendly.y for friendly in my_ship.nearby_docked_friends]) / len(my_ship.nearby_docked_friends)
@@ -147,14 +147,14 @@ def engage(enemy, my_clustered_ships_dict, game_map, highest_utility_target):
                                     clumped_ship.last_engaged_target_hp = enemy.health
                                     enemy.add_approaching_friendly(my_ship)
                                     counter += 1
-                            logging.info('clumped ship: {}, engaging ship: {}'.format(clumped_ship.id, enemy.id))
+                            botlog.MICRO.info('clumped ship: %s, engaging ship: %s', clumped_ship.id, enemy.id)
             continue
 
         navigate_command = my_ship.navigate_new(target, game_map, is_engage=True)
         if navigate_command:
             list_commands.append(navigate_command)
             my_ship.has_command = True
-            logging.debug('attacking ship:{}'.format(my_ship))
+            botlog.MICRO.debug('attacking ship:%s', my_ship)
             if my_ship.pos_eot:
                 if my_ship.pos_eot.is_target_nearer_than(enemy, constants.WEAPON_RADIUS):
                     my_ship.last_engaged_target = enemy
@@ -165,11 +165,11 @@ def engage(enemy, my_clustered_ships_dict, game_map, highest_utility_target):
 
 
 def zone_out(ship, enemy, game_map, my_clustered_ships_dict):
-    logging.info('trying to zone out enemy:{}'.format(enemy.id))
+    botlog.MICRO.info('trying to zone out enemy:%s', enemy.id)
 
-    distance_to_safety = max(1.1, 1 + constants.MOVE_AND_FIRE_RADIUS - ship.calculate_distance_between(enemy))
+    distance_to_safety = max(1.1, 1 + constants.MOVE_AND_FIRE_RADIUS - game_map.distances.distance(ship, enemy))
 
-    angle = (180 + ship.calculate_angle_between(enemy)) % 360
+    angle = (180 + game_map.distances.angle(ship, enemy)) % 360
 
     #if ship.nearby_docked_friends:
     #   for friendly in ship.nearby_docked_friends:
@@ -178,8 +178,8 @@ def zone_out(ship, enemy, game_map, my_clustered_ships_dict):
 
     if enemy.my_docked_target:
         closest_docked_friend = enemy.my_docked_target
-        logging.info('ship: {} going to closest docked friend:{}'.format(ship.id, closest_docked_friend.id))
-        spot_in_front_of_ship = closest_docked_friend.get_position(1.2, closest_docked_friend.calculate_angle_between(enemy))
+        botlog.MICRO.info('ship: %s going to closest docked friend:%s', ship.id, closest_docked_friend.id)
+        spot_in_front_of_ship = closest_docked_friend.get_position(1.2, game_map.distances.angle(closest_docked_friend, enemy))
         #spot_in_front_of_ship = ship.closest_point_to(closest_docked_friend)
         angle = ship.calculate_angle_between(spot_in_front_of_ship)
         distance_to_safety = min(constants.MAX_SPEED, ship.calculate_min_distance_between(spot_in_front_of_ship))
@@ -193,7 +193,7 @@ def zone_out(ship, enemy, game_map, my_clustered_ships_dict):
         list_commands = []
         navi_list = my_clustered_ships_dict[ship.clump_id].navigate_new(target, game_map, return_type='raw')
         if navi_list:
-            logging.info('clumped navi:{}'.format(navi_list))
+            botlog.MICRO.info('clumped navi:%s', navi_list)
             enemy.add_approaching_friendly(ship)
             if enemy.clumped_enemies and game_map.turn_num >= 20:
                 for e in enemy.clumped_enemies:
@@ -204,12 +204,12 @@ def zone_out(ship, enemy, game_map, my_clustered_ships_dict):
                     if navigate_command:
                         list_commands.append(navigate_command)
                         clumped_ship.has_command = True
-                        logging.info('clumped ship: {}, zoning out'.format(clumped_ship.id, enemy.id))
+                        botlog.MICRO.info('clumped ship: %s, zoning out', clumped_ship.id)
         return list_commands
 
     navigate_command = ship.navigate_new(target, game_map)
     if navigate_command:
-        logging.debug('zoning out ship:{}, enemy:{}'.format(ship.id, enemy.id))
+        botlog.MICRO.debug('zoning out ship:%s, enemy:%s', ship.id, enemy.id)
         enemy.add_approaching_friendly(ship)
         if enemy.clumped_enemies and game_map.turn_num >= 20:
             for e in enemy.clumped_enemies:
@@ -220,23 +220,23 @@ def zone_out(ship, enemy, game_map, my_clustered_ships_dict):
 
 
 def zone_in(ship, enemy, game_map, current_strategy):
-    logging.info('trying to zone in {}'.format(enemy.id))
+    botlog.MICRO.info('trying to zone in %s', enemy.id)
     my_clustered_ships_dict = game_map.my_clustered_ships_dict
     zone_dist = constants.WEAPON_RADIUS if current_strategy == constants.BotStrategy.RUSH else (constants.MOVE_AND_FIRE_RADIUS)
     if ship.is_clumped:
         zone_dist = zone_dist - my_clustered_ships_dict[ship.clump_id].radius
-        logging.info('dist from enemy: {}, clump radi: {}'.format(ship.calculate_distance_between(enemy),
-                                                                  my_clustered_ships_dict[ship.clump_id].radius))
-    distance_to_safety = ship.calculate_distance_between(enemy) - zone_dist + 0.5
-    angle = ship.calculate_angle_between(enemy)
+        if botlog.MICRO_INFO:
+            botlog.MICRO.info('dist from enemy: %s, clump radi: %s', ship.calculate_distance_between(enemy), my_clustered_ships_dict[ship.clump_id].radius)
+    distance_to_safety = game_map.distances.distance(ship, enemy) - zone_dist + 0.5
+    angle = game_map.distances.angle(ship, enemy)
 
     if distance_to_safety <= 0:
         distance_to_safety = abs(distance_to_safety)
         angle = (180 + angle) % 360
     distance_to_safety = max(1.1 ,abs(distance_to_safety))
     if ship.is_clumped:
-        logging.info('dist from enemy: {}, clump radi: {}'.format(ship.calculate_distance_between(enemy),
-                                                                  my_clustered_ships_dict[ship.clump_id].radius))
+        if botlog.MICRO_INFO:
+            botlog.MICRO.info('dist from enemy: %s, clump radi: %s', ship.calculate_distance_between(enemy), my_clustered_ships_dict[ship.clump_id].radius)
 
     target = ship.get_position(min(distance_to_safety, constants.MAX_SPEED),angle)
 
@@ -248,20 +248,20 @@ def zone_in(ship, enemy, game_map, current_strategy):
         list_commands = []
         navi_list = my_clustered_ships_dict[ship.clump_id].navigate_new(target, game_map, return_type='raw')
         if navi_list:
-            logging.info('clumped navi:{}'.format(navi_list))
+            botlog.MICRO.info('clumped navi:%s', navi_list)
             for clumped_ship in my_clustered_ships_dict[ship.clump_id].ship_list:
                 if not clumped_ship.has_command:
                     navigate_command = clumped_ship.thrust(navi_list[0], navi_list[1])
                     if navigate_command:
                         list_commands.append(navigate_command)
                         clumped_ship.has_command = True
-                        logging.info('clumped ship: {}, zoning in'.format(clumped_ship.id, enemy.id))
-        logging.debug(list_commands)
+                        botlog.MICRO.info('clumped ship: %s, zoning in', clumped_ship.id)
+        botlog.MICRO.debug('%s', list_commands)
         return list_commands
 
     navigate_command = ship.navigate_new(target, game_map, force_zero=True)
     if navigate_command:
-        logging.debug('zoning in ship:{}, enemy:{}'.format(ship.id, enemy.id))
+        botlog.MICRO.debug('zoning in ship:%s, enemy:%s', ship.id, enemy.id)
         ship.has_command = True
         enemy.add_approaching_friendly(ship)
         if enemy.clumped_enemies and game_map.turn_num >= 20:
@@ -272,8 +272,8 @@ def zone_in(ship, enemy, game_map, current_strategy):
 
 
 def round_enemy(ship, enemy, my_clustered_ships_dict, game_map):
-    distance_to_enemy = ship.calculate_distance_between(enemy)
-    angle = ship.calculate_angle_between(enemy)
+    distance_to_enemy = game_map.distances.distance(ship, enemy)
+    angle = game_map.distances.angle(ship, enemy)
     tangent_angle = 90 if distance_to_enemy <= constants.NEARBY_RADIUS else math.degrees(math.asin(constants.MAX_SPEED / distance_to_enemy))
     if ship.is_target_nearer_than(game_map.get_mid_map(), 2.5 * constants.MAX_SPEED):
         tangent_angle = math.degrees(math.asin(min(3, distance_to_enemy) / distance_to_enemy))
@@ -301,19 +301,19 @@ def round_enemy(ship, enemy, my_clustered_ships_dict, game_map):
         list_commands = []
         navi_list = my_clustered_ships_dict[ship.clump_id].navigate_new(target, game_map, return_type='raw')
         if navi_list:
-            logging.info('clumped navi:{}'.format(navi_list))
+            botlog.MICRO.info('clumped navi:%s', navi_list)
             for clumped_ship in my_clustered_ships_dict[ship.clump_id].ship_list:
                 if not clumped_ship.has_command:
                     navigate_command = clumped_ship.thrust(navi_list[0], navi_list[1])
                     if navigate_command:
                         list_commands.append(navigate_command)
                         clumped_ship.has_command = True
-                        logging.info('clumped ship: {}, rounding'.format(clumped_ship.id, enemy.id))
+                        botlog.MICRO.info('clumped ship: %s, rounding', clumped_ship.id)
         return list_commands
 
     navigate_command = ship.navigate_new(target, game_map)
     if navigate_command:
-        logging.debug('rounding ship:{}, enemy:{}'.format(ship.id, enemy.id))
+        botlog.MICRO.debug('rounding ship:%s, enemy:%s', ship.id, enemy.id)
         ship.has_command = True
         return navigate_command
     return None
@@ -386,7 +386,7 @@ def run_away(ship, my_clustered_ships_dict, game_map):
         my_clustered_ships_dict[ship.clump_id].remove_ship_from_cluster(ship)
     navigate_command = ship.navigate_new(target, game_map)
     if navigate_command:
-        logging.debug('running away! ship:{}, num_enemies:{}'.format(ship, num_enemies))
+        botlog.MICRO.debug('running away! ship:%s, num_enemies:%s', ship, num_enemies)
         ship.has_command = True
         return navigate_command
     return None
@@ -416,7 +416,7 @@ def get_kamikaze_target(ship):
 def kamikaze(ship, highest_hp_enemy, my_clustered_ships_dict, game_map):
     navigate_command = ship.navigate_new(highest_hp_enemy, game_map, ignore_enemies=True)
     if navigate_command:
-        logging.debug('Kamikaze! ship:{}, enemy:{}'.format(ship, highest_hp_enemy))
+        botlog.MICRO.debug('Kamikaze! ship:%s, enemy:%s', ship, highest_hp_enemy)
         ship.has_command = True
         highest_hp_enemy.add_approaching_friendly(ship, set_full=True)
         if ship.is_clumped:
@@ -0,0 +1,77 @@
+import math
+
+from . import constants
+
+
+class NeighborLists:
+    """
+    Verlet style neighbour lists over the ships, kept across turns by ship id. A list holds every ship whose centre
+    was within the list radius plus the skin plus the grid pad when it was built, and lists are kept symmetric, so
+    a pair is dropped only once both ships have seen it out of range.
+
+    A ship's list is rebuilt once the path it travelled since the last build is over half the skin. Until then
+    neither end of a pair can have closed more than half the skin, so nothing within the radius can be missing.
+    All rebuilds happen when the frame comes in, lookups just read the list.
+    """
+
+    def __init__(self, skin=constants.NEIGHBOR_SKIN):
+        """
+        :param skin: How far past the radius a list reaches
+        """
+        self.skin = skin
+        self.radius = None
+        # ship id to the set of ids on its list
+        self._neighbors = {}
+        # ship id to the path it travelled since its list was built
+        self._travelled = {}
+
+    def new_turn(self, delta, ship_grid, frame):
+        """
+        Pick up this frame's moves, births and deaths, and rebuild the lists that went stale.
+
+        :param game_map.TurnDelta delta: What changed since the previous frame
+        :param spatial.SpatialGrid ship_grid: The frame's ship grid
+        :param frame.FrameArrays frame: The frame
+        :return: nothing
+        """
+        for ship in delta.died:
+            for neighbor_id in self._neighbors.pop(ship.id, ()):
+                if neighbor_id in self._neighbors:
+                    self._neighbors[neighbor_id].discard(ship.id)
+            self._travelled.pop(ship.id, None)
+        for ship_id, (dx, dy) in delta.displacement.items():
+            if ship_id in self._travelled:
+                self._travelled[ship_id] += math.hypot(dx, dy)
+        if self.radius is None:
+            return
+        for row, ship_id in enumerate(frame.ship_id.tolist()):
+            if self._travelled.get(ship_id, self.skin) > self.skin / 2:
+                self._build(ship_id, row, ship_grid, frame)
+
+    def _build(self, ship_id, row, ship_grid, frame):
+        found = set(frame.ship_id[ship_grid.rows_within(frame.ship_x[row], frame.ship_y[row],
+                                                         self.radius + self.skin)].tolist())
+        found.discard(ship_id)
+        for neighbor_id in self._neighbors.get(ship_id, set()) - found:
+            if neighbor_id in self._neighbors:
+                self._neighbors[neighbor_id].discard(ship_id)
+        for neighbor_id in found:
+            if neighbor_id in self._neighbors:
+                self._neighbors[neighbor_id].add(ship_id)
+        self._neighbors[ship_id] = found
+        self._travelled[ship_id] = 0
+
+    def candidates(self, ship, radius, ship_grid, frame):
+        """
+        :param entity.Ship ship: A ship in the frame
+        :param radius: How far the caller looks. A radius past the lists' rebuilds all of them for it
+        :return: Ids of the ships on the ship's list, a superset of the ships within radius of it
+        :rtype: set[int]
+        """
+        if self.radius is None or radius > self.radius:
+            self.radius = radius
+            self._neighbors = {}
+            self._travelled = {}
+            for row, ship_id in enumerate(frame.ship_id.tolist()):
+                self._build(ship_id, row, ship_grid, frame)
+        return self._neighbors[ship.id]
@@ -1,14 +1,19 @@
 import sys
+import atexit
+import collections
 import logging
-import copy
+import time
 
-from . import game_map
+from . import botlog, game_map, recorder
 
 
 class Game:
     """
     :ivar map: Current map representation
-    :ivar initial_map: The initial version of the map before game starts
+    :ivar initial_map: Snapshot of the map before the game starts
+    :ivar history: Snapshots of the most recent frames, oldest first
+    :ivar io_timings: Per turn read wait, parse, compute and write durations in seconds
+    :ivar recorder: Records every frame, command queue and timings when recording, else None
     """
     @staticmethod
     def _send_string(s):
@@ -43,45 +48,104 @@ class Game:
         return result
 
     @staticmethod
-    def send_command_queue(command_queue):
+    def _send_bytes(s):
+        """
+        Send a whole line to the game in a single write, bypassing the text layer.
+
+        :param str s: String to send, without the trailing newline
+        :return: nothing
+        """
+        sys.stdout.buffer.write(s.encode() + b'\n')
+        sys.stdout.buffer.flush()
+
+    @staticmethod
+    def _get_bytes():
+        """
+        Read input from the game without decoding it. The parser works on the
+        bytes tokens directly since int() and float() accept them.
+
+        :return: The raw input read from the Halite engine
+        :rtype: bytes
+        """
+        return sys.stdin.buffer.readline().rstrip(b'\n')
+
+    def _read(self):
+        """
+        Read a line from the game in the configured I/O mode.
+
+        :return: The input read from the Halite engine
+        :rtype: str or bytes
+        """
+        return self._get_bytes() if self._binary_io else self._get_string()
+
+    def send_command_queue(self, command_queue):
         """
         Issue the given list of commands.
 
         :param list[str] command_queue: List of commands to send the Halite engine
         :return: nothing
         """
-        for command in command_queue:
-            Game._send_string(command)
-
-        Game._done_sending()
+        write_start = time.perf_counter()
+        if self._binary_io:
+            Game._send_bytes(''.join(command_queue))
+        else:
+            for command in command_queue:
+                Game._send_string(command)
+
+            Game._done_sending()
+
+        if self.io_timings:
+            timing = self.io_timings[-1]
+            timing['compute'] = write_start - self._parse_end
+            timing['write'] = time.perf_counter() - write_start
+            logging.info('I/O: read wait %.4fs, parse %.4fs, write %.4fs',
+                         timing['read_wait'], timing['parse'], timing['write'])
+            if self.recorder:
+                self.recorder.record(self.history[-1], ''.join(command_queue), timing)
 
     @staticmethod
-    def _set_up_logging(tag, name):
+    def _set_up_logging(tag, name, log_level=logging.DEBUG):
         """
-        Set up and truncate the log
+        Set up and truncate the log, see botlog for the category loggers and per turn budget
 
         :param tag: The user tag (used for naming the log)
         :param name: The bot name (used for naming the log)
+        :param log_level: Root logging level
         :return: nothing
         """
         log_file = "{}_{}.log".format(tag, name)
-        logging.basicConfig(filename=log_file, level=logging.DEBUG, filemode='w')
-        logging.info("Initialized bot {}".format(name))
+        botlog.configure(log_file, level=log_level)
+        logging.info("Initialized bot %s", name)
 
-    def __init__(self, name):
+    def __init__(self, name, binary_io=False, history_size=10, log_level=logging.DEBUG, record=False):
         """
         Initialize the bot with the given name.
 
         :param name: The name of the bot.
+        :param binary_io: Read frames from sys.stdin.buffer and write each command queue
+        in a single write instead of going through the text layer
+        :param history_size: Number of frame snapshots to keep in history, at least 1 for the current frame
+        :param log_level: Root logging level, raise it for production games
+        :param record: Record the game to <tag>_<name>.rec, see recorder.Recording to read it back
         """
+        if history_size < 1:
+            raise ValueError("history_size must be at least 1, the current frame is always kept, got {}".format(history_size))
         self._name = name
         self._send_name = False
-        tag = int(self._get_string())
-        Game._set_up_logging(tag, name)
-        width, height = [int(x) for x in self._get_string().strip().split()]
+        self._binary_io = binary_io
+        self.io_timings = []
+        self.history = collections.deque(maxlen=history_size)
+        self.recorder = None
+        tag = int(self._read())
+        Game._set_up_logging(tag, name, log_level)
+        width, height = [int(x) for x in self._read().strip().split()]
         self.map = game_map.Map(tag, width, height)
         self.update_map()
-        self.initial_map = copy.deepcopy(self.map)
+        self.initial_map = self.history[-1]
+        if record:
+            self.recorder = recorder.Recorder("{}_{}.rec".format(tag, name))
+            atexit.register(self.recorder.close)
+            self.recorder.record(self.initial_map, '', self.io_timings[-1])
         self._send_name = True
 
     def update_map(self):
@@ -92,9 +156,22 @@ class Game:
         :rtype: game_map.Map
         """
         if self._send_name:
-            self._send_string(self._name)
-            self._done_sending()
+            if self._binary_io:
+                self._send_bytes(self._name)
+            else:
+                self._send_string(self._name)
+                self._done_sending()
             self._send_name = False
+        botlog.new_turn()
         logging.info("---NEW TURN---")
-        self.map._parse(self._get_string())
+        read_start = time.perf_counter()
+        map_string = self._read()
+        parse_start = time.perf_counter()
+        self.map._parse(map_string)
+        self._parse_end = time.perf_counter()
+        self.io_timings.append({'read_wait': parse_start - read_start,
+                                'parse': self._parse_end - parse_start,
+                                'compute': None,
+                                'write': None})
+        self.history.append(self.map.snapshot())
         return self.map
@@ -0,0 +1,254 @@
+import math
+import time
+
+import numpy as np
+
+from . import botlog, collision, constants, entity, validation
+
+#: Extra room kept between ships and obstacles on top of their radii
+FUDGE = 0.3
+#: How many turns ahead the velocity obstacles look, thrusts only last the one
+TIME_HORIZON = 1.0
+#: Rounding slack in the linear programs
+EPSILON = 1e-5
+
+
+def _det(ax, ay, bx, by):
+    return ax * by - ay * bx
+
+
+def _orca_line(vx, vy, other_vx, other_vy, px, py, radius, responsibility):
+    """
+    The ORCA half-plane for one neighbour, as in RVO2. Velocities left of the line through point along direction
+    are allowed.
+
+    :param vx: Our velocity
+    :param vy: Our velocity
+    :param other_vx: The neighbour's velocity
+    :param other_vy: The neighbour's velocity
+    :param px: The neighbour's position relative to ours
+    :param py: The neighbour's position relative to ours
+    :param radius: Combined radius
+    :param responsibility: Share of the avoidance we take, 0.5 between ships that both react, 1 for the rest
+    :return: (point x, point y, direction x, direction y)
+    """
+    rel_vx = vx - other_vx
+    rel_vy = vy - other_vy
+    distance2 = px * px + py * py
+    radius2 = radius * radius
+    inv_tau = 1 / TIME_HORIZON
+    if distance2 > radius2:
+        # w is from the cut-off circle's centre to the relative velocity
+        wx = rel_vx - inv_tau * px
+        wy = rel_vy - inv_tau * py
+        w_length2 = wx * wx + wy * wy
+        dot = wx * px + wy * py
+        if dot < 0 and dot * dot > radius2 * w_length2:
+            # closest to the cut-off circle
+            w_length = math.sqrt(w_length2)
+            unit_x, unit_y = wx / w_length, wy / w_length
+            dx, dy = unit_y, -unit_x
+            ux = (radius * inv_tau - w_length) * unit_x
+            uy = (radius * inv_tau - w_length) * unit_y
+        else:
+            # closest to one of the legs
+            leg = math.sqrt(distance2 - radius2)
+            if _det(px, py, wx, wy) > 0:
+                dx = (px * leg - py * radius) / distance2
+                dy = (px * radius + py * leg) / distance2
+            else:
+                dx = -(px * leg + py * radius) / distance2
+                dy = -(-px * radius + py * leg) / distance2
+            along = rel_vx * dx + rel_vy * dy
+            ux = along * dx - rel_vx
+            uy = along * dy - rel_vy
+    else:
+        # already too close, get apart within the turn
+        wx = rel_vx - px
+        wy = rel_vy - py
+        w_length = math.hypot(wx, wy)
+        if w_length:
+            unit_x, unit_y = wx / w_length, wy / w_length
+        else:
+            # right on top with the same velocity, any way out will do
+            unit_x, unit_y = 1.0, 0.0
+        dx, dy = unit_y, -unit_x
+        ux = (radius - w_length) * unit_x
+        uy = (radius - w_length) * unit_y
+    return vx + responsibility * ux, vy + responsibility * uy, dx, dy
+
+
+def _linear_program1(lines, i, max_speed, opt_x, opt_y, direction_opt):
+    px, py, dx, dy = lines[i]
+    dot = px * dx + py * dy
+    discriminant = dot * dot + max_speed * max_speed - (px * px + py * py)
+    if discriminant < 0:
+        # the speed limit rules out the whole line
+        return None
+    root = math.sqrt(discriminant)
+    t_left = -dot - root
+    t_right = -dot + root
+    for j in range(i):
+        qx, qy, ex, ey = lines[j]
+        denominator = _det(dx, dy, ex, ey)
+        numerator = _det(ex, ey, px - qx, py - qy)
+        if abs(denominator) <= EPSILON:
+            # parallel lines
+            if numerator < 0:
+                return None
+            continue
+        t = numerator / denominator
+        if denominator >= 0:
+            t_right = min(t_right, t)
+        else:
+            t_left = max(t_left, t)
+        if t_left > t_right:
+            return None
+    if direction_opt:
+        t = t_right if opt_x * dx + opt_y * dy > 0 else t_left
+    else:
+        t = min(max(dx * (opt_x - px) + dy * (opt_y - py), t_left), t_right)
+    return px + t * dx, py + t * dy
+
+
+def _linear_program2(lines, max_speed, opt_x, opt_y, direction_opt):
+    """
+    :return: How many lines were satisfied before the first that couldn't be, and the velocity at that point
+    """
+    if direction_opt:
+        result = (opt_x * max_speed, opt_y * max_speed)
+    elif opt_x * opt_x + opt_y * opt_y > max_speed * max_speed:
+        length = math.hypot(opt_x, opt_y)
+        result = (opt_x / length * max_speed, opt_y / length * max_speed)
+    else:
+        result = (opt_x, opt_y)
+    for i, (px, py, dx, dy) in enumerate(lines):
+        if _det(dx, dy, px - result[0], py - result[1]) > 0:
+            solved = _linear_program1(lines, i, max_speed, opt_x, opt_y, direction_opt)
+            if solved is None:
+                return i, result
+            result = solved
+    return len(lines), result
+
+
+def _linear_program3(lines, num_static, begin, max_speed, result):
+    """
+    No velocity meets every line, so minimise the furthest any ship line is crossed, static lines stay hard.
+    """
+    distance = 0
+    for i in range(begin, len(lines)):
+        px, py, dx, dy = lines[i]
+        if _det(dx, dy, px - result[0], py - result[1]) > distance:
+            projected = lines[:num_static]
+            for j in range(num_static, i):
+                qx, qy, ex, ey = lines[j]
+                denominator = _det(dx, dy, ex, ey)
+                if abs(denominator) <= EPSILON:
+                    if dx * ex + dy * ey > 0:
+                        continue
+                    point = (0.5 * (px + qx), 0.5 * (py + qy))
+                else:
+                    t = _det(ex, ey, px - qx, py - qy) / denominator
+                    point = (px + t * dx, py + t * dy)
+                direction_x, direction_y = ex - dx, ey - dy
+                length = math.hypot(direction_x, direction_y)
+                projected.append((point[0], point[1], direction_x / length, direction_y / length))
+            count, candidate = _linear_program2(projected, max_speed, -dy, dx, True)
+            if count >= len(projected):
+                result = candidate
+            distance = _det(dx, dy, px - result[0], py - result[1])
+    return result
+
+
+def _to_thrust(vx, vy):
+    """
+    :return: The integer (speed, angle) nearest the velocity
+    """
+    speed = math.hypot(vx, vy)
+    angle = round(math.degrees(math.atan2(vy, vx))) % 360
+    if speed < 0.5:
+        return 0, angle
+    best = None
+    for magnitude in {min(int(speed), constants.MAX_SPEED), min(int(speed) + 1, constants.MAX_SPEED)}:
+        x = magnitude * math.cos(math.radians(angle))
+        y = magnitude * math.sin(math.radians(angle))
+        error = (x - vx) ** 2 + (y - vy) ** 2
+        if best is None or error < best[0]:
+            best = (error, magnitude)
+    return best[1], angle
+
+
+def resolve_friendly_moves(game_map, deadline=None, additional_fudge=FUDGE):
+    """
+    Turn level friendly collision avoidance. Every ship of mine with a thrust in the command queue is an agent
+    that wants its thrust's velocity, all other ships of mine, docked enemies and planets stand still. Each agent
+    gets an ORCA half-plane per neighbour, found through Map.obstacles_around, taking half the avoidance with other
+    agents and all of it with the rest, and the velocity nearest the wanted one inside all of them. An agent whose
+    thrust already clears everything, by collision.moving_ship_collisions, is left alone and gets no half-planes.
+
+    Thrusts are integers and rounding can bring two ships back into touch, validation.validate_command_queue
+    is what makes sure nothing does. The cost is linear in the agents times their neighbours.
+
+    :param game_map.Map game_map: The map, with this turn's commands in command_queue
+    :param deadline: time.time() past which the solve is dropped and the commands are left alone
+    :return: How many thrusts were changed
+    :rtype: int
+    """
+    thrusts = validation.queued_thrusts(game_map.command_queue)
+    thrusts = {ship_id: thrust for ship_id, thrust in thrusts.items() if ship_id in game_map.my_ship_dict}
+    agents = validation.sync_thrusts(game_map, thrusts)
+    if not agents:
+        return 0
+    agent_ids = {ship.id for ship in agents}
+
+    def velocity(ship):
+        if ship.id not in agent_ids:
+            return 0.0, 0.0
+        return ship.speed * math.cos(math.radians(ship.angle)), ship.speed * math.sin(math.radians(ship.angle))
+
+    solved = {}
+    for ship in agents:
+        if deadline and time.time() > deadline:
+            botlog.NAVIGATION.warning('ORCA: out of time after %s of %s ships', len(solved), len(agents))
+            return 0
+        vx, vy = velocity(ship)
+        neighbours = []
+        for other in game_map.obstacles_around(ship, None, additional_fudge=additional_fudge):
+            radius = ship.radius + other.radius + additional_fudge
+            other_vx, other_vy = velocity(other) if isinstance(other, entity.Ship) else (0.0, 0.0)
+            is_agent = isinstance(other, entity.Ship) and other.id in agent_ids
+            neighbours.append((other, other_vx, other_vy, radius + additional_fudge / 2 if is_agent else radius,
+                               is_agent))
+        if not neighbours:
+            continue
+        others, other_vxs, other_vys, radii, _ = zip(*neighbours)
+        collided, _ = collision.moving_ship_collisions(
+            ship.x, ship.y, vx, vy, np.array([other.x for other in others], dtype=float),
+            np.array([other.y for other in others], dtype=float), np.array(other_vxs, dtype=float),
+            np.array(other_vys, dtype=float), np.array(radii, dtype=float))
+        if not collided.any():
+            # the wanted thrust clears everyone, ships closer than the radius but in lockstep included
+            continue
+
+        static_lines = []
+        ship_lines = []
+        for other, other_vx, other_vy, radius, is_agent in neighbours:
+            if is_agent:
+                ship_lines.append(_orca_line(vx, vy, other_vx, other_vy, other.x - ship.x, other.y - ship.y,
+                                             radius, 0.5))
+            else:
+                static_lines.append(_orca_line(vx, vy, 0.0, 0.0, other.x - ship.x, other.y - ship.y, radius, 1.0))
+        lines = static_lines + ship_lines
+        count, result = _linear_program2(lines, constants.MAX_SPEED, vx, vy, False)
+        if count < len(lines):
+            result = _linear_program3(lines, len(static_lines), count, constants.MAX_SPEED, result)
+        if (result[0] - vx) ** 2 + (result[1] - vy) ** 2 > EPSILON:
+            solved[ship.id] = _to_thrust(*result)
+
+    for ship_id, (speed, angle) in solved.items():
+        ship = game_map.my_ship_dict[ship_id]
+        botlog.NAVIGATION.info('ORCA: ship %s thrust %s %s -> %s %s', ship_id, ship.speed, ship.angle, speed, angle)
+        validation.set_thrust(ship, speed, angle)
+        game_map.command_queue[thrusts[ship_id][2]] = 't {} {} {}'.format(ship_id, speed, angle)
+    return len(solved)
+
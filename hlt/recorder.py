@@ -0,0 +1,169 @@
+"""
+Binary game recorder.
+
+Every turn is appended to a memory mapped data file as one length prefixed record holding the frame
+(as the record arrays of a MapSnapshot), the commands we sent and that turn's timings. A separate index
+file holds the (offset, length) of each record, so Recording can load any turn without reading the others.
+
+Record layout, headers little endian and arrays in native byte order:
+    uint32 length of the rest of the record
+    TURN_HEADER
+    ships (SHIP_RECORD * num_ships), planets (PLANET_RECORD * num_planets),
+    planet docked ids (int64 * num_docked), player ids (int64 * num_players), commands (utf-8)
+"""
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from .frame import MapSnapshot, PLANET_RECORD, SHIP_RECORD
+
+#: turn, map turn number, my id, width, height, num ships, num planets, num docked, num players,
+#: command bytes, then read wait, parse, compute and write times in seconds (nan if unknown)
+TURN_HEADER = struct.Struct('<qqqqqqqqqq4d')
+LENGTH_PREFIX = struct.Struct('<I')
+INDEX_ENTRY = np.dtype([('offset', '<u8'), ('length', '<u8')])
+#: Timings stored with every turn, in header order
+TIMING_FIELDS = ('read_wait', 'parse', 'compute', 'write')
+
+RecordedTurn = namedtuple('RecordedTurn', ['turn', 'snapshot', 'commands', 'timings'])
+
+
+class Recorder:
+    """
+    Appends turns to <path> and their offsets to <path>.idx. The data file is grown in chunks
+    and written through a memory map, so a turn costs a few memcpys and no syscalls most of the time.
+    """
+
+    def __init__(self, path, chunk_size=8 * 1024 * 1024):
+        """
+        :param str path: Data file to create, truncating any existing one. The index goes to path + '.idx'
+        :param int chunk_size: Bytes the data file grows by whenever it's full
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self._file = open(path, 'w+b')
+        # unbuffered so the index survives the engine killing us at the end of the game
+        self._index = open(path + '.idx', 'wb', buffering=0)
+        self._mmap = None
+        self._capacity = 0
+        self._end = 0
+        self.num_turns = 0
+        self._grow(chunk_size)
+
+    def _grow(self, min_free):
+        """
+        Extend the data file so at least min_free bytes are free and remap it.
+
+        :return: nothing
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+        self._capacity += max(self.chunk_size, min_free)
+        self._file.truncate(self._capacity)
+        self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+
+    def record(self, snapshot, commands, timings):
+        """
+        Append one turn.
+
+        :param frame.MapSnapshot snapshot: The turn's frame
+        :param str commands: The command string sent to the engine
+        :param dict timings: Seconds spent per phase, see TIMING_FIELDS. Missing ones are stored as nan
+        :return: nothing
+        """
+        command_bytes = commands.encode()
+        player_ids = np.asarray(snapshot.player_ids, dtype='<i8')
+        header = TURN_HEADER.pack(self.num_turns, snapshot.turn_num, snapshot.my_id, snapshot.width, snapshot.height,
+                                  len(snapshot.ships), len(snapshot.planets), len(snapshot.planet_docked_ids),
+                                  len(player_ids), len(command_bytes),
+                                  *[float('nan') if timings.get(field) is None else timings[field]
+                                    for field in TIMING_FIELDS])
+        parts = (header, snapshot.ships.tobytes(), snapshot.planets.tobytes(),
+                 snapshot.planet_docked_ids.astype('<i8').tobytes(), player_ids.tobytes(), command_bytes)
+        length = sum(len(part) for part in parts)
+
+        if self._end + LENGTH_PREFIX.size + length > self._capacity:
+            self._grow(LENGTH_PREFIX.size + length)
+        start = self._end
+        LENGTH_PREFIX.pack_into(self._mmap, start, length)
+        cursor = start + LENGTH_PREFIX.size
+        for part in parts:
+            self._mmap[cursor:cursor + len(part)] = part
+            cursor += len(part)
+        self._end = cursor
+
+        self._index.write(np.array([(start, LENGTH_PREFIX.size + length)], dtype=INDEX_ENTRY).tobytes())
+        self.num_turns += 1
+
+    def close(self):
+        """
+        Trim the data file to what was written and close everything.
+
+        :return: nothing
+        """
+        if self._file.closed:
+            return
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.truncate(self._end)
+        self._file.close()
+        self._index.close()
+
+
+class Recording:
+    """
+    Read only view of a recorded game. recording[turn] decodes a single turn straight from the memory map.
+    """
+
+    def __init__(self, path):
+        """
+        :param str path: Data file written by a Recorder
+        """
+        self.path = path
+        self._index = np.fromfile(path + '.idx', dtype=INDEX_ENTRY)
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b''
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, turn):
+        """
+        :param int turn: Index of the turn, 0 is the initial frame
+        :return: The recorded turn. Its arrays are copied out of the file, so they stay valid past close()
+        :rtype: RecordedTurn
+        """
+        offset = int(self._index[turn]['offset'])
+        cursor = offset + LENGTH_PREFIX.size
+        (turn_index, turn_num, my_id, width, height, num_ships, num_planets, num_docked, num_players,
+         num_command_bytes, *timings) = TURN_HEADER.unpack_from(self._mmap, cursor)
+        cursor += TURN_HEADER.size
+
+        # copies, an mmap can't be closed while arrays still point into it
+        ships = np.frombuffer(self._mmap, dtype=SHIP_RECORD, count=num_ships, offset=cursor).copy()
+        cursor += ships.nbytes
+        planets = np.frombuffer(self._mmap, dtype=PLANET_RECORD, count=num_planets, offset=cursor).copy()
+        cursor += planets.nbytes
+        planet_docked_ids = np.frombuffer(self._mmap, dtype='<i8', count=num_docked, offset=cursor).copy()
+        cursor += planet_docked_ids.nbytes
+        player_ids = np.frombuffer(self._mmap, dtype='<i8', count=num_players, offset=cursor)
+        cursor += player_ids.nbytes
+        commands = bytes(self._mmap[cursor:cursor + num_command_bytes]).decode()
+        for array in (ships, planets, planet_docked_ids):
+            array.flags.writeable = False
+
+        snapshot = MapSnapshot(turn_num, my_id, width, height, tuple(player_ids.tolist()),
+                               ships, planets, planet_docked_ids)
+        return RecordedTurn(turn_index, snapshot, commands, dict(zip(TIMING_FIELDS, timings)))
+
+    def __iter__(self):
+        for turn in range(len(self)):
+            yield self[turn]
+
+    def close(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
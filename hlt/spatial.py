@@ -0,0 +1,121 @@
+import numpy as np
+
+from . import constants
+
+#: How far a ship's distance point can be from its frame position: a full thrust to its
+#: end of turn position plus the radius and unit of fudge calculate_min_distance2_between adds
+SHIP_PAD = constants.MAX_SPEED + constants.SHIP_RADIUS + 1
+
+
+class SpatialGrid:
+    """
+    Uniform grid over the map, built once per frame. Rows are bucketed by the cell their centre falls in
+    and stored cell by cell, so the rows of a run of cells along x are one contiguous slice.
+
+    Every row carries a pad, the furthest its distance point can be from its centre. A query for radius R
+    returns every row whose centre is within R plus its pad, a superset of the rows within R.
+    """
+
+    def __init__(self, xs, ys, pads, width, height, cell_size=constants.MAX_SPEED):
+        """
+        :param xs: x-coordinate of every row
+        :param ys: y-coordinate of every row
+        :param pads: Pad of every row
+        :param width: Map width
+        :param height: Map height
+        :param cell_size: Side of a cell
+        """
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.ys = np.asarray(ys, dtype=np.float64)
+        self.pads = np.asarray(pads, dtype=np.float64)
+        self.cell_size = cell_size
+        self.num_x = int(width // cell_size) + 1
+        self.num_y = int(height // cell_size) + 1
+        self.max_pad = float(self.pads.max(initial=0))
+
+        cells = self._cell_y(self.ys) * self.num_x + self._cell_x(self.xs)
+        self._order = np.argsort(cells, kind='stable')
+        self._cell_start = np.searchsorted(cells[self._order], np.arange(self.num_x * self.num_y + 1))
+
+    def _cell_x(self, x):
+        return np.clip(np.floor_divide(x, self.cell_size).astype(np.int64), 0, self.num_x - 1)
+
+    def _cell_y(self, y):
+        return np.clip(np.floor_divide(y, self.cell_size).astype(np.int64), 0, self.num_y - 1)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _rows_in_box(self, x_min, x_max, y_min, y_max):
+        """
+        :return: Ascending rows whose centre falls in a cell overlapping the box
+        :rtype: numpy.ndarray
+        """
+        x0, x1 = self._cell_x(np.array([x_min, x_max]))
+        y0, y1 = self._cell_y(np.array([y_min, y_max]))
+        first_cells = np.arange(y0, y1 + 1) * self.num_x + x0
+        slices = [self._order[start:end] for start, end in
+                  zip(self._cell_start[first_cells], self._cell_start[first_cells + (x1 - x0 + 1)])]
+        return np.sort(np.concatenate(slices)) if slices else np.arange(0)
+
+    def rows_within(self, x, y, radius=None):
+        """
+        :param float x: x-coordinate of the query point
+        :param float y: y-coordinate of the query point
+        :param float radius: Query radius, None for every row
+        :return: Ascending rows whose centre is within radius plus their pad of (x, y)
+        :rtype: numpy.ndarray
+        """
+        if radius is None:
+            return np.arange(len(self))
+        reach = radius + self.max_pad
+        rows = self._rows_in_box(x - reach, x + reach, y - reach, y + reach)
+        limit = radius + self.pads[rows]
+        keep = (self.xs[rows] - x) ** 2 + (self.ys[rows] - y) ** 2 <= limit * limit
+        return rows[keep]
+
+    def rows_near_segment(self, x0, y0, x1, y1, radius):
+        """
+        Capsule query, the rows whose centre is within radius plus their pad of the segment.
+
+        :return: Ascending rows
+        :rtype: numpy.ndarray
+        """
+        reach = radius + self.max_pad
+        rows = self._rows_in_box(min(x0, x1) - reach, max(x0, x1) + reach, min(y0, y1) - reach, max(y0, y1) + reach)
+        dx = x1 - x0
+        dy = y1 - y0
+        length2 = dx * dx + dy * dy
+        xs = self.xs[rows] - x0
+        ys = self.ys[rows] - y0
+        t = np.clip((xs * dx + ys * dy) / length2, 0, 1) if length2 else 0
+        limit = radius + self.pads[rows]
+        keep = (xs - t * dx) ** 2 + (ys - t * dy) ** 2 <= limit * limit
+        return rows[keep]
+
+    def rows_by_lower_bound(self, x, y, radius=None):
+        """
+        The rows of rows_within, each with the least squared distance its distance point can be at,
+        nearest first. Lets a caller compute exact distances lazily and stop once it has what it needs.
+
+        :return: rows and their lower bounds
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        rows = self.rows_within(x, y, radius)
+        centre_distance = np.hypot(self.xs[rows] - x, self.ys[rows] - y)
+        # shaved a little so float rounding can't push a bound above the exact distance
+        lower_bounds = np.maximum(centre_distance - self.pads[rows] - 1e-6, 0) ** 2
+        order = np.argsort(lower_bounds, kind='stable')
+        return rows[order], lower_bounds[order]
+
+    @staticmethod
+    def for_frame(frame, width, height):
+        """
+        :param frame.FrameArrays frame: The parsed frame
+        :return: The grid over the frame's ships and the grid over its planets, both in frame row order
+        :rtype: (SpatialGrid, SpatialGrid)
+        """
+        ships = SpatialGrid(frame.ship_x, frame.ship_y, np.full(frame.num_ships(), SHIP_PAD), width, height)
+        # planets get their distance point 0.5 outside of their surface
+        planets = SpatialGrid(frame.planet_x, frame.planet_y, frame.planet_radius + 0.5, width, height)
+        return ships, planets
@@ -16,20 +16,8 @@ def calculate_player_score(game_map, my_ship_dict):
 
     my_id = game_map.get_me().get_id()
 
+    # scores and centroids are already computed by the parser
     for player in game_map.all_players():
-        running_x = running_y = 0
-        for ship in player.all_ships():
-            player.score += 2.2 if ship.is_docked() else 1.0
-            running_x += ship.x
-            running_y += ship.y
-            ship.set_mine() if player.get_id() == my_id else ship.set_enemy()
-
-        if len(player.all_ships()) > 0:
-            player.avg_x = running_x / len(player.all_ships())
-            player.avg_y = running_y / len(player.all_ships())
-
-        player.centroid_ship = entity.Position(player.avg_x, player.avg_y)
-
         if player.get_id() == my_id:
             continue
         else:
@@ -62,14 +50,15 @@ def update_my_ship_status(game_map, closest_enemy, my_ship_dict, my_clustered_sh
     """
 
     my_player = game_map.get_me()
+    delta = game_map.delta
 
     for ship in my_player.all_ships():
-        ship.distance_to_enemy = ship.calculate_distance_between(closest_enemy.centroid_ship)
+        ship.distance_to_enemy = game_map.distances.to_point(ship, closest_enemy.centroid_ship)
+        # the parser already refreshed the ship in place, we only need to track new ones
         my_ship = my_ship_dict.get(ship.id)
         if not my_ship:
             my_ship_dict[ship.id] = ship
         else:
-            my_ship.update_ship(ship)
             #if (my_ship.health < constants.BASE_SHIP_HEALTH / 3) and my_ship.is_clumped:
             #    my_clustered_ships_dict[my_ship.clump_id].remove_ship_from_cluster(my_ship)
             if game_map.turn_num >= 5:
@@ -77,26 +66,35 @@ def update_my_ship_status(game_map, closest_enemy, my_ship_dict, my_clustered_sh
                     if not my_ship.clump_id == 1:
                         game_map.my_clustered_ships_dict[my_ship.clump_id].remove_ship_from_cluster(my_ship)
 
-    list_ids_not_updated = [my_ship_dict[ship_id].id for ship_id in my_ship_dict if not my_ship_dict[ship_id].updated_this_turn]
+    # clusters only need their state refreshed if one of their ships moved, took damage or died
+    changed_cluster_ids = set()
+    for ship_id in list(delta.displacement) + list(delta.health_changes):
+        my_ship = my_ship_dict.get(ship_id)
+        if my_ship and my_ship.is_clumped:
+            changed_cluster_ids.add(my_ship.clump_id)
 
-    for ship_id in list_ids_not_updated:
-        dead_ship = my_ship_dict[ship_id]
+    for dead_ship in delta.died:
+        if dead_ship.id not in my_ship_dict:
+            continue
         if dead_ship.is_clumped:
             my_clustered_ships_dict[dead_ship.clump_id].ship_list.remove(dead_ship)
-        del my_ship_dict[ship_id]
+            changed_cluster_ids.add(dead_ship.clump_id)
+        del my_ship_dict[dead_ship.id]
 
-    logging.info('TURN UPDATE: ships alive: {}'.format(list(my_ship_dict.keys())))
+    logging.info('TURN UPDATE: ships alive: %s', list(my_ship_dict.keys()))
 
+    # clusters that were emptied last turn still have to go through update_state to get deleted
     list_cluster_ids_not_updated = [cluster_id for cluster_id, ship_cluster in my_clustered_ships_dict.items() if
+                                    (cluster_id in changed_cluster_ids or len(ship_cluster.ship_list) < 2) and
                                     not ship_cluster.update_state()]
 
-    logging.debug('my clusters:{}'.format(my_clustered_ships_dict))
+    logging.debug('my clusters:%s', my_clustered_ships_dict)
 
     for cluster_id, cluster in my_clustered_ships_dict.items():
-        logging.debug('cluster: {}'.format(cluster))
-        logging.debug('ships: {}'.format(cluster.ship_list))
+        logging.debug('cluster: %s', cluster)
+        logging.debug('ships: %s', cluster.ship_list)
 
-    logging.debug('my clusters not updated:{}'.format(list_cluster_ids_not_updated))
+    logging.debug('my clusters not updated:%s', list_cluster_ids_not_updated)
     for cluster_id in list_cluster_ids_not_updated:
         del my_clustered_ships_dict[cluster_id]
 
@@ -106,7 +104,7 @@ def update_my_ship_status(game_map, closest_enemy, my_ship_dict, my_clustered_sh
 def get_turn_strategy(game_map, prev_turn_strategy, closest_enemy, initial_closest_enemy_id, rush_target, initial_closest_enemy_location):
 
     # Determine what strategy to use..
-    num_players = len([player for player in game_map.all_players() if len(player.all_ships()) > 0])
+    num_players = len([player for player in game_map.all_players() if player.num_ships > 0])
     current_strategy = prev_turn_strategy
 
     # Should we rush?
@@ -128,15 +126,15 @@ def get_turn_strategy(game_map, prev_turn_strategy, closest_enemy, initial_close
         buffer_turns = 11 if enemy_nearest_planet.num_docking_spots >= 3 else 16
         if num_players > 2:
             buffer_turns = 9.5 if enemy_nearest_planet.num_docking_spots >= 3 else 12.5
-        logging.debug('Turns to get to target: {}'.format(closest_point_enemy_nearest_planet.distance_from_me / constants.MAX_SPEED))
-        logging.debug('Enemy turns to get to target: {}, buffer: {}'.format((closest_point_enemy_nearest_planet.distance_from_enemy / constants.MAX_SPEED), buffer_turns))
+        logging.debug('Turns to get to target: %s', closest_point_enemy_nearest_planet.distance_from_me / constants.MAX_SPEED)
+        logging.debug('Enemy turns to get to target: %s, buffer: %s', closest_point_enemy_nearest_planet.distance_from_enemy / constants.MAX_SPEED, buffer_turns)
 
         if (closest_point_enemy_nearest_planet.distance_from_me / constants.MAX_SPEED) <= \
                 (closest_point_enemy_nearest_planet.distance_from_enemy / constants.MAX_SPEED) + buffer_turns:
             if num_players > 2:
-                logging.info('Rush target: {}'.format(closest_point_enemy_nearest_planet))
+                logging.info('Rush target: %s', closest_point_enemy_nearest_planet)
                 return constants.BotStrategy.RUSH, closest_point_enemy_nearest_planet
-            logging.info('Rush target: {}'.format(closest_enemy.centroid_ship))
+            logging.info('Rush target: %s', closest_enemy.centroid_ship)
             return constants.BotStrategy.RUSH, closest_enemy.centroid_ship
 
         # 2nd situation if we are going mid.. we'll clump and move to mid_map
@@ -145,25 +143,25 @@ def get_turn_strategy(game_map, prev_turn_strategy, closest_enemy, initial_close
             utility = utilcalc.get_utility(guide_ship, planet, game_map, current_strategy,
                                            guide_ship.calculate_min_distance_between(planet))
             planets_by_utility.setdefault(utility, []).append(planet)
-            logging.debug('mid planet deflection planet utility: {}, planet: {}'.format(utility, planet))
+            logging.debug('mid planet deflection planet utility: %s, planet: %s', utility, planet)
 
         highest_utility_planet = next(p_list for util, p_list in sorted(planets_by_utility.items(), reverse=True))[0]
         if highest_utility_planet.id <= 3:
-            logging.info('my centroid: {}'.format(game_map.get_me().centroid_ship))
-            logging.info('Rush target mid map: {}'.format(game_map.get_mid_map()))
+            logging.info('my centroid: %s', game_map.get_me().centroid_ship)
+            logging.info('Rush target mid map: %s', game_map.get_mid_map())
             return constants.BotStrategy.RUSH, game_map.get_mid_map()
 
     # 4 player game?
     if num_players > 2:
-        logging.debug('current closest enemy:{}, ships: {}'.format(closest_enemy, len(closest_enemy.all_ships())))
+        logging.debug('current closest enemy:%s, ships: %s', closest_enemy, len(closest_enemy.all_ships()))
         if current_strategy != constants.BotStrategy.RUSH:
             return constants.BotStrategy.FOUR_PLAYERS, None
 
     if current_strategy == constants.BotStrategy.RUSH:
         if rush_target:
             # do we break out of rush target?
-            enemy_ships = [s for s in closest_enemy.all_ships()]
-            if [enemy for enemy in enemy_ships if enemy.is_docked()]:
+            enemy_ships = closest_enemy.all_ships()
+            if closest_enemy.num_docked_ships:
                 logging.info('Rush broken')
                 return constants.BotStrategy.RUSH, None
             if closest_enemy.all_ships():
@@ -177,11 +175,11 @@ def get_turn_strategy(game_map, prev_turn_strategy, closest_enemy, initial_close
             all_ship_distance = game_map.get_me().centroid_ship.calculate_distance_between(closest_enemy.centroid_ship)
             if all_ship_distance <= constants.RUSH_BREAK_DISTANCE:
                 logging.info('Rush broken')
-                logging.info('{} away from enemy ships'.format(all_ship_distance))
+                logging.info('%s away from enemy ships', all_ship_distance)
                 return constants.BotStrategy.RUSH, None
 
             rush_distance = game_map.get_me().centroid_ship.calculate_distance_between(rush_target)
-            logging.info('{} away from rush target'.format(rush_distance))
+            logging.info('%s away from rush target', rush_distance)
             if rush_distance <= constants.RUSH_BREAK_DISTANCE:
                 logging.info('Rush broken')
                 # if we did mid rush and enemy is too far
@@ -199,7 +197,7 @@ def get_turn_strategy(game_map, prev_turn_strategy, closest_enemy, initial_close
             break_flag = False
             # if they have docked ships we continue rushing..
             if closest_enemy.id == initial_closest_enemy_id:
-                if [enemy_ship for enemy_ship in closest_enemy.all_ships() if enemy_ship.is_docked()]:
+                if closest_enemy.num_docked_ships:
                     return constants.BotStrategy.RUSH, None
 
             # do we break out of rush strategy?
@@ -209,11 +207,10 @@ def get_turn_strategy(game_map, prev_turn_strategy, closest_enemy, initial_close
             if closest_enemy.id != initial_closest_enemy_id:
                 break_flag = True
 
-            if len(closest_enemy.all_ships()) == 1:
+            if closest_enemy.num_ships == 1:
                 break_flag = True
 
-            if (2 * sum([ship.health for ship in closest_enemy.all_ships()])) <= \
-                    sum([ship.health for ship in game_map.get_me().all_ships()]):
+            if (2 * closest_enemy.total_health) <= game_map.get_me().total_health:
                 break_flag = True
 
             # ebretel strat
@@ -251,27 +248,19 @@ def desertion(my_rank, current_strategy, my_player, list_enemies, num_players_al
     if current_strategy == constants.BotStrategy.FOUR_PLAYERS:
         if turn_number >= 75:
             if my_rank == num_players_alive - 1:
-                logging.info('desertion threshold reached.. My rank:{}'.format(my_rank))
+                logging.info('desertion threshold reached.. My rank:%s', my_rank)
                 return True
             elif my_player.score <= list_enemies[0].score - 30:
-                logging.info('desertion threshold reached.. My score:{}'.format(my_player.score))
+                logging.info('desertion threshold reached.. My score:%s', my_player.score)
                 return True
     else:
         return False
 
 
 def health_advantage(game_map):
-    mid_entities_by_distance = game_map.nearby_entities_by_distance(game_map.get_mid_map(),exclude_planets=True)
-    my_ship_hp = 0
-    enemy_ship_hp = 0
-    for distance in sorted(mid_entities_by_distance):
-        for entity in mid_entities_by_distance[distance]:
-            if entity.is_docked():
-                continue
-            if entity.owner == game_map.get_me():
-                my_ship_hp += entity.health
-            else:
-                enemy_ship_hp += entity.health
+    # undocked health is summed by the parser, nothing has docked or taken damage yet this turn
+    my_ship_hp = game_map.get_me().undocked_health
+    enemy_ship_hp = sum(player.undocked_health for player in game_map.all_players() if player != game_map.get_me())
     return my_ship_hp - enemy_ship_hp
 
 def calculate_utility_multipliers_old(game_map):
@@ -301,7 +290,7 @@ def calculate_utility_multipliers_old(game_map):
             mid_map_multiplier = 1.3
     """
 
-    logging.info('UTILITY MULTIPLIERS: mid_spots: {}, total_docking_spots: {}'.format(mid_docking_spots, total_docking_spots))
+    logging.info('UTILITY MULTIPLIERS: mid_spots: %s, total_docking_spots: %s', mid_docking_spots, total_docking_spots)
     return planet_multiplier, docked_ship_aggression_multiplier
 
 def calculate_utility_multipliers(game_map, closest_enemy):
@@ -0,0 +1,73 @@
+import numpy as np
+
+from . import collision, constants, entity
+
+#: How many of the best collision free thrusts get the exact tether check before the search gives up
+TETHER_CHECKS = 8
+
+# every thrust the engine takes, speed major: all 360 integer angles at speed 0, then at speed 1 and so on
+_SPEEDS = np.repeat(np.arange(constants.MAX_SPEED + 1), 360)
+_ANGLES = np.tile(np.arange(360), constants.MAX_SPEED + 1)
+_VX = (_SPEEDS * np.cos(np.radians(_ANGLES)))[:, np.newaxis]
+_VY = (_SPEEDS * np.sin(np.radians(_ANGLES)))[:, np.newaxis]
+
+
+def search_thrust(ship, destination, game_map, ignore=(), ignore_entities=(), additional_fudge=0.2,
+                  min_speed=None, margin=0):
+    """
+    Sampling navigation: every integer angle at every speed up to MAX_SPEED is checked against all obstacles
+    within a full thrust in one collision.moving_ship_collisions call, my ships that already moved along their
+    thrust, and the best move is the collision free one ending nearest the destination.
+
+    The cost is the same for every ship, (MAX_SPEED + 1) * 360 moves times the obstacles in reach, no matter how
+    cluttered the way is. The target isn't excluded from the obstacles like in obstacles_between, the
+    destination is expected to sit outside it as closest_point_to puts it.
+
+    :param entity.Ship ship: The ship to move
+    :param entity.Entity destination: Where to go, only its coordinates are used
+    :param game_map.Map game_map: The map
+    :param ignore: Which entity type to ignore
+    :param ignore_entities: Obstacles to leave out
+    :param min_speed: Slowest thrust to consider
+    :param margin: How far from the map edges the move has to end
+    :return: (speed, angle) of the best thrust, None if every move collides
+    :rtype: (int, int)
+    """
+    obstacles = [obstacle for obstacle in game_map.obstacles_around(ship, None, ignore, additional_fudge)
+                 if obstacle not in ignore_entities]
+
+    end_x = ship.x + _VX[:, 0]
+    end_y = ship.y + _VY[:, 0]
+    free = (end_x >= margin) & (end_x <= game_map.width - margin) & \
+        (end_y >= margin) & (end_y <= game_map.height - margin)
+    if min_speed:
+        free &= _SPEEDS >= min_speed
+
+    tethers = []
+    if obstacles:
+        motions = [collision.obstacle_motion(ship, obstacle, additional_fudge) for obstacle in obstacles]
+        obstacle_vx, obstacle_vy, reach = (np.array(column, dtype=float) for column in zip(*motions))
+        collided, _ = collision.moving_ship_collisions(
+            ship.x, ship.y, _VX, _VY,
+            np.array([obstacle.x for obstacle in obstacles], dtype=float),
+            np.array([obstacle.y for obstacle in obstacles], dtype=float),
+            obstacle_vx, obstacle_vy, reach)
+        free &= ~collided.any(axis=1)
+        for obstacle in obstacles:
+            if isinstance(obstacle, entity.Ship) and obstacle.owner == game_map.get_me() and obstacle.is_docked():
+                tether = game_map.tether(obstacle)
+                if tether:
+                    tethers.append(tether)
+
+    moves = np.flatnonzero(free)
+    if not len(moves):
+        return None
+    distance2 = (end_x[moves] - destination.x) ** 2 + (end_y[moves] - destination.y) ** 2
+    # stable so equally good moves keep the speed major order, the slowest goes first
+    for move in moves[np.argsort(distance2, kind='stable')[:TETHER_CHECKS if tethers else 1]].tolist():
+        end = entity.Position(float(end_x[move]), float(end_y[move]))
+        if _SPEEDS[move] and any(collision.does_moving_ship_intersect_capsule(ship, end, tether, additional_fudge)[0]
+                                 for tether in tethers):
+            continue
+        return int(_SPEEDS[move]), int(_ANGLES[move])
+    return None
@@ -1,110 +1,189 @@
-from . import constants, entity, strategy
-import logging, time, math
-from operator import attrgetter
+from . import botlog, constants, entity, strategy
+from .spatial import SHIP_PAD
+import time, math, heapq
+from itertools import groupby
+from operator import attrgetter, itemgetter
 
 def set_ship_neighbours(game_map, current_strategy, dock_check_distance):
+    """
+    Fill in every ship's neighbours from one sweep over the unique pairs of ships, both ends of a pair get their
+    entry from the same visit. The lists then go through the same steps as set_ship_neighbor_single, nearest first,
+    ship by ship in player order, so they come out the same.
+    """
+    my_player = game_map.get_me()
+    reval_horizon = constants.REVAL_TURN_HORIZON[current_strategy.value]
+    horizon_radius = reval_horizon * constants.MAX_SPEED
+    neighbor_radius = get_neighbor_radius(horizon_radius, dock_check_distance)
+    # the furthest each kind of pair is looked at, enemies only care about each other when clumped
+    reach = {(False, False): 2, (True, True): constants.NEARBY_RADIUS}
+    reach[True, False] = reach[False, True] = horizon_radius
+
+    nearby_by_id = {}
+    swept_rows = game_map.frame.num_ships()
+    current_row = -1
+    for ship, other, centre_distance in game_map.ship_pairs(horizon_radius):
+        if game_map.ship_row(ship) != current_row:
+            current_row = game_map.ship_row(ship)
+            if (time.time() - game_map.turn_timer) >= 1.40:
+                botlog.UTILITY.warning('UTILITY: Turn time now: %s, breaking..', time.time() - game_map.turn_timer)
+                # only the ships before this one have seen all their pairs
+                swept_rows = current_row
+                break
+        ship_is_mine = ship.owner == my_player
+        other_is_mine = other.owner == my_player
+        if centre_distance > reach[ship_is_mine, other_is_mine] + SHIP_PAD:
+            continue
+        distance2 = ship.calculate_min_distance2_between(other)
+        # the distance only depends on which end is moving this turn
+        if ship.pos_eot or other.pos_eot:
+            other_distance2 = other.calculate_min_distance2_between(ship)
+        else:
+            other_distance2 = distance2
+        if _is_in_reach(ship, ship_is_mine, distance2, reval_horizon, horizon_radius, neighbor_radius):
+            nearby_by_id.setdefault(ship.id, []).append((distance2, game_map.ship_row(other), other))
+        if _is_in_reach(other, other_is_mine, other_distance2, reval_horizon, horizon_radius, neighbor_radius):
+            nearby_by_id.setdefault(other.id, []).append((other_distance2, current_row, ship))
 
     for player in game_map.all_players():
         for ship in player.all_ships():
-            if (time.time() - game_map.turn_timer) >= 1.40:
-                logging.warning('UTILITY: Turn time now: {}, breaking..'.format((time.time() - game_map.turn_timer)))
+            if game_map.ship_row(ship) >= swept_rows or (time.time() - game_map.turn_timer) >= 1.40:
                 break
-            set_ship_neighbor_single(ship, game_map, current_strategy, dock_check_radius=dock_check_distance)
+            nearby_ships = ((distance2, other) for distance2, _, other in sorted(nearby_by_id.get(ship.id, ()),
+                                                                                  key=itemgetter(0, 1)))
+            if ship.owner != my_player:
+                _set_enemy_neighbors(ship, nearby_ships, game_map, current_strategy)
+            elif not ship.is_docked():
+                _set_my_neighbors(game_map.my_ship_dict[ship.id], nearby_ships, game_map, current_strategy,
+                                  dock_check_distance)
+
+
+def _is_in_reach(ship, is_mine, distance2, reval_horizon, horizon_radius, neighbor_radius):
+    """
+    Whether set_ship_neighbor_single would get to a ship this far away
+    """
+    if (distance2 / (constants.MAX_SPEED ** 2)) >= (reval_horizon ** 2):
+        return False
+    if not is_mine:
+        return distance2 <= horizon_radius * horizon_radius
+    return (not ship.is_docked()) and distance2 <= neighbor_radius * neighbor_radius
+
+
+def get_neighbor_radius(horizon_radius, dock_check_radius):
+    # nothing on my side looks further than the nearest enemy or dock check radius
+    return min(horizon_radius, max(11 * constants.MAX_SPEED, dock_check_radius, constants.NEARBY_RADIUS))
 
 
 def set_ship_neighbor_single(ship, game_map, current_strategy, dock_check_radius=constants.DOCK_CHECK_RADIUS):
 
-    my_ship_dict = game_map.my_ship_dict
-    nearby_ships_by_distance = game_map.nearby_entities_by_distance(ship, exclude_planets=True)
+    horizon_radius = constants.REVAL_TURN_HORIZON[current_strategy.value] * constants.MAX_SPEED
     if ship.owner != game_map.get_me():
-        ship.distance_to_my_centroid = game_map.get_me().centroid_ship.calculate_distance_between(ship)
-        for distance2 in sorted(nearby_ships_by_distance):
-            if (time.time() - game_map.turn_timer) >= 1.40:
-                logging.warning('SHIP NEIGHBORS: Turn time now: {}, breaking..'.format((time.time() - game_map.turn_timer)))
-                break
-            if (distance2 / (constants.MAX_SPEED**2)) >= (constants.REVAL_TURN_HORIZON[current_strategy.value] ** 2):
-                break
-            for nearby_ship in nearby_ships_by_distance[distance2]:
-                if nearby_ship.owner != game_map.get_me():
-                    if distance2 <= (2**2) and not nearby_ship.is_docked():
-                        ship.clumped_enemies.append(nearby_ship)
-                else:
-                    nearby_ship = my_ship_dict[nearby_ship.id]
-                    if distance2 <= (constants.WEAPON_RADIUS ** 2):
-                        if not ship.is_docked():
-                            ship.friends_engaged_this_turn.append(nearby_ship)
-                            logging.debug('UTILITY: enemy ship:{}, attacking my ship :{}'.format(ship.id, nearby_ship.id))
-
-                    if nearby_ship.is_docked():
-                        set_proximity_discount(ship, nearby_ship, current_strategy)
-
-                    elif distance2 <= (constants.MOVE_AND_FIRE_RADIUS ** 2):
-                        #if game_map.obstacles_between(ship, nearby_ship, ignore=entity.Ship):
-                        #    continue
-                        ship.friends_ready_to_attack.append(nearby_ship)
-                        logging.debug('UTILITY: enemy ship:{}, friendly ready to attack:{}'.format(ship.id, nearby_ship.id))
-
-        if ship.friends_engaged_this_turn:
-            ship.weapon_cooldown = True
-            for friendly in ship.friends_engaged_this_turn:
-                friendly.health -= constants.WEAPON_DAMAGE / len(ship.friends_engaged_this_turn)
-                if friendly.health <= 0:
-                    friendly.has_command = True
-                    logging.debug('UTILITY: friendly died this turn: {}'.format(friendly))
-                    if friendly.is_docked():
-                        friendly.planet.remove_docked_ship(friendly)
-
-        ship.ship_neighbors_flag = True
+        # my docked ships count at any distance inside the horizon
+        nearby_ships = game_map.nearest_ships(ship, horizon_radius)
+        _set_enemy_neighbors(ship, nearby_ships, game_map, current_strategy)
 
     else:
-        my_ship = my_ship_dict[ship.id]
+        my_ship = game_map.my_ship_dict[ship.id]
         if my_ship.is_docked():
             return None
-        for distance2 in sorted(nearby_ships_by_distance):
-            if (distance2 / (constants.MAX_SPEED ** 2)) >= (constants.REVAL_TURN_HORIZON[current_strategy.value] ** 2):
-                break
-            if (time.time() - game_map.turn_timer) >= 1.40:
-                logging.warning('SHIP NEIGHBORS: Turn time now: {}, breaking..'.format((time.time() - game_map.turn_timer)))
-                break
-            for nearby_ship in nearby_ships_by_distance[distance2]:
-                if nearby_ship.owner == game_map.get_me():
-                    # 2* MAX_SPEED because then our ships can move to each other
-                    if distance2 <= (constants.MOVE_AND_FIRE_RADIUS ** 2) and not nearby_ship.is_docked():
-                        my_ship.nearby_undocked_friends.append(my_ship_dict[nearby_ship.id])
-                    # 1.5 distance away means is clumped
-                    if distance2 <= (1.3 ** 2) and not nearby_ship.is_docked():
-                        my_ship.clumpable_friends.append(my_ship_dict[nearby_ship.id])
-                    # NEARBY docked ships that we can defend..
-                    if distance2 <= (constants.NEARBY_RADIUS ** 2) and nearby_ship.is_docked():
-                        my_ship.nearby_docked_friends.append(my_ship_dict[nearby_ship.id])
-                elif nearby_ship.owner != game_map.get_me():
-                    # nearby radius away..
-                    if distance2 <= (constants.NEARBY_RADIUS ** 2):
-                        my_ship.nearby_enemies.append(nearby_ship)
-                    # nearby radius away..
-                    if distance2 <= (constants.MOVE_AND_FIRE_RADIUS ** 2):
-                        my_ship.nearby_enemies_to_fight.append(nearby_ship)
-                    # Engaged are those we are already fighting
-                    if distance2 <= (constants.WEAPON_RADIUS ** 2) and not nearby_ship.is_docked():
-                        my_ship.enemies_engaged.append(nearby_ship)
-                    # DOCK_CHECK_RADIUS is 3 * MAX_SPEED
-                    if (not nearby_ship.is_docked()) and (distance2 <= (dock_check_radius ** 2)):
-                        my_ship.dock_check_ships.append(nearby_ship)
-                    # Fill this up with first ship
-                    if (not nearby_ship.is_docked()) and not my_ship.nearest_enemy:
-                        if distance2 <= (11 * constants.MAX_SPEED) ** 2:
-                            my_ship.nearest_enemy = nearby_ship
-
-        if my_ship.enemies_engaged:
-            my_ship.weapon_cooldown = True
-            for enemy in my_ship.enemies_engaged:
-                enemy.health -= constants.WEAPON_DAMAGE / len(my_ship.enemies_engaged)
-                if enemy.health <= 0:
-                    logging.debug('enemy died this turn: {}'.format(enemy))
-                    if enemy.is_docked():
-                        enemy.planet.remove_docked_ship(enemy)
-
-        my_ship.ship_neighbors_flag = True
+        nearby_ships = game_map.nearest_ships(ship, get_neighbor_radius(horizon_radius, dock_check_radius))
+        _set_my_neighbors(my_ship, nearby_ships, game_map, current_strategy, dock_check_radius)
+
+
+def _set_enemy_neighbors(ship, nearby_ships, game_map, current_strategy):
+    """
+    :param nearby_ships: (squared distance, ship) pairs nearest first
+    """
+    my_ship_dict = game_map.my_ship_dict
+    ship.distance_to_my_centroid = game_map.distances.to_point(ship, game_map.get_me().centroid_ship)
+    for distance2, nearby_group in groupby(nearby_ships, key=itemgetter(0)):
+        if (time.time() - game_map.turn_timer) >= 1.40:
+            botlog.UTILITY.warning('SHIP NEIGHBORS: Turn time now: %s, breaking..', time.time() - game_map.turn_timer)
+            break
+        if (distance2 / (constants.MAX_SPEED**2)) >= (constants.REVAL_TURN_HORIZON[current_strategy.value] ** 2):
+            break
+        for _, nearby_ship in nearby_group:
+            if nearby_ship.owner != game_map.get_me():
+                if distance2 <= (2**2) and not nearby_ship.is_docked():
+                    ship.clumped_enemies.append(nearby_ship)
+            else:
+                nearby_ship = my_ship_dict[nearby_ship.id]
+                if distance2 <= (constants.WEAPON_RADIUS ** 2):
+                    if not ship.is_docked():
+                        ship.friends_engaged_this_turn.append(nearby_ship)
+                        botlog.UTILITY.debug('UTILITY: enemy ship:%s, attacking my ship :%s', ship.id, nearby_ship.id)
+
+                if nearby_ship.is_docked():
+                    set_proximity_discount(ship, nearby_ship, current_strategy, game_map)
+
+                elif distance2 <= (constants.MOVE_AND_FIRE_RADIUS ** 2):
+                    #if game_map.obstacles_between(ship, nearby_ship, ignore=entity.Ship):
+                    #    continue
+                    ship.friends_ready_to_attack.append(nearby_ship)
+                    botlog.UTILITY.debug('UTILITY: enemy ship:%s, friendly ready to attack:%s', ship.id, nearby_ship.id)
+
+    if ship.friends_engaged_this_turn:
+        ship.weapon_cooldown = True
+        for friendly in ship.friends_engaged_this_turn:
+            friendly.health -= constants.WEAPON_DAMAGE / len(ship.friends_engaged_this_turn)
+            if friendly.health <= 0:
+                friendly.has_command = True
+                botlog.UTILITY.debug('UTILITY: friendly died this turn: %s', friendly)
+                if friendly.is_docked():
+                    friendly.planet.remove_docked_ship(friendly)
+
+    ship.ship_neighbors_flag = True
+
+
+def _set_my_neighbors(my_ship, nearby_ships, game_map, current_strategy, dock_check_radius):
+    """
+    :param nearby_ships: (squared distance, ship) pairs nearest first
+    """
+    my_ship_dict = game_map.my_ship_dict
+    for distance2, nearby_group in groupby(nearby_ships, key=itemgetter(0)):
+        if (distance2 / (constants.MAX_SPEED ** 2)) >= (constants.REVAL_TURN_HORIZON[current_strategy.value] ** 2):
+            break
+        if (time.time() - game_map.turn_timer) >= 1.40:
+            botlog.UTILITY.warning('SHIP NEIGHBORS: Turn time now: %s, breaking..', time.time() - game_map.turn_timer)
+            break
+        for _, nearby_ship in nearby_group:
+            if nearby_ship.owner == game_map.get_me():
+                # 2* MAX_SPEED because then our ships can move to each other
+                if distance2 <= (constants.MOVE_AND_FIRE_RADIUS ** 2) and not nearby_ship.is_docked():
+                    my_ship.nearby_undocked_friends.append(my_ship_dict[nearby_ship.id])
+                # 1.5 distance away means is clumped
+                if distance2 <= (1.3 ** 2) and not nearby_ship.is_docked():
+                    my_ship.clumpable_friends.append(my_ship_dict[nearby_ship.id])
+                # NEARBY docked ships that we can defend..
+                if distance2 <= (constants.NEARBY_RADIUS ** 2) and nearby_ship.is_docked():
+                    my_ship.nearby_docked_friends.append(my_ship_dict[nearby_ship.id])
+            elif nearby_ship.owner != game_map.get_me():
+                # nearby radius away..
+                if distance2 <= (constants.NEARBY_RADIUS ** 2):
+                    my_ship.nearby_enemies.append(nearby_ship)
+                # nearby radius away..
+                if distance2 <= (constants.MOVE_AND_FIRE_RADIUS ** 2):
+                    my_ship.nearby_enemies_to_fight.append(nearby_ship)
+                # Engaged are those we are already fighting
+                if distance2 <= (constants.WEAPON_RADIUS ** 2) and not nearby_ship.is_docked():
+                    my_ship.enemies_engaged.append(nearby_ship)
+                # DOCK_CHECK_RADIUS is 3 * MAX_SPEED
+                if (not nearby_ship.is_docked()) and (distance2 <= (dock_check_radius ** 2)):
+                    my_ship.dock_check_ships.append(nearby_ship)
+                # Fill this up with first ship
+                if (not nearby_ship.is_docked()) and not my_ship.nearest_enemy:
+                    if distance2 <= (11 * constants.MAX_SPEED) ** 2:
+                        my_ship.nearest_enemy = nearby_ship
+
+    if my_ship.enemies_engaged:
+        my_ship.weapon_cooldown = True
+        for enemy in my_ship.enemies_engaged:
+            enemy.health -= constants.WEAPON_DAMAGE / len(my_ship.enemies_engaged)
+            if enemy.health <= 0:
+                botlog.UTILITY.debug('enemy died this turn: %s', enemy)
+                if enemy.is_docked():
+                    enemy.planet.remove_docked_ship(enemy)
+
+    my_ship.ship_neighbors_flag = True
 
 
 def assign_ships_to_clusters(game_map):
@@ -126,12 +205,12 @@ def assign_ships_to_clusters(game_map):
             game_map.MASTER_CLUSTER_ID += 1
             ship_cluster = entity.ShipCluster(list_clumpable_friends, game_map.MASTER_CLUSTER_ID, is_clumped=True)
             game_map.my_clustered_ships_dict[game_map.MASTER_CLUSTER_ID] = ship_cluster
-            logging.info('CLUSTERING: new cluster: {}, ships: {}'.format(game_map.MASTER_CLUSTER_ID, list_clumpable_friends))
+            botlog.UTILITY.info('CLUSTERING: new cluster: %s, ships: %s', game_map.MASTER_CLUSTER_ID, list_clumpable_friends)
 
 
-def set_proximity_discount(enemy_ship, my_docked_target, current_strategy):
+def set_proximity_discount(enemy_ship, my_docked_target, current_strategy, game_map):
 
-    distance = enemy_ship.calculate_distance_between(my_docked_target)
+    distance = game_map.distances.distance(enemy_ship, my_docked_target)
     reval_horizon = constants.REVAL_TURN_HORIZON[current_strategy.value]
     if not enemy_ship.my_docked_target:
         enemy_ship.my_docked_target = my_docked_target
@@ -140,7 +219,7 @@ def set_proximity_discount(enemy_ship, my_docked_target, current_strategy):
         if distance <= constants.WEAPON_RADIUS:
             enemy_ship.attacking_my_docked_target = True
             #logging.debug('SET_PROX_DISC: ship:{}, attacking my docked:{}'.format(enemy_ship.id, my_docked_target.id))
-    elif enemy_ship.is_target_farther_than(enemy_ship.my_docked_target, distance):
+    elif game_map.distances.distance(enemy_ship, enemy_ship.my_docked_target) >= distance:
         enemy_ship.my_docked_target = my_docked_target
         enemy_ship.set_proximity_discount(distance, reval_horizon)
         #logging.debug('SET_PROX_DISC: Closer docked target found: ship: {}, my docked: {}'.format(enemy_ship.id, my_docked_target.id))
@@ -160,7 +239,7 @@ def calculate_turn_utilities(game_map, current_strategy, my_ship_dict, list_enem
     for ship_id, ship in my_ship_dict.items():
 
         if (time.time() - turn_timer) >= 1.50:
-            logging.warning('UTILITY: Turn time now: {}, breaking..'.format((time.time() - turn_timer)))
+            botlog.UTILITY.warning('UTILITY: Turn time now: %s, breaking..', time.time() - turn_timer)
             break
 
         set_utilities_for_ship(ship, game_map, current_strategy, docking_discount, max_iterations, desertion_flag,
@@ -179,12 +258,11 @@ def get_utility_parameters(game_map, list_enemies, micro_flag, desertion_flag):
     :param list_enemies:
     :return:
     """
-    enemy_num_docked_ships = enemy_num_undocked_ships = 0
-    for enemy_player in list_enemies:
-        enemy_num_docked_ships += len([ship for ship in enemy_player.all_ships() if ship.is_docked()])
-        enemy_num_undocked_ships += len([ship for ship in enemy_player.all_ships() if not ship.is_docked()])
-    my_num_docked_ships = len([ship for ship_id, ship in game_map.my_ship_dict.items() if ship.is_docked()])
-    my_num_undocked_ships = len([ship for ship_id, ship in game_map.my_ship_dict.items() if not ship.is_docked()])
+    enemy_num_docked_ships = sum([enemy_player.num_docked_ships for enemy_player in list_enemies])
+    enemy_num_undocked_ships = sum([enemy_player.num_undocked_ships for enemy_player in list_enemies])
+    # my_ship_dict holds the same ships as my player, whose counts follow Map.mark_docking
+    my_num_docked_ships = game_map.get_me().num_docked_ships
+    my_num_undocked_ships = game_map.get_me().num_undocked_ships
 
     max_iterations = 3 if my_num_undocked_ships >= 100 else 15
 
@@ -192,18 +270,18 @@ def get_utility_parameters(game_map, list_enemies, micro_flag, desertion_flag):
             my_num_undocked_ships <= enemy_num_undocked_ships + 3) else 1
     if (not micro_flag) and (not desertion_flag):
         docking_discount = .5
-    if (game_map.turn_num >= 5) and len([enemy_ship for enemy_ship in list_enemies[0].all_ships() if enemy_ship.is_docked()]) == 0:
-        logging.debug('DOCKING DISCOUNT: EARLY GAME OPPONENT RUSH PENALTY')
+    if (game_map.turn_num >= 5) and list_enemies[0].num_docked_ships == 0:
+        botlog.UTILITY.debug('DOCKING DISCOUNT: EARLY GAME OPPONENT RUSH PENALTY')
         docking_discount = .5
 
-    dock_check_distance = constants.MAX_SPEED * (3 if len(game_map.get_me().all_ships()) > 5 else 8)
+    dock_check_distance = constants.MAX_SPEED * (3 if game_map.get_me().num_ships > 5 else 8)
 
     docked_enemies = []
     undocked_enemies = []
     for player in game_map.all_players():
         if player != game_map.get_me():
-            docked_enemies += [ship for ship in player.all_ships() if ship.is_docked()]
-            undocked_enemies += [ship for ship in player.all_ships() if not ship.is_docked()]
+            docked_enemies += player.docked_ships()
+            undocked_enemies += player.undocked_ships()
 
     if docked_enemies:
         overall_top_target = min(docked_enemies, key=attrgetter('distance_to_my_centroid'))
@@ -213,7 +291,7 @@ def get_utility_parameters(game_map, list_enemies, micro_flag, desertion_flag):
     if isinstance(overall_top_target, entity.Ship):
         overall_top_target.is_top_target = True
         game_map.overall_top_target = overall_top_target
-        logging.info('UTILITY: highest util target: {}, distance from centroid: {}'.format(overall_top_target, overall_top_target.distance_to_my_centroid))
+        botlog.UTILITY.info('UTILITY: highest util target: %s, distance from centroid: %s', overall_top_target, overall_top_target.distance_to_my_centroid)
 
     return max_iterations, docking_discount, overall_top_target, dock_check_distance
 
@@ -224,22 +302,26 @@ def set_utilities_for_ship(ship, game_map, current_strategy, docking_discount, m
     if ship.docking_status != ship.DockingStatus.UNDOCKED:
         return None
 
-    entities_by_distance = game_map.nearby_entities_by_distance(ship)
+    nearest_entities = game_map.nearest_entities(
+        ship, radius=constants.REVAL_TURN_HORIZON[current_strategy.value] * constants.MAX_SPEED)
     if desertion_flag:
-        logging.debug('UTILITY: deserting! adding corners to targets')
+        botlog.UTILITY.debug('UTILITY: deserting! adding corners to targets')
+        corners = []
         for corner in game_map.get_corners():
-            logging.debug('corner: {}'.format(corner))
-            entities_by_distance.setdefault(ship.calculate_min_distance2_between(corner) / 100, []).append(corner)
+            botlog.UTILITY.debug('corner: %s', corner)
+            corners.append((ship.calculate_min_distance2_between(corner) / 100, corner))
+        # corners go after any entity at the same distance
+        nearest_entities = heapq.merge(nearest_entities, sorted(corners, key=itemgetter(0)), key=itemgetter(0))
 
     counter = 0
     highest_utility = 0
 
-    for distance2 in sorted(entities_by_distance):
+    for distance2, entity_group in groupby(nearest_entities, key=itemgetter(0)):
 
         if (distance2 / (constants.MAX_SPEED ** 2)) >= (constants.REVAL_TURN_HORIZON[current_strategy.value] ** 2):
-            continue
+            break
 
-        for current_entity in entities_by_distance[distance2]:
+        for _, current_entity in entity_group:
 
             distance = math.sqrt(distance2)
 
@@ -252,8 +334,7 @@ def set_utilities_for_ship(ship, game_map, current_strategy, docking_discount, m
                 ship.targets_by_utility.setdefault(utility, []).append(current_entity)
                 counter += 1
                 if ship.id == 14:
-                    logging.debug('ship: {}, utility: {}, counter: {}, target:{}'.format(ship.id, utility, counter,
-                                                                                         current_entity))
+                    botlog.UTILITY.debug('ship: %s, utility: %s, counter: %s, target:%s', ship.id, utility, counter, current_entity)
                 if utility >= highest_utility:
                     highest_utility = utility
                     ship.highest_utility_target = current_entity
@@ -269,11 +350,11 @@ def get_utility(ship, current_entity, game_map, current_strategy, distance, comb
                 exclude_mid_multiplier=False, mid_map_multiplier=1.4):
     reval_horizon = constants.REVAL_TURN_HORIZON[current_strategy.value]
     ship_distance_discount = 1 - min(distance / constants.MAX_SPEED, reval_horizon) / reval_horizon
-    distance_from_me_overall = current_entity.calculate_distance_between(game_map.get_me().centroid_ship)
+    distance_from_me_overall = game_map.distances.to_point(current_entity, game_map.get_me().centroid_ship)
     mass_proximity_discount = 1 - constants.MASS_PROXIMITY_DISCOUNT[current_strategy.value] * min(
         distance_from_me_overall / constants.MAX_SPEED, reval_horizon) / reval_horizon
     mid_multiplier = mid_map_multiplier
-    distance_from_mid = current_entity.calculate_distance_between(game_map.get_mid_map())
+    distance_from_mid = game_map.distances.to_point(current_entity, game_map.get_mid_map())
     if current_strategy == constants.BotStrategy.FOUR_PLAYERS:
         planet_multiplier = 1
         #distance_from_mid = current_entity.calculate_distance_between(entity.Position(game_map.get_mid_map().x, current_entity.y))
@@ -310,7 +391,7 @@ def get_utility(ship, current_entity, game_map, current_strategy, distance, comb
                 utility = undocked_utility
                 if ship.last_ship_target:
                     if current_entity.id == ship.last_ship_target.id:
-                        if ship.calculate_distance_sq_between(current_entity) >= ship.last_ship_target_sq_dist:
+                        if game_map.distances.distance2(ship, current_entity) >= ship.last_ship_target_sq_dist:
                             utility = 0
             else:
                 utility = docked_utility * (1.5 if ship.is_clumped else 1)
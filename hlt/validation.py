@@ -0,0 +1,171 @@
+import re
+import time
+
+import numpy as np
+
+from . import botlog, collision
+
+#: Seconds the validator may spend slowing ships down before it stops whoever still collides
+TIME_SLICE = 0.05
+#: Extra room kept between bodies on top of their radii
+FUDGE = 0.1
+
+_THRUST = re.compile(r't (\d+) (\d+) (\d+)$')
+
+
+def queued_thrusts(command_queue):
+    """
+    :param list[str] command_queue: The turn's commands
+    :return: Ship id to (speed, angle, index in the queue) of every thrust in the queue
+    :rtype: dict[int, (int, int, int)]
+    """
+    thrusts = {}
+    for i, command in enumerate(command_queue):
+        match = _THRUST.match(command)
+        if match:
+            thrusts[int(match.group(1))] = (int(match.group(2)), int(match.group(3)), i)
+    return thrusts
+
+
+def set_thrust(ship, speed, angle):
+    """
+    Like Ship.thrust, but a zero thrust also clears the end of turn position.
+    """
+    if speed:
+        ship.thrust(speed, angle)
+    else:
+        ship.pos_eot = None
+        ship.speed = 0
+        ship.angle = angle
+
+
+def sync_thrusts(game_map, thrusts):
+    """
+    pos_eot is set by any thrust, even one that never made it to the queue. Make my ships match what the queue
+    will actually do.
+
+    :return: My ships with a nonzero thrust queued
+    :rtype: list[entity.Ship]
+    """
+    for ship in game_map.my_ship_dict.values():
+        speed, angle, _ = thrusts.get(ship.id, (0, 0, None))
+        set_thrust(ship, speed, angle)
+    return [ship for ship in game_map.my_ship_dict.values() if ship.pos_eot]
+
+
+def _swept_pairs(xs, ys, end_xs, end_ys, radii, moving):
+    """
+    Sweep and prune over the boxes around each body's path this turn: sort the boxes on x, then walk them keeping
+    the ones whose x range is still open and test y only against those.
+
+    :return: Index pairs, lower first, whose boxes overlap and where at least one of the two moves
+    :rtype: list[(int, int)]
+    """
+    min_xs = np.minimum(xs, end_xs) - radii
+    max_xs = np.maximum(xs, end_xs) + radii
+    min_ys = (np.minimum(ys, end_ys) - radii).tolist()
+    max_ys = (np.maximum(ys, end_ys) + radii).tolist()
+    max_x_list = max_xs.tolist()
+    pairs = []
+    active = []
+    for i, min_x in zip(np.argsort(min_xs, kind='stable').tolist(), np.sort(min_xs, kind='stable').tolist()):
+        active = [j for j in active if max_x_list[j] >= min_x]
+        for j in active:
+            if (moving[i] or moving[j]) and min_ys[j] <= max_ys[i] and min_ys[i] <= max_ys[j]:
+                pairs.append((i, j) if i < j else (j, i))
+        active.append(i)
+    return pairs
+
+
+def validate_command_queue(game_map, time_slice=TIME_SLICE, additional_fudge=FUDGE):
+    """
+    Last check on the turn's commands as a whole. My ships with a thrust queued sweep from where they are to
+    where the thrust takes them, my other ships, docked enemies and planets stay put, and any moving pair or
+    moving and still pair that would touch is repaired. Of two moving ships the one queued later gives way.
+
+    Offenders are slowed down along their angle to the fastest speed that clears everyone around them, which
+    only shrinks their boxes, so the pairs from the one sweep stay complete. Once the time slice is used up
+    whoever still collides gets a zero thrust, which always ends it.
+
+    :param game_map.Map game_map: The map, with this turn's commands in command_queue
+    :param time_slice: Seconds to spend slowing ships down
+    :return: How many thrusts were changed
+    :rtype: int
+    """
+    thrusts = queued_thrusts(game_map.command_queue)
+    thrusts = {ship_id: thrust for ship_id, thrust in thrusts.items() if ship_id in game_map.my_ship_dict}
+    movers = sync_thrusts(game_map, thrusts)
+    if not movers:
+        return 0
+    deadline = time.time() + time_slice
+
+    mover_ids = {ship.id for ship in movers}
+    bodies = movers + [ship for ship in game_map.my_ship_dict.values() if ship.id not in mover_ids]
+    bodies += [ship for player in game_map.all_players() if player != game_map.get_me()
+               for ship in player.all_ships() if ship.is_docked()]
+    bodies += game_map.all_planets()
+    num_movers = len(movers)
+    xs = np.array([body.x for body in bodies], dtype=float)
+    ys = np.array([body.y for body in bodies], dtype=float)
+    radii = np.array([body.radius for body in bodies], dtype=float) + additional_fudge / 2
+    speeds = np.zeros(len(bodies))
+    speeds[:num_movers] = [ship.speed for ship in movers]
+    angles = np.radians([ship.angle for ship in movers])
+    cos = np.zeros(len(bodies))
+    sin = np.zeros(len(bodies))
+    cos[:num_movers] = np.cos(angles)
+    sin[:num_movers] = np.sin(angles)
+    moving = [i < num_movers for i in range(len(bodies))]
+
+    pairs = _swept_pairs(xs, ys, xs + speeds * cos, ys + speeds * sin, radii, moving)
+    if not pairs:
+        return 0
+    first, second = (np.array(side) for side in zip(*pairs))
+    partners = {}
+    for i, j in pairs:
+        partners.setdefault(i, []).append(j)
+        partners.setdefault(j, []).append(i)
+    queue_order = [thrusts[ship.id][2] for ship in movers]
+
+    changed = set()
+    while True:
+        vxs = speeds * cos
+        vys = speeds * sin
+        collided, _ = collision.moving_ship_collisions(
+            xs[first], ys[first], vxs[first], vys[first], xs[second], ys[second], vxs[second], vys[second],
+            radii[first] + radii[second])
+        hits = np.flatnonzero(collided).tolist()
+        if not hits:
+            break
+        offenders = set()
+        for k in hits:
+            i, j = int(first[k]), int(second[k])
+            if speeds[i] and speeds[j]:
+                offenders.add(i if queue_order[i] > queue_order[j] else j)
+            else:
+                offenders.add(i if speeds[i] else j)
+        slow_down = time.time() < deadline
+        for i in offenders:
+            speed = 0
+            if slow_down and speeds[i] > 1:
+                # every slower thrust along the same angle against everyone the ship was swept with
+                others = np.array(partners[i])
+                trial = np.arange(1, int(speeds[i]))[:, np.newaxis]
+                collided, _ = collision.moving_ship_collisions(
+                    xs[i], ys[i], trial * cos[i], trial * sin[i], xs[others], ys[others], vxs[others], vys[others],
+                    radii[i] + radii[others])
+                clear = np.flatnonzero(~collided.any(axis=1))
+                if len(clear):
+                    speed = int(trial[clear[-1], 0])
+            botlog.NAVIGATION.info('VALIDATION: ship %s thrust %s -> %s', movers[i].id, int(speeds[i]), speed)
+            speeds[i] = speed
+            changed.add(i)
+
+    for i in changed:
+        ship = movers[i]
+        speed = int(speeds[i])
+        set_thrust(ship, speed, ship.angle)
+        game_map.command_queue[thrusts[ship.id][2]] = 't {} {} {}'.format(ship.id, speed, ship.angle)
+    if changed:
+        botlog.NAVIGATION.warning('VALIDATION: %s of %s thrusts changed', len(changed), num_movers)
+    return len(changed)
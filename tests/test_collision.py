@@ -0,0 +1,135 @@
+"""
+collision.moving_ship_collisions against does_moving_ship_intersect_obstacle, the scalar check it batches.
+
+usage: python -m pytest -q tests
+"""
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hlt import collision, constants, entity
+
+#: Squares are products in the kernel and pow in the scalar version, times may differ in the last bits
+TIME_TOLERANCE = 1e-9
+
+
+def make_ship(ship_id, x, y, speed=0, angle=0):
+    ship = entity.Ship(0, ship_id, x, y, 255, 0, 0, entity.Ship.DockingStatus.UNDOCKED, None, 0, 0)
+    if speed:
+        ship.thrust(speed, angle)
+    return ship
+
+
+def make_planet(planet_id, x, y, radius):
+    return entity.Planet(planet_id, x, y, 2000, radius, 3, 0, 1000, 0, None, [])
+
+
+def random_obstacles(rnd, x, y, count):
+    """
+    Planets, still ships and ships with a thrust scattered within a couple of turns of (x, y)
+    """
+    obstacles = []
+    for i in range(count):
+        ox = x + rnd.uniform(-20, 20)
+        oy = y + rnd.uniform(-20, 20)
+        kind = rnd.randrange(3)
+        if kind == 0:
+            obstacles.append(make_planet(i, ox, oy, rnd.uniform(3, 8)))
+        elif kind == 1:
+            obstacles.append(make_ship(100 + i, ox, oy))
+        else:
+            obstacles.append(make_ship(100 + i, ox, oy, rnd.randint(1, constants.MAX_SPEED), rnd.randrange(360)))
+    return obstacles
+
+
+def kernel(ship, vx, vy, obstacles, additional_fudge=0.2):
+    motions = [collision.obstacle_motion(ship, obstacle, additional_fudge) for obstacle in obstacles]
+    obstacle_vx, obstacle_vy, reach = (np.array(column, dtype=float) for column in zip(*motions))
+    return collision.moving_ship_collisions(
+        ship.x, ship.y, vx, vy,
+        np.array([obstacle.x for obstacle in obstacles], dtype=float),
+        np.array([obstacle.y for obstacle in obstacles], dtype=float),
+        obstacle_vx, obstacle_vy, reach)
+
+
+class MovingShipCollisionsTest(unittest.TestCase):
+
+    def assert_matches(self, flags, times, expected):
+        self.assertEqual(flags.tolist(), [hit for hit, _ in expected])
+        for time, (hit, min_t) in zip(times.tolist(), expected):
+            if hit:
+                self.assertAlmostEqual(time, min_t, delta=TIME_TOLERANCE)
+            else:
+                self.assertTrue(np.isnan(time))
+
+    def test_random_layouts(self):
+        rnd = random.Random(21)
+        hits = 0
+        for _ in range(200):
+            ship = make_ship(1, rnd.uniform(30, 200), rnd.uniform(30, 200))
+            target = entity.Position(ship.x + rnd.uniform(-15, 15), ship.y + rnd.uniform(-15, 15))
+            obstacles = random_obstacles(rnd, ship.x, ship.y, 12)
+            vx, vy = collision.move_velocity(ship, target)
+            flags, times = kernel(ship, vx, vy, obstacles)
+            expected = [collision.does_moving_ship_intersect_obstacle(ship, target, obstacle)
+                        for obstacle in obstacles]
+            self.assert_matches(flags, times, expected)
+            hits += flags.sum()
+        # the layouts are dense enough that both outcomes get checked
+        self.assertGreater(hits, 50)
+
+    def test_same_velocity_never_collides(self):
+        ship = make_ship(1, 50, 50)
+        target = entity.Position(55, 50)
+        # a == 0: an overlapping ship moving the same way and, standing still, a ship sat on top of us
+        obstacles = [make_ship(2, 50.5, 50, 5, 0), make_ship(3, 50, 50.2)]
+        flags, times = kernel(ship, 5.0, 0.0, obstacles[:1])
+        self.assert_matches(flags, times, [collision.does_moving_ship_intersect_obstacle(ship, target, obstacles[0])])
+        self.assertFalse(flags[0])
+
+        ship_on_target = entity.Position(ship.x, ship.y)
+        vx, vy = collision.move_velocity(ship, ship_on_target)
+        flags, times = kernel(ship, vx, vy, obstacles[1:])
+        self.assert_matches(flags, times,
+                            [collision.does_moving_ship_intersect_obstacle(ship, ship_on_target, obstacles[1])])
+        self.assertFalse(flags[0])
+
+    def test_moving_apart_never_collides(self):
+        ship = make_ship(1, 50, 50)
+        target = entity.Position(43, 50)
+        # closest approach is before the turn starts, min_t < 0, even though they touch at t = 0
+        obstacles = [make_planet(0, 55, 50, 4.5), make_ship(2, 50.8, 50, 3, 0)]
+        vx, vy = collision.move_velocity(ship, target)
+        flags, times = kernel(ship, vx, vy, obstacles)
+        expected = [collision.does_moving_ship_intersect_obstacle(ship, target, obstacle) for obstacle in obstacles]
+        self.assert_matches(flags, times, expected)
+        self.assertEqual(flags.tolist(), [False, False])
+
+    def test_candidate_moves_broadcast(self):
+        rnd = random.Random(22)
+        speeds = np.repeat(np.arange(1, constants.MAX_SPEED + 1), 24)
+        angles = np.tile(np.arange(0, 360, 15), constants.MAX_SPEED)
+        vx = (speeds * np.cos(np.radians(angles)))[:, np.newaxis]
+        vy = (speeds * np.sin(np.radians(angles)))[:, np.newaxis]
+        for _ in range(10):
+            ship = make_ship(1, rnd.uniform(30, 200), rnd.uniform(30, 200))
+            obstacles = random_obstacles(rnd, ship.x, ship.y, 8)
+            flags, times = kernel(ship, vx, vy, obstacles)
+            self.assertEqual(flags.shape, (len(speeds), len(obstacles)))
+            self.assertEqual(times.shape, (len(speeds), len(obstacles)))
+            for row, (speed, angle) in enumerate(zip(speeds.tolist(), angles.tolist())):
+                # a zero angle is falsy to the scalar version, it takes the angle to the target instead
+                target = entity.Position(ship.x + speed, ship.y)
+                expected = [collision.does_moving_ship_intersect_obstacle(ship, target, obstacle, ship_speed=speed,
+                                                                          ship_angle=angle)
+                            for obstacle in obstacles]
+                self.assert_matches(flags[row], times[row], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+orca.resolve_friendly_moves on small hand made turns.
+
+usage: python -m pytest -q tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hlt import game_map, orca, validation
+
+
+def make_map(ships):
+    """
+    :param ships: (x, y) of each of my ships, ids in order, no other players and no planets
+    :return: The parsed map with my_ship_dict set like MyBot does
+    """
+    tokens = ['1', '0', str(len(ships))]
+    for ship_id, (x, y) in enumerate(ships):
+        tokens += [str(ship_id), repr(x), repr(y), '255', '0.0', '0.0', '0', '0', '0', '0']
+    tokens.append('0')
+    new_map = game_map.Map(0, 240, 160)
+    new_map._parse(' '.join(tokens))
+    new_map.my_ship_dict = {ship.id: ship for ship in new_map.get_me().all_ships()}
+    return new_map
+
+
+class ResolveFriendlyMovesTest(unittest.TestCase):
+
+    def test_lockstep_clump_is_left_alone(self):
+        # the rush clump spacing, closer than the agent to agent radius but the thrusts never close in
+        commands = ['t 0 7 0', 't 1 7 0', 't 2 7 0']
+        clump = make_map([(50.0, 50.0), (50.0, 51.05), (50.0, 52.1)])
+        clump.command_queue = list(commands)
+        self.assertEqual(orca.resolve_friendly_moves(clump), 0)
+        self.assertEqual(clump.command_queue, commands)
+        self.assertEqual(validation.validate_command_queue(clump), 0)
+
+    def test_head_on_pair_is_resolved(self):
+        commands = ['t 0 7 0', 't 1 7 180']
+        pair = make_map([(50.0, 50.0), (60.0, 50.0)])
+        pair.command_queue = list(commands)
+        self.assertEqual(orca.resolve_friendly_moves(pair), 2)
+        self.assertNotEqual(pair.command_queue, commands)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+recorder.Recorder and recorder.Recording round trips.
+
+usage: python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hlt import game_map, recorder
+
+
+def make_snapshot(turn):
+    """
+    :return: The snapshot of a small two player frame, ships shifted along x by the turn
+    """
+    tokens = ['2']
+    for player_id in range(2):
+        tokens += [str(player_id), '2']
+        for k in range(2):
+            ship_id = 2 * player_id + k
+            tokens += [str(ship_id), repr(20.0 + turn + 3 * ship_id), repr(30.0 + 40 * player_id), '255',
+                       '0.0', '0.0', '0', '0', '0', '0']
+    tokens += ['1', '0', '60.0', '50.0', '2000', '5.0', '3', '0', '1000', '0', '0', '0']
+    new_map = game_map.Map(0, 240, 160)
+    new_map._parse(' '.join(tokens))
+    return new_map.snapshot()
+
+
+class RecordingTest(unittest.TestCase):
+
+    def test_turns_outlive_close(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'game.rec')
+            snapshots = [make_snapshot(turn) for turn in range(3)]
+            game_recorder = recorder.Recorder(path)
+            for turn, snapshot in enumerate(snapshots):
+                game_recorder.record(snapshot, 't {} 7 0'.format(turn), {'parse': 0.001})
+            game_recorder.close()
+
+            recording = recorder.Recording(path)
+            turns = list(recording)
+            # the turns' arrays are still referenced here
+            recording.close()
+
+            self.assertEqual(len(turns), 3)
+            for turn, snapshot in zip(turns, snapshots):
+                self.assertEqual(turn.commands, 't {} 7 0'.format(turn.turn))
+                self.assertEqual(turn.snapshot.player_ids, snapshot.player_ids)
+                np.testing.assert_array_equal(turn.snapshot.ships, snapshot.ships)
+                np.testing.assert_array_equal(turn.snapshot.planets, snapshot.planets)
+                self.assertFalse(turn.snapshot.ships.flags.writeable)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Geometry helper benchmark for entity.Entity and hlt.geometry
+
+Times the hot entity helpers against the Position allocating versions they
+replaced, kept here as the reference, and counts the Position objects each
+call creates. The tuple versions navigation uses internally are timed as
+well. calculate_angle_between never allocated and stays inline in Entity, it
+is only here to compare with geometry.angle_between.
+
+usage: python tools/bench_geometry.py [calls]
+"""
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hlt import entity, geometry
+
+
+def old_get_position(ship, speed, angle):
+    dx = math.cos(math.radians(angle)) * speed
+    dy = math.sin(math.radians(angle)) * speed
+    return entity.Position((ship.x + dx), (ship.y + dy))
+
+
+def old_closest_point_to(ship, target, min_distance=0.5, shortest_dist=False):
+    angle = target.calculate_angle_between(ship)
+    if not shortest_dist:
+        if isinstance(target, entity.Ship):
+            if target.is_docked():
+                angle = (target.calculate_angle_between(target.planet) + 180) % 360
+    radius = target.radius + min_distance
+    x = target.x + radius * math.cos(math.radians(angle))
+    y = target.y + radius * math.sin(math.radians(angle))
+    return entity.Position(x, y)
+
+
+def old_calculate_min_distance2_between(ship, target):
+    if isinstance(target, entity.Ship):
+        if target.pos_eot:
+            if ship.is_target1_nearer(target.pos_eot, target):
+                return ship.calculate_distance_sq_between(old_closest_point_to(ship, target.pos_eot, min_distance=1))
+    return ship.calculate_distance_sq_between(old_closest_point_to(ship, target, min_distance=0.5, shortest_dist=True))
+
+
+def old_calculate_angle_between(ship, target):
+    return math.degrees(math.atan2(target.y - ship.y, target.x - ship.x)) % 360
+
+
+def make_ships(count, seed=0):
+    rnd = random.Random(seed)
+    ships = []
+    for ship_id in range(count):
+        ship = entity.Ship(ship_id % 2, ship_id, rnd.uniform(0, 384), rnd.uniform(0, 256), 255, 0, 0,
+                           entity.Ship.DockingStatus.UNDOCKED, 0, 0, 0)
+        if rnd.random() < 0.5:
+            ship.thrust(rnd.randint(1, 7), rnd.randrange(360))
+        ships.append(ship)
+    return ships
+
+
+def count_positions(call):
+    """
+    :return: How many Positions one call creates
+    """
+    created = [0]
+    init = entity.Position.__init__
+
+    def counting_init(self, x, y):
+        created[0] += 1
+        init(self, x, y)
+
+    entity.Position.__init__ = counting_init
+    try:
+        call()
+    finally:
+        entity.Position.__init__ = init
+    return created[0]
+
+
+def bench(label, call, number):
+    best = min(timeit.repeat(call, number=1, repeat=9))
+    print('{:>34}: {:8.1f} ns/call {:4.1f} Positions/call'.format(
+        label, best * 1e9 / number, count_positions(call) / number))
+
+
+def main(calls=20000):
+    ships = make_ships(200)
+    pairs = [(ships[i % len(ships)], ships[(7 * i + 1) % len(ships)]) for i in range(calls)]
+    thrusts = [(ship, (i % 7) + 1, (37 * i) % 360) for i, ship in enumerate(ships * (calls // len(ships)))]
+
+    cases = [
+        ('get_position', lambda: [old_get_position(s, v, a) for s, v, a in thrusts],
+         lambda: [s.get_position(v, a) for s, v, a in thrusts],
+         lambda: [geometry.offset(s.x, s.y, v, a) for s, v, a in thrusts]),
+        ('closest_point_to', lambda: [old_closest_point_to(s, t) for s, t in pairs],
+         lambda: [s.closest_point_to(t) for s, t in pairs],
+         lambda: [s.closest_xy_to(t) for s, t in pairs]),
+        ('calculate_min_distance2_between', lambda: [old_calculate_min_distance2_between(s, t) for s, t in pairs],
+         lambda: [s.calculate_min_distance2_between(t) for s, t in pairs], None),
+        ('calculate_angle_between', lambda: [old_calculate_angle_between(s, t) for s, t in pairs],
+         lambda: [s.calculate_angle_between(t) for s, t in pairs],
+         lambda: [geometry.angle_between(s.x, s.y, t.x, t.y) for s, t in pairs]),
+    ]
+    for name, old, new, plain in cases:
+        print(name)
+        bench('allocating reference', old, calls)
+        bench('entity helper', new, calls)
+        if plain:
+            bench('tuple version', plain, calls)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,79 @@
+"""
+Frame parsing benchmark for game_map.Map._parse
+
+Times the parser over small (2 player, early game), medium and huge (4 player,
+late game) frames. Recorded frames can be passed in as text files holding one
+engine frame line per line, otherwise frames of those sizes are synthesized.
+
+usage: python tools/bench_parse.py [frames.txt ...]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hlt import game_map
+
+FRAME_SIZES = [('small', 2, 6, 12), ('medium', 4, 60, 28), ('huge', 4, 180, 28)]
+
+
+def synthesize_frame(num_players, ships_per_player, num_planets, width=384, height=256, seed=0):
+    """
+    Build an engine frame line with the given number of entities
+
+    :return: frame string as the engine would send it
+    """
+    rnd = random.Random(seed)
+    tokens = [str(num_players)]
+    ship_id = 0
+    docked_by_planet = {}
+    for player_id in range(num_players):
+        tokens += [str(player_id), str(ships_per_player)]
+        for _ in range(ships_per_player):
+            docking_status = rnd.choice([0, 0, 0, 2])
+            planet_id = rnd.randrange(num_planets) if docking_status else 0
+            if docking_status:
+                docked_by_planet.setdefault(planet_id, (player_id, []))
+                if docked_by_planet[planet_id][0] == player_id:
+                    docked_by_planet[planet_id][1].append(ship_id)
+                else:
+                    docking_status = planet_id = 0
+            tokens += [str(ship_id), '{:.4f}'.format(rnd.uniform(0, width)), '{:.4f}'.format(rnd.uniform(0, height)),
+                       str(rnd.randint(1, 255)), '0.0000', '0.0000', str(docking_status), str(planet_id), '0', '0']
+            ship_id += 1
+    tokens.append(str(num_planets))
+    for planet_id in range(num_planets):
+        owner, docked_ships = docked_by_planet.get(planet_id, (0, []))
+        tokens += [str(planet_id), '{:.4f}'.format(rnd.uniform(0, width)), '{:.4f}'.format(rnd.uniform(0, height)),
+                   '2000', '{:.4f}'.format(rnd.uniform(3, 16)), '6', '0', '1000',
+                   '1' if docked_ships else '0', str(owner), str(len(docked_ships))]
+        tokens += [str(s) for s in docked_ships]
+    return ' '.join(tokens)
+
+
+def bench_frame(label, frame, repeat=5):
+    new_map = game_map.Map(0, 384, 256)
+    number = max(1, 20000 // max(1, len(frame.split())))
+    best = min(timeit.repeat(lambda: new_map._parse(frame), number=number, repeat=repeat)) / number
+    num_ships = len(new_map._all_ships())
+    num_planets = len(new_map.all_planets())
+    print('{:>8}: {:4d} ships {:3d} planets {:8.3f} ms/frame {:6.2f} us/entity'.format(
+        label, num_ships, num_planets, best * 1e3, best * 1e6 / max(1, num_ships + num_planets)))
+
+
+def main(paths):
+    if paths:
+        for path in paths:
+            with open(path) as frame_file:
+                for i, frame in enumerate(line.strip() for line in frame_file):
+                    if frame:
+                        bench_frame('{}:{}'.format(os.path.basename(path), i), frame)
+    else:
+        for label, num_players, ships_per_player, num_planets in FRAME_SIZES:
+            bench_frame(label, synthesize_frame(num_players, ships_per_player, num_planets))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
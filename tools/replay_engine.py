@@ -0,0 +1,156 @@
+"""
+Local stand-in for the Halite engine that replays recorded frames to a bot
+
+Speaks the same stdin/stdout protocol as the engine: sends the player tag, the
+width/height line and the initial frame, waits for the bot's name, then sends
+one frame per turn and reads the command line back. The frames come from a
+recording made with Game(record=True), or from a text file holding exactly what
+the engine sends (tag line, width/height line, then one frame per line).
+
+The bot runs in its own working directory so its logs don't land in the
+caller's. Arguments of the bot command naming an existing file or directory,
+like the MyBot.py below, are made absolute first so they still resolve there.
+
+Per turn latency is the wall clock time from writing the frame to receiving the
+commands, so it covers the bot's I/O and parsing as well as its turn logic.
+
+usage: python tools/replay_engine.py [--turns N] [--workdir DIR] [--csv FILE] GAME -- python MyBot.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hlt import recorder
+
+
+def format_frame(snapshot):
+    """
+    Turn a snapshot back into the frame line the engine would have sent
+
+    :param frame.MapSnapshot snapshot: The recorded frame
+    :return: frame string
+    """
+    tokens = [str(len(snapshot.player_ids))]
+    ships = snapshot.ships
+    for player_id in snapshot.player_ids:
+        player_ships = ships[ships['owner'] == player_id]
+        tokens += [str(player_id), str(len(player_ships))]
+        for ship in player_ships.tolist():
+            (ship_id, _, x, y, vel_x, vel_y, health, docking_status, planet, progress, cooldown) = ship
+            tokens += [str(ship_id), repr(x), repr(y), str(health), repr(vel_x), repr(vel_y),
+                       str(docking_status), str(max(planet, 0)), str(progress), str(cooldown)]
+    tokens.append(str(len(snapshot.planets)))
+    docked_ids = snapshot.planet_docked_ids.tolist()
+    for planet in snapshot.planets.tolist():
+        (planet_id, x, y, radius, health, docking_spots, production, remaining, owner,
+         num_docked, docked_start) = planet
+        tokens += [str(planet_id), repr(x), repr(y), str(health), repr(radius), str(docking_spots),
+                   str(production), str(remaining), '1' if owner >= 0 else '0', str(max(owner, 0)), str(num_docked)]
+        tokens += [str(ship_id) for ship_id in docked_ids[docked_start:docked_start + num_docked]]
+    return ' '.join(tokens)
+
+
+def load_game(path):
+    """
+    :param str path: A recording or an engine output text file
+    :return: tag, width, height and the list of frame strings, initial frame first
+    """
+    if os.path.exists(path + '.idx'):
+        recording = recorder.Recording(path)
+        frames = [format_frame(turn.snapshot) for turn in recording]
+        _, tag, width, height = recording[0].snapshot[:4]
+        recording.close()
+        return tag, width, height, frames
+
+    with open(path) as game_file:
+        lines = [line.strip() for line in game_file if line.strip()]
+    width, height = [int(x) for x in lines[1].split()]
+    return int(lines[0]), width, height, lines[2:]
+
+
+def absolute_command(bot_command):
+    """
+    :param list bot_command: The bot command as given, relative to the caller's working directory
+    :return: the command with every argument that names an existing path made absolute
+    """
+    return [os.path.abspath(arg) if os.path.exists(arg) else arg for arg in bot_command]
+
+
+def replay(tag, width, height, frames, bot_command, workdir):
+    """
+    Play the frames to the bot and time every turn
+
+    :return: the bot's name and a list of (turn, latency in seconds, command line) per turn
+    """
+    bot = subprocess.Popen(absolute_command(bot_command), stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=workdir)
+    results = []
+    try:
+        bot.stdin.write('{}\n{} {}\n{}\n'.format(tag, width, height, frames[0]).encode())
+        bot.stdin.flush()
+        name = bot.stdout.readline().decode().strip()
+        for turn, frame in enumerate(frames[1:], 1):
+            line = (frame + '\n').encode()
+            start = time.perf_counter()
+            bot.stdin.write(line)
+            bot.stdin.flush()
+            commands = bot.stdout.readline()
+            latency = time.perf_counter() - start
+            if not commands:
+                print('bot exited on turn {}'.format(turn), file=sys.stderr)
+                break
+            results.append((turn, latency, commands.decode().rstrip('\n')))
+    finally:
+        bot.kill()
+        bot.wait()
+    return name, results
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded game to a bot and time every turn')
+    parser.add_argument('game', help='recording (.rec) or engine output text file')
+    parser.add_argument('bot', nargs=argparse.REMAINDER, help='command that runs the bot, after --')
+    parser.add_argument('--turns', type=int, default=None, help='only play this many turns')
+    parser.add_argument('--workdir', default=None, help='directory to run the bot in, a temporary one by default')
+    parser.add_argument('--csv', default=None, help='write turn,latency_ms rows to this file')
+    args = parser.parse_args()
+
+    bot_command = args.bot[1:] if args.bot[:1] == ['--'] else args.bot
+    if not bot_command:
+        parser.error('missing bot command')
+
+    tag, width, height, frames = load_game(args.game)
+    if args.turns is not None:
+        frames = frames[:args.turns + 1]
+
+    if args.workdir:
+        name, results = replay(tag, width, height, frames, bot_command, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            name, results = replay(tag, width, height, frames, bot_command, workdir)
+
+    if args.csv:
+        with open(args.csv, 'w') as csv_file:
+            csv_file.write('turn,latency_ms\n')
+            for turn, latency, _ in results:
+                csv_file.write('{},{:.3f}\n'.format(turn, latency * 1e3))
+
+    if not results:
+        print('{}: no turns played'.format(name))
+        return
+    latencies = sorted(latency for _, latency, _ in results)
+    print('{}: {} turns, latency ms mean {:.2f} p50 {:.2f} p90 {:.2f} p99 {:.2f} max {:.2f}'.format(
+        name, len(latencies), 1e3 * sum(latencies) / len(latencies), 1e3 * percentile(latencies, 0.5),
+        1e3 * percentile(latencies, 0.9), 1e3 * percentile(latencies, 0.99), 1e3 * latencies[-1]))
+
+
+if __name__ == '__main__':
+    main()